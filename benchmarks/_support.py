@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Shared stand-ins for the benchmark scripts.  Nothing here talks to a
+real Minecraft server; `Packet` is driven against in-memory objects.
+"""
+
+import logging
+import os
+import sys
+import time
+import uuid
+
+# wrapper's modules import each other relative to the wrapper folder.
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "wrapper"))
+
+# noinspection PyUnresolvedReferences
+from proxy.packets.packet import Packet  # noqa
+
+timer = getattr(time, "perf_counter", time.time)
+# CPU time of this process (time.clock on Py2)
+if hasattr(time, "process_time"):
+    cpu_timer = time.process_time
+else:
+    cpu_timer = time.clock
+
+
+class FakeJavaServer(object):
+    def __init__(self, protocol):
+        self.protocolVersion = protocol
+
+
+class FakeWrapper(object):
+    # MCUUID is a uuid.UUID subclass; the plain class is enough here.
+    mcuuid = uuid.UUID
+
+
+class FakeProxy(object):
+    wrapper = FakeWrapper()
+
+
+class FakeConnection(object):
+    """Stands in for the Client/ServerConnection that owns a Packet."""
+    def __init__(self, protocol=340):
+        self.log = logging.getLogger("benchmark")
+        self.javaserver = FakeJavaServer(protocol)
+        self.proxy = FakeProxy()
+        # PLAY; the protocol state the packet stats are counted in.
+        self.state = 3
+
+    def close_server(self, reason):
+        raise EOFError(reason)
+
+
+class MemorySocket(object):
+    """
+    A socket stand-in.  Sent data is only counted (`self.sent` bytes);
+    reads are served from `self.incoming` (loaded with `feed()`).
+    """
+    def __init__(self):
+        self.sent = 0
+        self.incoming = b""
+        self.pos = 0
+
+    def feed(self, data):
+        self.incoming = data
+        self.pos = 0
+
+    def send(self, data):
+        self.sent += len(data)
+        return len(data)
+
+    def sendall(self, data):
+        self.sent += len(data)
+
+    def sendmsg(self, buffers):
+        sent = sum(len(b) for b in buffers)
+        self.sent += sent
+        return sent
+
+    def recv(self, size):
+        data = self.incoming[self.pos:self.pos + size]
+        self.pos += len(data)
+        return data
+
+    def recv_into(self, buf, size=0):
+        size = size or len(buf)
+        data = self.incoming[self.pos:self.pos + size]
+        buf[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
+
+
+def make_packet(protocol=340):
+    return Packet(MemorySocket(), FakeConnection(protocol))
+
+
+def load(packet, payload):
+    """Make `payload` (a packet body, after the id) the packet's current
+    read buffer."""
+    packet._inflater = None
+    packet._pbuf = packet._frame(memoryview(payload))
+    packet._ppos = 0
+
+
+def bench(func, seconds=0.5):
+    """
+    Run `func` repeatedly for about `seconds`.
+    :returns: operations per second.
+    """
+    count = 0
+    batch = 100
+    start = timer()
+    elapsed = 0
+    while elapsed < seconds:
+        for _ in range(batch):
+            func()
+        count += batch
+        elapsed = timer() - start
+    return count / elapsed
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+readpkt/encodepkt: per-field dispatch vs. compiled struct plans.
+
+    python benchmarks/bench_codec.py
+
+The "legacy" numbers run the old one-call-per-field loops against the
+same Packet instance, so the only difference is the compiled plan.  The
+send side times `encodepkt()`, which only encodes, like the legacy loop
+(`sendpkt()` also queues the packet).
+"""
+
+from __future__ import print_function
+
+import uuid
+
+from _support import make_packet, load, bench
+from proxy.utils.constants import *
+
+CASES = (
+    ("PLAYER_POSLOOK",
+     [DOUBLE, DOUBLE, DOUBLE, FLOAT, FLOAT, BYTE, VARINT],
+     (102.5, 64.0, -310.25, 90.0, 12.5, 0, 7)),
+    ("ENTITY_TELEPORT",
+     [VARINT, DOUBLE, DOUBLE, DOUBLE, REST],
+     (1234, 102.5, 64.0, -310.25, b"\x10\x20\x01")),
+    ("SPAWN_MOB",
+     [VARINT, UUID, UBYTE, DOUBLE, DOUBLE, DOUBLE, BYTE, BYTE, BYTE, REST],
+     (1234, uuid.uuid4(), 54, 102.5, 64.0, -310.25, 10, -20, 30,
+      b"\x00\x00\x00\x00\x00\x00\xff")),
+)
+
+
+def legacy_readpkt(packet, args):
+    result = []
+    for arg in args:
+        result.append(packet._PKTREAD[arg]())
+    return result
+
+
+def legacy_sendpkt(packet, pkid, args, payload):
+    result = packet.send_varint(pkid)
+    for x, arg in enumerate(args):
+        result += packet._PKTSEND[arg](payload[x])
+    return result
+
+
+def main():
+    packet = make_packet()
+    print("%-16s %-5s %12s %12s %8s" % (
+        "packet", "op", "legacy/s", "compiled/s", "speedup"))
+    for name, args, values in CASES:
+        encoded = packet.encodepkt(0x10, args, values)
+        assert encoded == legacy_sendpkt(packet, 0x10, args, values), name
+        # strip the packet id; readpkt starts after it.
+        payload = encoded[1:]
+
+        def old_read():
+            load(packet, payload)
+            legacy_readpkt(packet, args)
+
+        def new_read():
+            load(packet, payload)
+            packet.readpkt(args)
+
+        def old_send():
+            legacy_sendpkt(packet, 0x10, args, values)
+
+        def new_send():
+            packet.encodepkt(0x10, args, values)
+
+        load(packet, payload)
+        assert packet.readpkt(args) == list(values), name
+        for op, old, new in (("read", old_read, new_read),
+                             ("send", old_send, new_send)):
+            before = bench(old)
+            after = bench(new)
+            print("%-16s %-5s %12.0f %12.0f %7.2fx" % (
+                name, op, before, after, after / before))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+CPU per MB and bytes on the wire for each Proxy compression level.
+
+    python benchmarks/bench_compression.py
+
+Payloads are synthetic: chunk-like data (long runs of a few block ids,
+empty light arrays) and chat-like JSON, framed by Packet the same way
+the proxy frames packets it compresses.
+"""
+
+from __future__ import print_function
+
+import json
+import random
+import zlib
+
+from _support import make_packet, cpu_timer as cpu
+
+
+def chunk_payload(size, seed):
+    rnd = random.Random(seed)
+    blocks = bytearray()
+    while len(blocks) < size // 2:
+        blocks.extend(bytearray([rnd.choice((1, 1, 1, 2, 3, 9, 12))]) *
+                      rnd.randint(1, 40))
+    return bytes(blocks[:size // 2]) + b"\x00" * (size - size // 2)
+
+
+def chat_payload(seed):
+    rnd = random.Random(seed)
+    words = ["diamond", "creeper", "spawn", "hub", "trade", "lol", "where"]
+    text = " ".join(rnd.choice(words) for _ in range(rnd.randint(5, 60)))
+    return json.dumps({"text": "<player%d> " % seed, "extra": [
+        {"text": text, "color": "white"}]}).encode("utf-8")
+
+
+SAMPLES = [chunk_payload(rnd_size, n) for n, rnd_size in
+           enumerate([12000, 40000, 90000, 180000])] + [
+    chat_payload(n) for n in range(40)]
+
+
+def main():
+    packet = make_packet()
+    packet.compressThreshold = 256
+    raw = sum(len(s) for s in SAMPLES)
+    print("%d payloads, %.2f MB raw" % (len(SAMPLES), raw / 1048576.0))
+    print("%6s %12s %12s %8s" % ("level", "cpu ms/MB", "wire bytes", "ratio"))
+    for level in (zlib.Z_DEFAULT_COMPRESSION, 1, 2, 3, 4, 5, 6, 7, 8, 9):
+        packet.compresslevel = level
+        rounds = 0
+        wire = 0
+        start = cpu()
+        while cpu() - start < 0.5:
+            wire = 0
+            for sample in SAMPLES:
+                wire += len(packet.handle_compression(256, sample))
+            rounds += 1
+        spent = cpu() - start
+        ms_per_mb = spent * 1000.0 / (rounds * raw / 1048576.0)
+        print("%6d %12.2f %12d %7.1f%%" % (
+            level, ms_per_mb, wire, wire * 100.0 / raw))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Packet.flush: one frame/cipher update/send per packet vs. one batch.
+
+    python benchmarks/bench_flush.py
+
+Packets are flushed over a local socket pair that another thread keeps
+drained.  Encrypted runs need the 'cryptography' package.
+"""
+
+from __future__ import print_function
+
+import os
+import socket
+import threading
+
+from _support import FakeConnection, Packet, bench
+
+try:
+    from proxy.utils.encryption import aes128cfb8
+except ImportError:
+    aes128cfb8 = False
+
+# a typical burst: mostly small entity/move packets and a few big ones.
+BURST = [os.urandom(n) for n in [24] * 40 + [60] * 20 + [4000] * 4]
+
+
+def legacy_flush(packet):
+    """the flush() this replaced"""
+    while len(packet.queue) > 0:
+        compression, payload = packet.queue.popleft()
+        frame = packet.handle_compression(compression, payload)
+        if packet.sendCipher is None:
+            packet.socket.send(frame)
+        else:
+            packet.socket.send(packet.sendCipher.update(frame))
+
+
+def drain(sock):
+    while sock.recv(262144):
+        pass
+
+
+def main():
+    print("bursts of %d packets flushed per second" % len(BURST))
+    print("%-10s %12s %12s %8s" % (
+        "cipher", "legacy/s", "batched/s", "speedup"))
+    for encrypted in (False, True):
+        if encrypted and not aes128cfb8:
+            print("encrypted: skipped, 'cryptography' is not installed")
+            continue
+        a, b = socket.socketpair()
+        t = threading.Thread(target=drain, args=(b,))
+        t.daemon = True
+        t.start()
+        packet = Packet(a, FakeConnection())
+        if encrypted:
+            packet.sendCipher = aes128cfb8(os.urandom(16)).encryptor()
+
+        def queue_burst():
+            for payload in BURST:
+                packet.send_raw_untouched(payload)
+
+        def old():
+            queue_burst()
+            legacy_flush(packet)
+
+        def new():
+            queue_burst()
+            packet.flush()
+
+        before = bench(old)
+        after = bench(new)
+        print("%-10s %12.0f %12.0f %7.2fx" % (
+            "aes" if encrypted else "none", before, after, after / before))
+        a.close()
+
+
+if __name__ == "__main__":
+    main()
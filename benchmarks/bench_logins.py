@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Session server checks for a burst of online mode logins.
+
+    python benchmarks/bench_logins.py
+
+A stand-in session server on a local port answers hasJoined after
+LATENCY seconds (like the real one, give or take).  LOGINS checks are
+made the old way (a new `requests.get` each, one after another, as a
+parser thread did) and then through proxy/sessions.py's SessionVerifier
+(a pool of kept-alive connections).  The server counts the TCP
+connections it was given.
+"""
+
+from __future__ import print_function
+
+import json
+import logging
+import threading
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import requests
+
+from _support import timer
+
+from proxy.sessions import SessionVerifier
+
+LOGINS = 100
+LATENCY = 0.05
+
+
+class SessionHandler(BaseHTTPRequestHandler):
+    # keep-alive
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self):
+        name = self.path.partition("username=")[2].partition("&")[0]
+        body = json.dumps({"id": uuid.uuid4().hex, "name": name,
+                           "properties": [{"name": "textures",
+                                           "value": "e30=",
+                                           "signature": "c2ln"}]})
+        body = body.encode("utf-8")
+        threading.Event().wait(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SessionServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    connections = 0
+
+
+class FakeProxy(object):
+    def __init__(self, url):
+        self.log = logging.getLogger("benchmark")
+        self.config = {"session-server": url, "session-workers": 8}
+
+
+def old_way(url):
+    for x in range(LOGINS):
+        r = requests.get("%s/session/minecraft/hasJoined?username=%s"
+                         "&serverId=%s" % (url, "player%d" % x, "hash"))
+        assert r.status_code == 200
+        r.json()
+
+
+def verifier_wave(verifier):
+    """LOGINS checks at once; returns when every callback has run"""
+    done = threading.Semaphore(0)
+    results = []
+
+    def callback(status, profile):
+        results.append(status)
+        done.release()
+
+    for x in range(LOGINS):
+        verifier.verify("player%d" % x, "hash", callback)
+    for _ in range(LOGINS):
+        done.acquire()
+    assert results == [200] * LOGINS
+
+
+def main():
+    server = SessionServer(("127.0.0.1", 0), SessionHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = "http://127.0.0.1:%d" % server.server_address[1]
+    print("%d logins, session server answering in %d ms" % (
+        LOGINS, LATENCY * 1000))
+    print("%-32s %10s %12s" % ("", "seconds", "connections"))
+
+    start = timer()
+    old_way(url)
+    print("%-32s %10.2f %12d" % ("requests.get per login", timer() - start,
+                                 server.connections))
+
+    verifier = SessionVerifier(FakeProxy(url))
+    server.connections = 0
+    start = timer()
+    verifier_wave(verifier)
+    print("%-32s %10.2f %12d" % ("SessionVerifier (8 workers)",
+                                 timer() - start, server.connections))
+    print("  counters:", verifier.counters)
+    verifier.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
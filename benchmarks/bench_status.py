@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Server list pings answered by proxy/status.py's StatusResponder.
+
+    python benchmarks/bench_status.py
+
+A stand-in ping client does what the vanilla server list does (connect,
+handshake, status request, ping) against a StatusResponder on a local
+port, one ping after another.  Each run is done with the status cache
+on and off (status-cache-seconds 0).  Then a connect flood from one IP
+is run against the per-IP rate limit (see proxy/gate.py).  Needs Python 3
+(selectors).
+"""
+
+from __future__ import print_function
+
+import base64
+import logging
+import os
+import socket
+import struct
+import tempfile
+import uuid
+
+from _support import FakeJavaServer, timer
+
+from proxy.bans import BanManager
+from proxy.gate import ConnectionGate
+from proxy.status import StatusCache, StatusResponder, selectors
+from proxy.packets.packet import _encode_varint, _varint_at
+
+PINGS = 2000
+FLOOD = 2000
+
+
+class FakePlayer(object):
+    def __init__(self, name):
+        self.username = name
+        self.mojangUuid = uuid.uuid4()
+
+
+class FakeWrapper(object):
+    def __init__(self, players):
+        self.players = dict((name, FakePlayer(name)) for name in players)
+
+
+class FakeProxy(object):
+    def __init__(self, ttl, rate=0):
+        self.log = logging.getLogger("benchmark")
+        self.config = {"status-cache-seconds": ttl, "hidden-ops": [],
+                       "max-players": 150, "max-handshakes": 256,
+                       "connect-rate-per-ip": rate,
+                       "connect-burst-per-ip": 10}
+        self.silent_ip_banning = True
+        self.javaserver = FakeJavaServer(340)
+        # (no banned-ips.json in here)
+        self.javaserver.serverpath = tempfile.mkdtemp()
+        self.javaserver.version = "1.12.2"
+        self.javaserver.motd = "&6A &lbenchmark&r server"
+        # a 64x64 png is usually a few KB
+        self.javaserver.servericon = "data:image/png;base64," + \
+            base64.b64encode(os.urandom(6000)).decode("ascii")
+        self.wrapper = FakeWrapper(["player%d" % x for x in range(40)])
+        self.forge = False
+        self.mod_info = {}
+        self.statuscache = StatusCache(self)
+        self.bans = BanManager(self.javaserver.serverpath, self.log)
+        self.gate = ConnectionGate(self)
+
+    def start_client(self, sock, addr, banned=False, data=b""):
+        sock.close()
+
+
+def frame(payload):
+    return _encode_varint(len(payload)) + payload
+
+
+def read_frame(sock, buf):
+    while True:
+        try:
+            length, start = _varint_at(buf, 0)
+            if len(buf) >= start + length:
+                return buf[start:start + length], buf[start + length:]
+        except IndexError:
+            pass
+        data = sock.recv(65536)
+        if not data:
+            raise EOFError("closed")
+        buf += data
+
+
+def ping(port):
+    """one server list ping, like the vanilla client's"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    address = b"localhost"
+    sock.sendall(frame(b"\x00" + _encode_varint(340) +
+                       _encode_varint(len(address)) + address +
+                       struct.pack(">H", port) + b"\x01") +
+                 frame(b"\x00"))
+    status, buf = read_frame(sock, b"")
+    sock.sendall(frame(b"\x01" + struct.pack(">q", 12345)))
+    pong, buf = read_frame(sock, buf)
+    assert pong == b"\x01" + struct.pack(">q", 12345)
+    sock.close()
+    return len(status)
+
+
+def serve(proxy):
+    """a StatusResponder listening on a local port"""
+    responder = StatusResponder(proxy)
+    responder.start()
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(128)
+    responder.listen(listener)
+    return responder, listener.getsockname()[1]
+
+
+def run(ttl):
+    proxy = FakeProxy(ttl)
+    responder, port = serve(proxy)
+    size = ping(port)
+    start = timer()
+    for _ in range(PINGS):
+        ping(port)
+    elapsed = timer() - start
+    responder.stop()
+    return size, PINGS / elapsed, responder, proxy.statuscache
+
+
+def flood():
+    """connect FLOOD times as fast as possible; count the pings that work"""
+    proxy = FakeProxy(30, rate=1.0)
+    responder, port = serve(proxy)
+    answered = 0
+    start = timer()
+    for _ in range(FLOOD):
+        try:
+            ping(port)
+            answered += 1
+        except (EOFError, socket.error):
+            pass
+    elapsed = timer() - start
+    responder.stop()
+    return answered, FLOOD / elapsed, proxy.gate.counters
+
+
+def main():
+    if not selectors:
+        print("skipped: the 'selectors' module is not available")
+        return
+    print("%d sequential pings to a StatusResponder" % PINGS)
+    print("%-16s %10s %10s %8s %8s" % (
+        "cache", "pings/s", "json bytes", "hits", "misses"))
+    for ttl in (30, 0):
+        size, rate, responder, cache = run(ttl)
+        print("%-16s %10.0f %10d %8d %8d" % (
+            "%ss" % ttl if ttl else "off", rate, size, cache.hits,
+            cache.misses))
+        print("  responder counters:", responder.counters)
+    answered, rate, counters = flood()
+    print("\nflood of %d connects from one IP (burst 10, 1/s): %.0f "
+          "connects/s, %d answered" % (FLOOD, rate, answered))
+    print("  gate counters:", counters)
+
+
+if __name__ == "__main__":
+    main()
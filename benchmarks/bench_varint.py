@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Varint encode/decode: the old byte-at-a-time code vs. the lookup table
+and memoryview reads.
+
+    python benchmarks/bench_varint.py
+"""
+
+from __future__ import print_function
+
+import io
+import random
+import struct
+
+from _support import make_packet, load, bench
+
+
+def legacy_pack_varint(val):
+    total = b''
+    if val < 0:
+        val = (1 << 32) + val
+    while val >= 0x80:
+        bits = val & 0x7F
+        val >>= 7
+        total += struct.pack('B', (0x80 | bits))
+    bits = val & 0x7F
+    total += struct.pack('B', bits)
+    return total
+
+
+def legacy_read_varint(buf):
+    total = 0
+    shift = 0
+    val = 0x80
+    while val & 0x80:
+        val = struct.unpack('B', buf.read(1))[0]
+        total |= ((val & 0x7F) << shift)
+        shift += 7
+    if total & (1 << 31):
+        total = total - (1 << 32)
+    return total
+
+
+rnd = random.Random(1)
+CASES = (
+    ("0-127", [rnd.randint(0, 127) for _ in range(200)]),
+    ("128-16383", [rnd.randint(128, 16383) for _ in range(200)]),
+    ("large", [rnd.randint(16384, 2 ** 31 - 1) for _ in range(200)]),
+    ("negative", [rnd.randint(-2 ** 31, -1) for _ in range(200)]),
+)
+
+
+def main():
+    packet = make_packet()
+    print("(%d values per op)" % len(CASES[0][1]))
+    print("%-10s %-7s %12s %12s %8s" % (
+        "values", "op", "legacy/s", "new/s", "speedup"))
+    for name, values in CASES:
+        encoded = b"".join(legacy_pack_varint(v) for v in values)
+        assert encoded == b"".join(packet.pack_varint(v) for v in values)
+
+        def old_pack():
+            for v in values:
+                legacy_pack_varint(v)
+
+        def new_pack():
+            pack = packet.pack_varint
+            for v in values:
+                pack(v)
+
+        def old_read():
+            buf = io.BytesIO(encoded)
+            for _ in values:
+                legacy_read_varint(buf)
+
+        def new_read():
+            load(packet, encoded)
+            read = packet.read_varint
+            for _ in values:
+                read()
+
+        load(packet, encoded)
+        assert [packet.read_varint() for _ in values] == values
+        for op, old, new in (("pack", old_pack, new_pack),
+                             ("read", old_read, new_read)):
+            before = bench(old, 0.3)
+            after = bench(new, 0.3)
+            print("%-10s %-7s %12.0f %12.0f %7.2fx" % (
+                name, op, before, after, after / before))
+
+
+if __name__ == "__main__":
+    main()
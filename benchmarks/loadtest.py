@@ -0,0 +1,713 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+End-to-end load test: simulated players through a real Proxy.
+
+    python benchmarks/loadtest.py [--players 10,50,100] [--seconds 10]
+        [--entities 10] [--compression 256] [--asyncio]
+        [--no-entity-controls] [--no-direct]
+
+Three parts, all built on `Packet`:
+
+- a stand-in backend server (1.12.2, offline mode).  It answers the
+  proxy's status poll and logins, then replays the traffic of a busy
+  server to every player: the spawn chunks on join, then every tick
+  `--entities` entity moves, now and then a mob spawning and another
+  despawning, a chat line every second and a new chunk every two
+  seconds.
+- the Proxy, in proxy mode with online-mode off, running in a child
+  process so that its CPU time, memory and threads are its own.  The
+  rest of wrapper is stood in for: events always pass and a player
+  object is made at login.
+- the bots.  Each one connects, logs in with the forwarded address and
+  uuid that a Bungee-style front end sends, answers keep alives, and
+  sends its position every tick.
+
+Each tick, the backend sends every player a time update that carries the
+time it was sent, and the bots record how long it took to arrive.  Each
+player count is run straight to the backend and then through the proxy.
+The difference between the two runs is the latency the proxy adds.
+"lag ms" is how late the backend's ticks ran.  The backend writes with
+blocking sockets, so this grows when whatever reads from it (the proxy,
+or the bots) falls behind.  It can also grow when the process running
+the backend and the bots is itself out of CPU.  Compare with the
+"direct" row for the same player count to tell which it is.
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from _support import FakeConnection, timer
+
+from api.wrapperconfig import CONFIG
+from proxy.packets.packet import Packet
+from proxy.packets import mcpackets_cb, mcpackets_sb
+from proxy.utils.constants import *
+from proxy.utils.mcuuid import MCUUID, UUIDS
+
+try:
+    import resource
+except ImportError:
+    resource = False
+
+PROTOCOL = 340
+VERSION = "1.12.2"
+TICK = 0.05
+# seconds of traffic before measuring starts
+WARMUP = 2.0
+
+CB = mcpackets_cb.Packets(PROTOCOL)
+SB = mcpackets_sb.Packets(PROTOCOL)
+LOGIN_DISCONNECT = 0x00
+
+
+def offline_uuid(name):
+    return UUIDS.getuuidfromname(name)
+
+
+def make_chunk(seed):
+    """a chunk column payload, about as compressible as a real one"""
+    sections = bytearray()
+    for section in range(6):
+        # palette-ish: long runs of a few block states, with some noise.
+        noise = os.urandom(512)
+        run = bytes(bytearray([(seed + section) & 0xff] * 1536))
+        sections += run + noise + run
+    # biomes
+    sections += bytes(bytearray([1] * 256))
+    return bytes(sections)
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[int(round(pct / 100.0 * (len(ordered) - 1)))]
+
+
+# The stand-in backend server
+# ---------------------------
+
+class BackendPlayer(object):
+    def __init__(self, packet, name, index):
+        self.packet = packet
+        self.name = name
+        self.index = index
+        # entity ids of this player's mobs
+        self.first_eid = 1000 + index * 1000
+        self.mobs = []
+
+
+class Backend(object):
+    def __init__(self, compression, entities):
+        self.compression = compression
+        self.entities = entities
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(128)
+        self.port = self.listener.getsockname()[1]
+        self.players = []
+        self._lock = threading.Lock()
+        self.abort = False
+        self.chunks = [make_chunk(x) for x in range(8)]
+        # how late ticks ran (seconds), for the whole run
+        self.lag = 0.0
+        self.ticks = 0
+
+    def start(self):
+        for target in (self._accept, self._tick):
+            t = threading.Thread(target=target)
+            t.daemon = True
+            t.start()
+
+    def stop(self):
+        self.abort = True
+        self.listener.close()
+        with self._lock:
+            players, self.players = self.players, []
+        for player in players:
+            _close(player.packet.socket)
+
+    def _accept(self):
+        index = 0
+        while not self.abort:
+            try:
+                sock, _ = self.listener.accept()
+            except socket.error:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            t = threading.Thread(target=self._serve, args=(sock, index))
+            t.daemon = True
+            t.start()
+            index += 1
+
+    def _serve(self, sock, index):
+        packet = Packet(sock, FakeConnection(PROTOCOL))
+        player = None
+        try:
+            packet.grabpacket()
+            state = packet.readpkt([VARINT, STRING, USHORT, VARINT])[3]
+            if state == STATUS:
+                self._status(packet)
+                return
+            packet.grabpacket()
+            name = packet.readpkt([STRING])[0]
+            player = self._login(packet, name, index)
+            # read (and drop) what the player sends until they go.
+            while not self.abort:
+                packet.grabpacket()
+        except (EOFError, socket.error, ValueError):
+            pass
+        finally:
+            if player:
+                with self._lock:
+                    if player in self.players:
+                        self.players.remove(player)
+            _close(sock)
+
+    def _status(self, packet):
+        packet.grabpacket()
+        packet.sendpkt(0x00, [STRING], [json.dumps({
+            "description": {"text": "load test"},
+            "players": {"max": 1000, "online": len(self.players)},
+            "version": {"name": VERSION, "protocol": PROTOCOL}})])
+        packet.flush()
+        pkid, _ = packet.grabpacket()
+        if pkid == 0x01:
+            packet.sendpkt(0x01, [LONG], packet.readpkt([LONG]))
+            packet.flush()
+
+    def _login(self, packet, name, index):
+        if self.compression >= 0:
+            packet.sendpkt(CB.LOGIN_SET_COMPRESSION[PKT], [VARINT],
+                           [self.compression])
+            packet.flush()
+            packet.compressThreshold = self.compression
+        packet.sendpkt(CB.LOGIN_SUCCESS[PKT], [STRING, STRING],
+                       (offline_uuid(name).string, name))
+        player = BackendPlayer(packet, name, index)
+        packet.sendpkt(CB.JOIN_GAME[PKT],
+                       [INT, UBYTE, INT, UBYTE, UBYTE, STRING, BOOL],
+                       (index + 1, 0, 0, 1, 100, "default", False))
+        packet.sendpkt(CB.PLAYER_POSLOOK[PKT],
+                       [DOUBLE, DOUBLE, DOUBLE, FLOAT, FLOAT, BYTE, VARINT],
+                       (8.5, 65.0, 8.5, 0.0, 0.0, 0, 1))
+        # the spawn chunks, 7x7
+        for x in range(-3, 4):
+            for z in range(-3, 4):
+                self._send_chunk(player, x, z)
+        for _ in range(self.entities):
+            self._spawn_mob(player)
+        packet.flush()
+        with self._lock:
+            self.players.append(player)
+        return player
+
+    def _send_chunk(self, player, x, z):
+        data = self.chunks[(x * 7 + z) % len(self.chunks)]
+        # full chunk, all 16 sections, data, no block entities
+        player.packet.sendpkt(
+            CB.CHUNK_DATA[PKT], [INT, INT, BOOL, VARINT, RAW],
+            (x, z, True, 0xffff,
+             _varint(len(data)) + data + b"\x00"))
+
+    def _spawn_mob(self, player):
+        eid = player.first_eid + len(player.mobs) + self.ticks % 500
+        player.mobs.append(eid)
+        # a zombie (type 54): uuid, type, x y z, yaw pitch head, velocity,
+        #  metadata (none).
+        player.packet.sendpkt(
+            CB.SPAWN_MOB[PKT],
+            [VARINT, UUID, VARINT, DOUBLE, DOUBLE, DOUBLE, BYTE, BYTE, BYTE,
+             SHORT, SHORT, SHORT, UBYTE],
+            (eid, MCUUID(int=eid), 54, 10.0, 65.0, 10.0, 0, 0, 0,
+             0, 0, 0, 0xff))
+
+    def _tick(self):
+        start = timer()
+        while not self.abort:
+            self.ticks += 1
+            due = start + self.ticks * TICK
+            delay = due - timer()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.lag = max(self.lag, -delay)
+            with self._lock:
+                players = list(self.players)
+            for player in players:
+                try:
+                    self._tick_player(player)
+                except (socket.error, ValueError):
+                    pass
+
+    def _tick_player(self, player):
+        packet = player.packet
+        tick = self.ticks
+        # time update, carrying the time it was sent (microseconds)
+        packet.sendpkt(CB.TIME_UPDATE[PKT], [LONG, LONG],
+                       (int(timer() * 1000000), tick % 24000))
+        for eid in player.mobs:
+            packet.sendpkt(CB.ENTITY_RELATIVE_MOVE[PKT],
+                           [VARINT, SHORT, SHORT, SHORT, BOOL],
+                           (eid, 40, 0, -40, True))
+        if tick % 20 == player.index % 20:
+            packet.sendpkt(CB.CHAT_MESSAGE[PKT], [JSON, BYTE], (
+                {"text": "<someone> chat line %d for %s" % (tick,
+                                                           player.name)},
+                0))
+        if tick % 40 == player.index % 40 and player.mobs:
+            # a mob despawns and another spawns
+            gone = player.mobs.pop(0)
+            packet.sendpkt(CB.DESTROY_ENTITIES[PKT], [VARINT, VARINT],
+                           (1, gone))
+            self._spawn_mob(player)
+        if tick % 40 == (player.index + 20) % 40:
+            self._send_chunk(player, 4 + tick // 40, 0)
+        packet.flush()
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _close(sock):
+    try:
+        sock.shutdown(2)
+    except socket.error:
+        pass
+    sock.close()
+
+
+# The bots
+# --------
+
+class Bot(object):
+    def __init__(self, swarm, index):
+        self.swarm = swarm
+        self.name = "bot%d" % index
+        self.uuid = offline_uuid(self.name)
+        self.sock = None
+        self.packet = None
+        self.state = LOGIN
+        self.joined = threading.Event()
+        self.disconnected = None
+        self.latencies = []
+        self.packets = 0
+        self.bytes = 0
+
+    def connect(self, port):
+        self.sock = socket.create_connection(("127.0.0.1", port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.packet = Packet(self.sock, FakeConnection(PROTOCOL))
+        # what a Bungee-style front end sends: host, client ip, uuid
+        address = "localhost\x00127.0.0.1\x00%s" % self.uuid.hex
+        self.packet.sendpkt(SB.HANDSHAKE[PKT],
+                            [VARINT, STRING, USHORT, VARINT],
+                            (PROTOCOL, address, port, LOGIN))
+        self.packet.sendpkt(SB.LOGIN_START[PKT], [STRING], [self.name])
+        self.packet.flush()
+        t = threading.Thread(target=self._read)
+        t.daemon = True
+        t.start()
+
+    def _read(self):
+        packet = self.packet
+        try:
+            while True:
+                pkid, frame = packet.grabpacket()
+                if self.state == LOGIN:
+                    self._read_login(pkid)
+                    continue
+                if self.swarm.recording:
+                    self.packets += 1
+                    self.bytes += len(frame)
+                if pkid == CB.TIME_UPDATE[PKT]:
+                    arrived = timer()
+                    sent = packet.readpkt([LONG])[0] / 1000000.0
+                    if self.swarm.recording:
+                        self.latencies.append(arrived - sent)
+                elif pkid == CB.JOIN_GAME[PKT]:
+                    # the backend has the player
+                    self.joined.set()
+                elif pkid == CB.KEEP_ALIVE[PKT]:
+                    packet.sendpkt(SB.KEEP_ALIVE[PKT], [LONG],
+                                   packet.readpkt([LONG]))
+                    packet.flush()
+                elif pkid == CB.DISCONNECT[PKT]:
+                    self.disconnected = packet.readpkt([STRING])[0]
+                    break
+        except (EOFError, socket.error, ValueError) as e:
+            if not self.swarm.stopping and self.disconnected is None:
+                self.disconnected = "connection lost: %s" % e
+        self.joined.set()
+
+    def _read_login(self, pkid):
+        packet = self.packet
+        if pkid == CB.LOGIN_SET_COMPRESSION[PKT]:
+            packet.compressThreshold = packet.readpkt([VARINT])[0]
+        elif pkid == CB.LOGIN_SUCCESS[PKT]:
+            self.state = PLAY
+        elif pkid == LOGIN_DISCONNECT:
+            self.disconnected = packet.readpkt([STRING])[0]
+            raise EOFError("disconnected at login")
+
+    def move(self, tick):
+        self.packet.sendpkt(SB.PLAYER_POSITION[PKT],
+                            [DOUBLE, DOUBLE, DOUBLE, BOOL],
+                            (8.5 + (tick % 40) * 0.1, 65.0, 8.5, True))
+        self.packet.flush()
+
+    def close(self):
+        if self.sock:
+            _close(self.sock)
+
+
+class Swarm(object):
+    def __init__(self, count):
+        self.recording = False
+        self.stopping = False
+        self.bots = [Bot(self, x) for x in range(count)]
+
+    def connect(self, port, timeout=60):
+        """connect every bot.  returns the seconds until all of them had
+        joined the game (or failed)"""
+        start = timer()
+        for bot in self.bots:
+            bot.connect(port)
+        deadline = time.time() + timeout
+        for bot in self.bots:
+            bot.joined.wait(max(0.0, deadline - time.time()))
+        elapsed = timer() - start
+        t = threading.Thread(target=self._move)
+        t.daemon = True
+        t.start()
+        return elapsed
+
+    def _move(self):
+        tick = 0
+        while not self.stopping:
+            tick += 1
+            time.sleep(TICK)
+            for bot in self.bots:
+                if bot.state == PLAY and bot.disconnected is None:
+                    try:
+                        bot.move(tick)
+                    except (socket.error, ValueError):
+                        pass
+
+    def record(self):
+        for bot in self.bots:
+            bot.latencies = []
+            bot.packets = bot.bytes = 0
+        self.recording = True
+
+    def stop(self):
+        self.recording = False
+        self.stopping = True
+        for bot in self.bots:
+            bot.close()
+
+    def results(self):
+        latencies = []
+        for bot in self.bots:
+            latencies.extend(bot.latencies)
+        latencies.sort()
+        return (latencies, sum(bot.packets for bot in self.bots),
+                sum(bot.bytes for bot in self.bots),
+                [bot for bot in self.bots if bot.disconnected is not None])
+
+
+# The proxy, in its own process
+# -----------------------------
+
+class LoadJavaServer(object):
+    def __init__(self, port, serverpath, compression):
+        self.server_port = port
+        self.serverpath = serverpath
+        self.protocolVersion = -1
+        self.version = VERSION
+        self.version_compute = 11202
+        # STARTED
+        self.state = 2
+        self.properties = {"network-compression-threshold": compression}
+        self.motd = "load test"
+        self.servericon = None
+        self.timeofday = 0
+
+    def console(self, command):
+        pass
+
+
+class LoadPlayer(object):
+    """stands in for api.player.Player, which the Client creates"""
+    def __init__(self, username, wrapper):
+        self.username = username
+        self.client = None
+        for client in wrapper.proxy.clients:
+            if client.username == username:
+                self.client = client
+        self.abort = False
+
+
+class LoadEvents(object):
+    """no plugins are listening"""
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+
+    def callevent(self, event, payload, abortable=True):
+        return True
+
+
+class LoadUserCache(object):
+    def __init__(self):
+        self.Data = {}
+
+
+class LoadHaltSig(object):
+    halt = False
+
+
+class LoadWrapper(object):
+    def __init__(self, config, javaserver, log):
+        self.config = config
+        self.javaserver = javaserver
+        self.log = log
+        self.encoding = "utf-8"
+        self.players = {}
+        self.proxy = None
+        self.events = LoadEvents(self)
+        self.wrapper_usercache = LoadUserCache()
+        self.uuids = UUIDS(log, self.wrapper_usercache.Data)
+        self.haltsig = LoadHaltSig()
+        self.mcuuid = MCUUID
+
+
+def process_stats():
+    """(cpu seconds, rss bytes) of this process"""
+    cpu = rss = 0
+    if resource:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = usage.ru_utime + usage.ru_stime
+        rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError, AttributeError):
+        pass
+    return cpu, rss
+
+
+def run_proxy(conn, backend_port, options):
+    """the child process: a Proxy in front of the backend"""
+    from proxy.base import Proxy
+    import proxy.client.clientconnection as clientconnection
+
+    clientconnection.Player = LoadPlayer
+
+    logging.basicConfig(level=logging.WARNING)
+    log = logging.getLogger("loadtest.proxy")
+    serverpath = tempfile.mkdtemp()
+    # wrapper writes ./wrapper-data (entity controls do); keep it out of
+    #  the checkout
+    os.chdir(serverpath)
+    config = copy.deepcopy(CONFIG)
+    config["Proxy"].update({
+        "proxy-enabled": True, "online-mode": False,
+        "proxy-bind": "127.0.0.1", "proxy-port": options["proxy_port"],
+        # every bot comes from 127.0.0.1
+        "connect-rate-per-ip": 0,
+        "asyncio-engine": options["asyncio"],
+        "max-players": 100000})
+    config["Entities"]["enable-entity-controls"] = \
+        options["entity_controls"]
+    javaserver = LoadJavaServer(backend_port, serverpath,
+                                options["compression"])
+    wrapper = LoadWrapper(config, javaserver, log)
+    for x in range(options["players"]):
+        name = "bot%d" % x
+        wrapper.wrapper_usercache.Data[offline_uuid(name).string] = {
+            "localname": name}
+    proxy = Proxy(wrapper)
+    wrapper.proxy = proxy
+    t = threading.Thread(target=proxy.host)
+    t.daemon = True
+    t.start()
+    try:
+        while True:
+            command = conn.recv()
+            if command == "stats":
+                cpu, rss = process_stats()
+                conn.send((cpu, rss, threading.active_count(),
+                           len(proxy.clients)))
+            elif command == "stop":
+                break
+    finally:
+        proxy.abort = True
+        wrapper.haltsig.halt = True
+        shutil.rmtree(serverpath, ignore_errors=True)
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 1).close()
+            return True
+        except socket.error:
+            time.sleep(0.2)
+    return False
+
+
+# Running it
+# ----------
+
+def run(players, seconds, options, through_proxy):
+    backend = Backend(options["compression"], options["entities"])
+    backend.start()
+    port = backend.port
+    child = conn = None
+    if through_proxy:
+        port = options["proxy_port"] = free_port()
+        options["players"] = players
+        conn, child_conn = multiprocessing.Pipe()
+        child = multiprocessing.Process(target=run_proxy, args=(
+            child_conn, backend.port, options))
+        child.daemon = True
+        child.start()
+        if not wait_for_port(port):
+            child.terminate()
+            backend.stop()
+            raise RuntimeError("the proxy did not start")
+        # (wait_for_port's connection was not a login; let it go)
+        time.sleep(0.5)
+
+    swarm = Swarm(players)
+    login = swarm.connect(port)
+    time.sleep(WARMUP)
+    backend.lag = 0.0
+    if conn:
+        conn.send("stats")
+        cpu_start = conn.recv()[0]
+    swarm.record()
+    start = timer()
+    time.sleep(seconds)
+    elapsed = timer() - start
+    swarm.recording = False
+    result = {"login": login, "lag": backend.lag}
+    if conn:
+        conn.send("stats")
+        cpu, rss, threads, clients = conn.recv()
+        result.update(cpu=(cpu - cpu_start) / elapsed, rss=rss,
+                      threads=threads, clients=clients)
+    latencies, packets, nbytes, dropped = swarm.results()
+    result.update(latencies=latencies, pps=packets / elapsed,
+                  bps=nbytes / elapsed, dropped=dropped)
+    swarm.stop()
+    backend.stop()
+    if child:
+        conn.send("stop")
+        child.join(5)
+        if child.is_alive():
+            child.terminate()
+    return result
+
+
+def report_line(players, mode, result):
+    ordered = result["latencies"]
+    cpu = rss = threads = "-"
+    if "cpu" in result:
+        cpu = "%.0f%%" % (result["cpu"] * 100)
+        rss = "%.0f" % (result["rss"] / 1048576.0)
+        threads = "%d" % result["threads"]
+    print("%7d %-6s %7.1f %7.2f %7.2f %7.2f %7.1f %9.0f %7.2f %6s %6s "
+          "%7s %7.0f %5d" % (
+              players, mode, result["login"],
+              percentile(ordered, 50) * 1000, percentile(ordered, 95) * 1000,
+              percentile(ordered, 99) * 1000,
+              (ordered[-1] if ordered else 0) * 1000,
+              result["pps"], result["bps"] / 1048576.0, cpu, rss, threads,
+              result["lag"] * 1000, len(result["dropped"])))
+    for bot in result["dropped"][:3]:
+        print("        %s: %s" % (bot.name, bot.disconnected))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--players", default="10,50,100",
+                        help="player counts to run (comma separated)")
+    parser.add_argument("--seconds", type=float, default=10,
+                        help="seconds measured for each player count")
+    parser.add_argument("--entities", type=int, default=10,
+                        help="moving entities each player is sent")
+    parser.add_argument("--compression", type=int, default=256,
+                        help="network compression threshold (-1 is off)")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="run the proxy's asyncio engine")
+    parser.add_argument("--no-entity-controls", action="store_true",
+                        help="turn off the proxy's entity tracking")
+    parser.add_argument("--no-direct", action="store_true",
+                        help="skip the runs straight to the backend")
+    args = parser.parse_args()
+    options = {"compression": args.compression, "entities": args.entities,
+               "asyncio": args.asyncio,
+               "entity_controls": not args.no_entity_controls}
+
+    print("%s seconds per run; %d moving entities per player; compression "
+          "%d; %s engine" % (args.seconds, args.entities, args.compression,
+                             "asyncio" if args.asyncio else "thread"))
+    print("latency is backend -> bot, in ms.  cpu is the proxy process "
+          "(100% = one core).\n")
+    print("%7s %-6s %7s %7s %7s %7s %7s %9s %7s %6s %6s %7s %7s %5s" % (
+        "players", "path", "login s", "p50", "p95", "p99", "max", "pkts/s",
+        "MB/s", "cpu", "rss MB", "threads", "lag ms", "drop"))
+    for players in [int(x) for x in args.players.split(",")]:
+        direct = None
+        if not args.no_direct:
+            direct = run(players, args.seconds, options, False)
+            report_line(players, "direct", direct)
+        proxied = run(players, args.seconds, options, True)
+        report_line(players, "proxy", proxied)
+        if direct and direct["latencies"] and proxied["latencies"]:
+            added = tuple((percentile(proxied["latencies"], pct) -
+                           percentile(direct["latencies"], pct)) * 1000
+                          for pct in (50, 95, 99))
+            print("%7s added by the proxy: p50 %.2f ms, p95 %.2f ms, "
+                  "p99 %.2f ms" % (("",) + added))
+
+
+if __name__ == "__main__":
+    main()
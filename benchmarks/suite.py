@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Benchmark suite for the hot paths in proxy/packets/packet.py.
+
+    python benchmarks/suite.py                   # print a table
+    python benchmarks/suite.py -o build-29.json  # also save JSON results
+    python benchmarks/suite.py --compare build-28.json
+
+Every case drives a `Packet` against in-memory stand-ins (no network).
+For each case the results hold operations per second and, on Python 3,
+the peak and retained bytes allocated by a single operation
+(tracemalloc).  Compare JSON files from two builds to spot regressions.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import random
+import struct
+import sys
+import time
+import uuid
+import zlib
+
+from _support import make_packet, load, bench
+
+from proxy.utils.constants import *
+from proxy.packets.packetstats import PacketStats
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = False
+
+try:
+    from proxy.utils.encryption import aes128cfb8
+except ImportError:
+    aes128cfb8 = False
+
+try:
+    from core.buildinfo import __version__ as wrapper_version
+except ImportError:
+    wrapper_version = None
+
+rnd = random.Random(29)
+
+VARINTS = [rnd.choice((rnd.randint(0, 127), rnd.randint(128, 16383),
+                       rnd.randint(16384, 2 ** 31 - 1),
+                       rnd.randint(-2 ** 31, -1))) for _ in range(100)]
+
+# a zombie-ish 1.12 metadata set
+METADATA_1_9 = {
+    0: (0, 0),
+    1: (1, 300),
+    2: (3, "Steve's zombie"),
+    3: (6, True),
+    4: (6, False),
+    5: (6, False),
+    6: (0, 0),
+    7: (2, 20.0),
+    8: (1, 0),
+    9: (6, False),
+    10: (1, 0),
+    12: (6, False),
+    13: (1, 0),
+    14: (6, False),
+    15: (8, (100, 64, -200)),
+    16: (7, (0.0, 45.0, 0.0)),
+}
+
+METADATA = {
+    0: (0, 0),
+    1: (1, 300),
+    2: (4, "Steve's zombie"),
+    3: (0, 1),
+    6: (3, 20.0),
+    7: (2, 0),
+    8: (0, 0),
+    17: (6, (100, 64, -200)),
+}
+
+# an enchanted, renamed sword
+NBT = {"type": 10, "name": "", "value": [
+    {"type": 9, "name": "ench", "value": [
+        {"type": 10, "name": "", "value": [
+            {"type": 2, "name": "id", "value": 16},
+            {"type": 2, "name": "lvl", "value": 5}]},
+        {"type": 10, "name": "", "value": [
+            {"type": 2, "name": "id", "value": 34},
+            {"type": 2, "name": "lvl", "value": 3}]}]},
+    {"type": 10, "name": "display", "value": [
+        {"type": 8, "name": "Name", "value": "Widowmaker"}]},
+    {"type": 3, "name": "RepairCost", "value": 7},
+]}
+
+SLOT = {"id": 276, "count": 1, "damage": 0, "nbt": NBT}
+
+# what a server sends in a busy moment: mostly small movement packets
+#  and a few big ones (chunks).
+STREAM = [(0x26, os.urandom(rnd.choice((8, 16, 24, 40))))
+          for _ in range(96)] + [(0x20, bytes(bytearray(
+            rnd.choice((0, 1, 1, 2, 9)) for _ in range(20000))))
+                                 for _ in range(4)]
+rnd.shuffle(STREAM)
+
+
+def codec_cases():
+    packet = make_packet()
+
+    def varint_encode():
+        pack = packet.pack_varint
+        for value in VARINTS:
+            pack(value)
+
+    varints = b"".join(packet.pack_varint(value) for value in VARINTS)
+
+    def varint_decode():
+        load(packet, varints)
+        read = packet.read_varint
+        for _ in VARINTS:
+            read()
+
+    yield "varint_encode_x100", varint_encode
+    yield "varint_decode_x100", varint_decode
+
+    meta19 = packet.send_metadata_1_9(METADATA_1_9)
+    meta = packet.send_metadata(METADATA)
+    slot = packet.send_slot(SLOT)
+    tag = packet.send_tag(NBT)
+    for name, data, read, send, value in (
+            ("metadata_1_9", meta19, packet.read_metadata_1_9,
+             packet.send_metadata_1_9, METADATA_1_9),
+            ("metadata", meta, packet.read_metadata,
+             packet.send_metadata, METADATA),
+            ("slot", slot, packet.read_slot, packet.send_slot, SLOT),
+            ("nbt_tag", tag, packet.read_tag, packet.send_tag, NBT)):
+        # sanity check: the encoding round trips
+        load(packet, data)
+        decoded = read()
+        load(packet, send(decoded))
+        assert read() == decoded, name
+
+        def do_read(data=data, read=read):
+            load(packet, data)
+            read()
+
+        def do_send(send=send, value=value):
+            send(value)
+
+        yield "read_" + name, do_read
+        yield "send_" + name, do_send
+
+    def skip_metadata_1_9():
+        load(packet, meta19)
+        packet.read_metadata_1_9(skip=True)
+
+    yield "skip_metadata_1_9", skip_metadata_1_9
+
+    # a 1.12 spawn mob packet, as play_spawn_mob() parses it
+    spawn_mob = [VARINT, UUID, UBYTE, DOUBLE, DOUBLE, DOUBLE, BYTE, BYTE,
+                 BYTE, REST]
+    body = b"".join((packet.send_varint(1234), uuid.uuid4().bytes, b"\x36",
+                     struct.pack(">dddbbb", 1.0, 64.0, -20.5, 0, 90, 0),
+                     b"\x00" * 6, meta19))
+
+    def readpkt_spawn_mob():
+        load(packet, body)
+        packet.readpkt(spawn_mob)
+
+    def view_spawn_mob_eid():
+        load(packet, body)
+        packet.view("eid uuid type_ x y z pitch yaw head rest",
+                    spawn_mob).eid
+
+    yield "readpkt_spawn_mob", readpkt_spawn_mob
+    yield "view_spawn_mob_eid", view_spawn_mob_eid
+
+
+def _stream(compressed, cipher):
+    """frame STREAM the way a server would send it"""
+    packet = make_packet()
+    packet.compressThreshold = 256 if compressed else -1
+    for pkid, body in STREAM:
+        packet.send_raw(packet.send_varint(pkid) + body)
+    data = b"".join(packet.take_queued()[1])
+    if cipher:
+        data = cipher.encryptor().update(data)
+    return data
+
+
+def grab_cases():
+    for compressed in (False, True):
+        for encrypted in (False, True):
+            if encrypted and not aes128cfb8:
+                continue
+            cipher = aes128cfb8(os.urandom(16)) if encrypted else None
+            data = _stream(compressed, cipher)
+
+            def grab(data=data, cipher=cipher, compressed=compressed):
+                packet = make_packet()
+                packet.compressThreshold = 256 if compressed else -1
+                if cipher:
+                    packet.recvCipher = cipher.decryptor()
+                packet.socket.feed(data)
+                for _ in STREAM:
+                    packet.grabpacket()
+
+            yield "grabpacket_x100%s%s" % (
+                "_compressed" if compressed else "",
+                "_encrypted" if encrypted else ""), grab
+
+    # the cost of "packet-stats" (compare with grabpacket_x100)
+    data = _stream(False, None)
+    stats = PacketStats()
+
+    def grab_stats():
+        packet = make_packet()
+        packet.stats = stats
+        packet.direction = "CB"
+        packet.socket.feed(data)
+        for _ in STREAM:
+            packet.grabpacket()
+
+    yield "grabpacket_x100_stats", grab_stats
+
+
+def flush_cases():
+    for compressed in (False, True):
+        for encrypted in (False, True):
+            if encrypted and not aes128cfb8:
+                continue
+            packet = make_packet()
+            packet.compressThreshold = 256 if compressed else -1
+            if encrypted:
+                packet.sendCipher = aes128cfb8(os.urandom(16)).encryptor()
+            payloads = [packet.send_varint(pkid) + body
+                        for pkid, body in STREAM]
+
+            def flush(packet=packet, payloads=payloads):
+                for payload in payloads:
+                    packet.send_raw(payload)
+                packet.flush()
+
+            yield "flush_x100%s%s" % (
+                "_compressed" if compressed else "",
+                "_encrypted" if encrypted else ""), flush
+
+
+def broadcast_cases():
+    # one chat message to 150 players, as chat_to_client() sends it to
+    #  each of them and as Proxy.broadcast_chat() does.
+    packets = []
+    for _ in range(150):
+        packet = make_packet()
+        packet.compressThreshold = 256
+        packets.append(packet)
+    message = {"text": "Server restarting in 5 minutes! " * 10,
+               "color": "gold"}
+    args = [JSON, BYTE]
+
+    def sendpkt_each():
+        for packet in packets:
+            packet.sendpkt(0x0f, args, (message, 0))
+            packet.take_queued()
+
+    def framed_once():
+        first = packets[0]
+        frame = first.frame(first.encodepkt(0x0f, args, (message, 0)))
+        for packet in packets:
+            packet.send_framed(frame)
+            packet.take_queued()
+
+    yield "broadcast_sendpkt_x150", sendpkt_each
+    yield "broadcast_framed_x150", framed_once
+
+
+def allocations(func, rounds=5):
+    """average (peak, retained) bytes allocated by one call of `func`"""
+    if not tracemalloc:
+        return None, None
+    func()
+    peak = retained = 0
+    for _ in range(rounds):
+        tracemalloc.start()
+        func()
+        current, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak += top
+        retained += current
+    return peak // rounds, retained // rounds
+
+
+def run(seconds, only=None):
+    results = {}
+    for cases in (codec_cases, grab_cases, flush_cases,
+                  broadcast_cases):
+        for name, func in cases():
+            if only and only not in name:
+                continue
+            peak, retained = allocations(func)
+            results[name] = {
+                "ops_per_sec": round(bench(func, seconds), 1),
+                "peak_bytes_per_op": peak,
+                "retained_bytes_per_op": retained,
+            }
+            print("%-38s %12.1f ops/s %10s B peak" % (
+                name, results[name]["ops_per_sec"],
+                "-" if peak is None else peak))
+    return results
+
+
+def compare(results, filename):
+    with open(filename) as f:
+        old = json.load(f)
+    print("\ncompared to %s (wrapper %s):" % (
+        filename, old.get("wrapper_version")))
+    for name in sorted(results):
+        if name not in old["results"]:
+            continue
+        before = old["results"][name]["ops_per_sec"]
+        after = results[name]["ops_per_sec"]
+        print("%-38s %7.2fx%s" % (
+            name, after / before,
+            "  <-- slower" if after < before * 0.9 else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("-o", "--output", help="write JSON results here")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    parser.add_argument("--seconds", type=float, default=0.5,
+                        help="time spent on each case (default 0.5)")
+    parser.add_argument("--only", help="run cases whose name contains this")
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.only)
+    report = {
+        "wrapper_version": wrapper_version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "zlib": zlib.ZLIB_VERSION,
+        "time": int(time.time()),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -222,9 +222,7 @@ class API(object):
         if not self.internal:
             self.wrapper.log.debug("[%s] Registered event '%s'",
                                    self.name, eventname)
-        if self.id not in self.wrapper.events:
-            self.wrapper.events[self.id] = {}
-        self.wrapper.events[self.id][eventname] = callback
+        self.wrapper.events.register(self.id, eventname, callback)
 
     def registerPermission(self, permission=None, value=False):
         """
@@ -33,11 +33,17 @@ class EntityControl(object):
     def __init__(self, proxy):
         pass
 
-    def getEntityByEID(self, eid):
+    def getEntityByEID(self, eid, playername=None):
         """
         Returns the entity context or False if the specified entity
         ID doesn't exist.
 
+        :Args:
+            :eid: Entity EID on server
+            :playername: the player in whose world the entity is.  Entity
+             ids are only unique per player; without a name, the first
+             player found with that eid is used.
+
         CAUTION understand that entities are very DYNAMIC.  The
         entity object you get could be modified or even deleted
         at any time!
@@ -52,6 +58,14 @@ class EntityControl(object):
         """
         pass
 
+    def countEntityTypesInPlayer(self, playername):
+        """
+        returns a dictionary of how many of each kind of entity exist in
+        a player's client, like {"Cow": 12, "Zombie": 3}.
+
+        """
+        pass
+
     def countEntitiesInPlayer(self, playername):
         """
         returns a list of entity info dictionaries
@@ -76,10 +90,10 @@ class EntityControl(object):
         """
         pass
 
-    def getEntityInfo(self, eid):
+    def getEntityInfo(self, eid, playername=None):
         """
         Get a dictionary of info on the specified EID.  Returns
-        None if fails
+        None if fails (see getEntityByEID for `playername`)
 
         :Sample item:
             .. code:: python
@@ -112,14 +126,16 @@ class EntityControl(object):
         """
         pass
 
-    def existsEntityByEID(self, eid):
+    def existsEntityByEID(self, eid, playername=None):
         """
-        Test whether the specified eid is valid
+        Test whether the specified eid is valid (see getEntityByEID for
+        `playername`)
 
         """
         pass
 
-    def killEntityByEID(self, eid, dropitems=False, count=1):
+    def killEntityByEID(self, eid, dropitems=False, count=1,
+                        playername=None):
         """
         Takes the entity by eid and kills the first entity of
         that type centered at the coordinates where that entity is.
@@ -130,6 +146,40 @@ class EntityControl(object):
              loot.  Only works if gamerule doMobDrops is true.
             :count: used to specify more than one entity; again,
              centers on the specified eid location.
+            :playername: the player in whose world the eid is.
+
+        """
+        pass
+
+    def entities_within(self, position, radius, type=None, playername=None):
+        """
+        Returns a list of the entities within `radius` blocks of
+        `position` (x, y, z).  Only the chunks within the radius are
+        looked at.
+
+        :Args:
+            :position: (x, y, z) centre
+            :radius: in blocks
+            :type: only entities of this name ("Cow") or type number
+            :playername: the player in whose world to look.  Without a
+             name, every player's world is searched (an entity seen by
+             two players is then listed twice, with their two eids).
+
+        """
+        pass
+
+    def chunk_density(self, playername=None, type=None):
+        """
+        Returns a dictionary of how many entities are in each chunk,
+        like {(chunk x, chunk z): 37}, to find mob farms and other
+        hotspots.  Chunks with none are left out.
+
+        :Args:
+            :playername: the player in whose world to count.  Without a
+             name, each chunk gets the highest count any player has for
+             it (players near the same chunk see the same entities).
+            :type: only count entities of this name ("Cow") or type
+             number
 
         """
         pass
@@ -154,6 +154,53 @@ class Minecraft(object):
         else:
             return ClientBound(version)
 
+    def getPacketStats(self, playername=None, top=None):
+        """
+        Get the proxy's per packet id counters (Proxy config item
+        "packet-stats" must be enabled).
+
+        :Args:
+            :playername: Only this (connected) player's packets.  If not
+             specified, the totals for every player since the proxy
+             started.
+            :top: Return only this many rows (the ones with the most
+             bytes).
+
+        :returns: A list of dicts, most bytes first:
+            {"direction": "CB" or "SB", "state": "PLAY", "id": "0x20",
+            "name": "CHUNK_DATA", "count": packets, "bytes": bytes
+            received (compressed), "raw_bytes": uncompressed bytes,
+            "parse_ms": milliseconds spent in wrapper's parser}
+
+            None if the player is not connected.  False if not in
+            proxy mode.
+
+        """
+        if not self.wrapper.proxymode:
+            return False
+        return self.wrapper.proxy.getpacketstats(playername, top)
+
+    def getConnectionCounters(self):
+        """
+        Get the proxy's counts of incoming connections.
+
+        :returns: A dict of counters:
+            "accepted", "busy" (refused; too many handshakes at once),
+            "rate_limited" (refused; too many connections from one IP),
+            "banned" (refused; silent IP ban), "handshaking" (waiting on
+            their handshake now), "status", "pings", "logins", "legacy",
+            "timeouts", "errors", "status_cache_hits",
+            "status_cache_misses", and for session server checks of
+            logins, "session_requests", "session_rejected" and
+            "session_errors".
+
+            False if not in proxy mode.
+
+        """
+        if not self.wrapper.proxymode:
+            return False
+        return self.wrapper.proxy.getconnectioncounters()
+
     def getTimeofDay(self, dttmformat=0):
         """
         get the "virtual" world time of day on the server.
@@ -297,9 +344,6 @@ class Minecraft(object):
             :self.entityControl:
              config["Entities"]["enable-entity-controls"]
 
-            :self.entityProcessorFrequency:
-             config["Entities"]["entity-update-frequency"]
-
             :self.thiningFrequency:
              config["Entities"]["thinning-frequency"]
 
@@ -308,17 +352,25 @@ class Minecraft(object):
 
         :See api.entity for more about these methods:
 
-                def killEntityByEID(self, eid, dropitems=False, count=1)
+                def killEntityByEID(self, eid, dropitems=False, count=1,
+                                    playername=None)
 
-                def existsEntityByEID(self, eid)
+                def existsEntityByEID(self, eid, playername=None)
 
-                def getEntityInfo(self, eid)
+                def getEntityInfo(self, eid, playername=None)
 
                 def countEntitiesInPlayer(self, playername)
 
+                def countEntityTypesInPlayer(self, playername)
+
                 def countActiveEntities(self)
 
-                def getEntityByEID(self, eid)
+                def getEntityByEID(self, eid, playername=None)
+
+                def entities_within(self, position, radius, type=None,
+                                    playername=None)
+
+                def chunk_density(self, playername=None, type=None)
 
 
         """
@@ -520,7 +572,10 @@ class Minecraft(object):
         :returns: Nothing; succeeds or fails with no programmatic indication.
 
         """
-        self.getServer().broadcast(self, jsonmessage, who=destination)
+        if self.wrapper.proxymode and destination == "@a":
+            self.wrapper.proxy.broadcast_chat(jsonmessage)
+            return
+        self.getServer().broadcast(jsonmessage, who=destination)
 
     def broadcast(self, message="", irc=False):
         """
@@ -536,12 +591,19 @@ class Minecraft(object):
 
         :returns:  Nothing
 
+        In proxy mode, the chat packet is built once (per client
+        version) and sent straight to every player on this server by
+        the proxy.
+
         """
         if irc:
             try:
                 self.wrapper.irc.msgQueue.append(message)
             except Exception:
                 pass
+        if self.wrapper.proxymode:
+            self.wrapper.proxy.broadcast_chat(message)
+            return
         try:
             self.wrapper.javaserver.broadcast(message)
         except Exception:
@@ -864,11 +926,11 @@ class Minecraft(object):
         Ban an ip address using the wrapper proxy system. Messages
         generated by process can be directed to a particular player's
         client or to the Console (default). Ban will fail if it is not
-        a valid ip4 address.
+        a valid ip4 address (or network, like "10.1.0.0/16").
 
         :args:
 
-                :ipaddress: IP address to ban
+                :ipaddress: IP address (or CIDR network) to ban
                 :reason: Optional text reason
                 :source: Source (author/op) of ban.
                 :expires: Optional expiration in time.time() format.
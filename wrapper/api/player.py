@@ -68,8 +68,8 @@ class Player(object):
     proxy mode implementations and the proxy client instance.
     Player creation happens at one of two points:
      1) Proxy - at the player.preLogin event when the client first joins
-     the wrapper proxy.  It is created by core.events.py in response to
-     player.pre-Login's missing player argument.
+     the wrapper proxy.  It is created by the proxy client just before
+     player.preLogin is called.
      2) Non-proxy - Created at the player.login event when they join the
      local server.
 
@@ -476,6 +476,40 @@ class Player(object):
             # Non-proxy mode:
             return 0
 
+    def getSendQueues(self):
+        """
+        Get how far behind the player's connections are.
+
+        :Proxymode only:  Wrapper queues packets for the client and for
+         the server, and flushes them as fast as each socket takes them.
+         If a queue grows past the "send-queue-high-kb" config setting,
+         wrapper stops reading from the other side of the connection
+         until the queue drains ("throttled").
+
+        :returns: A dictionary with "client" and "server" items (the
+         server item is None if the player is not connected to a server).
+         Each is a dictionary of:
+
+             :packets: number of packets queued.
+             :bytes: bytes queued or being sent.
+             :throttled: True if the queue is over its high mark.
+             :high_water: the high mark, in bytes (0 is no limit).
+             :low_water: the low mark, in bytes.
+
+         Returns None in non-proxy mode.
+
+        """
+        try:
+            client = self.client
+            queues = {"client": client.packet.queue_depth(), "server": None}
+        except AttributeError:
+            # Non-proxy mode:
+            return None
+        server = client.server_connection
+        if server and server.packet:
+            queues["server"] = server.packet.queue_depth()
+        return queues
+
     def setGamemode(self, gamemode=0):
         """
         Sets the user's gamemode.
@@ -152,11 +152,9 @@ CONFIG = {
 
             "enable-entity-controls": False,
 
-         # how often the entity processor updates world entity counts
+            "entity-update-frequency": "deprecated",  # entities are dropped as soon as their client leaves, changes servers or respawns.  # NODOC
 
-            "entity-update-frequency": 4,
-
-         # how often thinning of mobs runs, in seconds.  a large difference between this and the entity update frequency will ensure no 'overkill" occurs.
+         # how often thinning of mobs runs, in seconds.
 
             "thinning-frequency": 30,
 
@@ -355,9 +353,75 @@ CONFIG = {
 
             "max-players": 1024,
 
-         # Flush rate sets the interval for packet flushing.  This is a fine-tuning mechanism. 50 Ms is one minecraft tick.  Faster (smaller) rates result in dropped items disappearing.  Larger values can create jerkiness or lag, but result in more reliable transmission.  This is a fine tuning that may be different for each server based on the number of plugins, whether the server is hub, etc.. 50-100 is recommended for most servers.  Hub servers with limited play can be set at 10.
+         # Packets are sent as soon as they are queued; packets queued while a write is in progress go out together in the next write.  Flush max delay (in milliseconds) makes the sender wait that long after a packet is queued before writing, so more packets join it, at the cost of that much added latency on every packet.  0 (recommended) does not wait.  Keep this well under 50 (one minecraft tick).
+
+            "flush-max-delay-ms": 0,
+
+         # Send queue limits for each connection, in KB.  When more than send-queue-high-kb is waiting to be sent to a player (or to the server), wrapper stops reading from the other side of the connection until the queue is down to send-queue-low-kb.  This keeps a player on a slow link from filling wrapper's memory.  0 turns the limit off.
+
+            "send-queue-high-kb": 4096,
+
+            "send-queue-low-kb": 1024,
+
+         # If a send queue stays over its high mark for this many seconds, the slow side is disconnected.  0 disconnects as soon as the high mark is passed, without throttling first.
+
+            "send-queue-stall-seconds": 30,
+
+         # Count packets, bytes and parser time per packet id for each player.  See `/wrapper stats packets` and api.minecraft.getPacketStats().  Cheap enough to leave on; turn off to save a little CPU.
+
+            "packet-stats": True,
+
+         # Seconds the server list (status ping) response is reused for.  It is rebuilt sooner when a player logs in or out.  0 rebuilds it for every ping.
+
+            "status-cache-seconds": 30,
+
+         # New connections allowed from one IP address at once, refilled at connect-rate-per-ip per second.  Connections over the limit are closed right away.  A connect-rate-per-ip of 0 turns the limit off.
+
+            "connect-burst-per-ip": 10,
+
+            "connect-rate-per-ip": 1.0,
+
+         # Most connections that may be waiting on their handshake (or server list ping) at once.  0 is unlimited.
+
+            "max-handshakes": 256,
+
+         # Online mode logins are checked with the session server on a pool of this many threads, over kept-alive connections.
+
+            "session-workers": 8,
+
+            "session-cache-seconds": "deprecated",  # every login is checked; an answer can't safely be reused for another login.  # NODOC
+
+         # The session server's base URL (the hasJoined check is made under it).  Only change this to test against a stand-in server.
+
+            "session-server": "https://sessionserver.mojang.com",
+
+         # zlib compression level (1-9) for packets the proxy compresses for clients.  1 is fastest, 9 sends the fewest bytes; -1 is zlib's default (6).  Packets passed through unchanged are never recompressed.
+
+            "compression-level": -1,
+
+         # compression level for packets sent to the Minecraft server(s).  If they are on this machine or the LAN, bandwidth is cheap and 1 (fastest) saves CPU.
+
+            "backend-compression-level": -1,
+
+         # Packets of at least this many bytes (mostly chunk data) are compressed on a shared pool of worker threads, so one player loading terrain does not hold up the packets queued behind them.  0 disables this.
+
+            "zlib-offload-bytes": 32768,
+
+         # Number of threads in that pool.  Requires Python 3 (or the 'futures' package on Python 2).
+
+            "zlib-workers": 2,
+
+         # Run proxy connections as coroutines on asyncio event loops, instead of several threads per player.  Requires Python 3.5 or later.  Packet parsers and plugin events still run on a small thread pool.
+
+            "asyncio-engine": False,
+
+         # The number of asyncio event loops (each runs in its own thread).  Players are spread across them.
+
+            "asyncio-workers": 1,
+
+         # The number of threads each asyncio worker uses to run packet parsers and plugin events.
 
-            "flush-rate-ms": 50,
+            "asyncio-parser-threads": 8,
 
          # Auto name changes causes wrapper to automatically change the player's server name.  Enabling this makes name change handling automatic, but will prevent setting your own custom names on the server.
 
@@ -408,6 +472,7 @@ CONFIG = {
                 },
 
             "proxy-sub-world": "deprecated",  # This was staged and never used  # NODOC
+            "flush-rate-ms": "deprecated",  # packets are flushed when queued now; see flush-max-delay-ms  # NODOC
             "server-port": "deprecated", # This port is autoconfigured from server console output now.  # NODOC
             "spigot-mode": "deprecated", # Wrapper now uses a compatible format for logins  # NODOC
             "convert-player-files": "deprecated",  # this is an option under /whitelist  # NODOC
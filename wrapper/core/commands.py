@@ -368,22 +368,25 @@ class Commands(object):
                 eid, dropitems=False, count=count)
             return
         elif commargs[0].lower() in ("l", "list", "sh", "show" "all"):
+            # {player: {eid: name}} - eids are only unique per player.
             nice_list = {}
-            for ent in entitycontrol.entities:
-                nice_list[entitycontrol.entities[
-                    ent].eid] = entitycontrol.entities[ent].entityname
+            for store in list(entitycontrol.stores.values()):
+                nice_list[store.clientname] = dict(
+                    (eid, ent.entityname)
+                    for eid, ent in list(store.entities.items()))
             player.message("Entities: \n%s" % nice_list)
             return
         elif commargs[0].lower() in ("p", "player", "name"):
             if len(commargs) < 3:
                 player.message("&c/entity player <name> count/list")
                 return
-            them = entitycontrol.countEntitiesInPlayer(commargs[1])
             if commargs[2].lower() in ("l", "list", "sh", "show" "all"):
+                them = entitycontrol.countEntitiesInPlayer(commargs[1])
                 player.message("Entities: \n%s" % json.dumps(them, indent=2))
             else:
+                counts = entitycontrol.countEntityTypesInPlayer(commargs[1])
                 player.message("%d entities exist in %s's client." %
-                               (len(them), commargs[1]))
+                               (sum(counts.values()), commargs[1]))
             return
 
         player.message("&cUsage: /entity count")
@@ -454,6 +457,16 @@ class Commands(object):
                         "&cError: Couldn't retrieve memory usage for an "
                         "unknown reason"
                     )
+            elif subcommand == "stats":
+                statstype = getargs(payload["args"], 1).lower()
+                if statstype == "packets":
+                    self._show_packet_stats(player,
+                                            getargs(payload["args"], 2))
+                elif statstype == "connections":
+                    self._show_connection_counters(player)
+                else:
+                    player.message("&cUsage: /wrapper stats <packets "
+                                   "[player]|connections>")
         else:
             player.message(
                 {"text": "Wrapper.py Version %s" % buildstring,
@@ -461,6 +474,41 @@ class Commands(object):
             )
         return
 
+    def _show_packet_stats(self, player, playername):
+        rows = self.wrapper.api.minecraft.getPacketStats(playername or None,
+                                                         top=15)
+        if rows is False:
+            player.message("&cPacket stats are only kept in proxy mode.")
+            return
+        if rows is None:
+            player.message("&c%s is not connected." % playername)
+            return
+        if not rows and not self.config["Proxy"]["packet-stats"]:
+            player.message("&cPacket stats are disabled (Proxy config item"
+                           " 'packet-stats').")
+            return
+        player.message("&6----- Top packets by bytes received (%s) -----" % (
+            playername or "all players"))
+        player.message("&7dir state id   name: count, bytes (raw), parse ms")
+        for row in rows:
+            amount, units = format_bytes(row["bytes"])
+            raw, rawunits = format_bytes(row["raw_bytes"])
+            player.message(
+                "&7%s %s %s &e%s:&6 %d, %s %s (%s %s), %.1f ms" % (
+                    row["direction"], row["state"], row["id"], row["name"],
+                    row["count"], amount, units, raw, rawunits,
+                    row["parse_ms"]))
+
+    def _show_connection_counters(self, player):
+        counters = self.wrapper.api.minecraft.getConnectionCounters()
+        if counters is False:
+            player.message("&cConnection counters are only kept in proxy"
+                           " mode.")
+            return
+        player.message("&6----- Proxy connections -----")
+        for name in sorted(counters):
+            player.message("&e%s:&6 %s" % (name, counters[name]))
+
     def command_reload(self, player, payload):
         if not player.isOp() > 3:
             player.message("&cPermission Denied")
@@ -5,7 +5,7 @@
 # This program is distributed under the terms of the GNU
 # General Public License, version 3 or later.
 
-from collections import deque
+from collections import deque, OrderedDict
 import threading
 import time
 
@@ -18,7 +18,13 @@ class Events(object):
         self.wrapper = wrapper
         self.log = wrapper.log
         self.listeners = []
-        self.events = {}
+        # {plugin id: {event name: callback}}, in plugin load order
+        self.events = OrderedDict()
+        # {event name: [(plugin id, callback), ...]}, built from
+        #  self.events, so firing an event only looks at its own listeners.
+        #  Lists are replaced, never changed, so a running event can go
+        #  on iterating the one it got.
+        self._index = {}
 
         self.event_queue = deque([])
         t = threading.Thread(target=self._event_processor,
@@ -35,17 +41,46 @@ class Events(object):
         if not type(index) == str:
             raise Exception("A string must be passed - got %s" % type(index))
         self.events[index] = value
+        self._reindex()
         return self.events[index]
 
     def __delitem__(self, index):
         if not type(index) == str:
             raise Exception("A string must be passed - got %s" % type(index))
         del self.events[index]
+        self._reindex()
 
     def __iter__(self):
         for i in self.events:
             yield i
 
+    def register(self, plugin_id, event, callback):
+        """register a plugin's callback for an event (api.registerEvent)"""
+        if plugin_id not in self.events:
+            self.events[plugin_id] = {}
+        self.events[plugin_id][event] = callback
+        self._index_event(event)
+
+    def haslisteners(self, event):
+        """True if anything would see `event` if it were fired"""
+        return event in self._index or len(self.listeners) > 0
+
+    def _index_event(self, event):
+        listeners = [(plugin_id, events[event])
+                     for plugin_id, events in list(self.events.items())
+                     if event in events]
+        if listeners:
+            self._index[event] = listeners
+        else:
+            self._index.pop(event, None)
+
+    def _reindex(self):
+        index = {}
+        for plugin_id, events in list(self.events.items()):
+            for event, callback in list(events.items()):
+                index.setdefault(event, []).append((plugin_id, callback))
+        self._index = index
+
     def callevent(self, event, payload, abortable=True):
         """
         This needs some standardization
@@ -64,6 +99,10 @@ class Events(object):
         if event == "player.runCommand":
             abortable = False
 
+        # nobody is listening - skip the payload and Player lookups.
+        elif not self.haslisteners(event):
+            return True if abortable else None
+
         # Event processor thread
 
         if abortable:
@@ -105,67 +144,63 @@ class Events(object):
         # old_payload = payload  # retaining the original payload might be helpful for the future features.  # noqa
 
         # in all plugins with this event listed..
-        for plugin_id in self.events:
-
-            # for each plugin...
-            if event in self.events[plugin_id]:
-
-                # run the plugin code and get the plugin's return value
-                result = None
-                try:
-                    # 'self.events[plugin_id][event]' is the
-                    # <bound method Main.plugin_event_function>
-                    # pass 'payload' as the argument for the plugin-defined
-                    # event code function
-                    result = self.events[plugin_id][event](payload)
-                except Exception as e:
-                    self.log.exception(
-                        "Plugin '%s' \n"
-                        "experienced an exception calling '%s': \n%s",
-                        plugin_id, event, e
-                    )
-
-                # If the plugin is not abortable, no need exists to deal with
-                # the payload in any special manner
-                if not abortable:
-                    payload_status = True
-                    continue
-
-                # Evaluate this plugin's result
-                # Every plugin will be given equal time to run it's event code.
-                # However, if one plugin returns a False, no payload changes
-                #  will be possible.
-                #
-                if result is False or payload_status is False:
-                    # mark this event permanently as False
-                    payload_status = False
-
+        for plugin_id, callback in self._index.get(event, ()):
+            # run the plugin code and get the plugin's return value
+            result = None
+            try:
+                # 'callback' is the
+                # <bound method Main.plugin_event_function>
+                # pass 'payload' as the argument for the plugin-defined
+                # event code function
+                result = callback(payload)
+            except Exception as e:
+                self.log.exception(
+                    "Plugin '%s' \n"
+                    "experienced an exception calling '%s': \n%s",
+                    plugin_id, event, e
+                )
+
+            # If the plugin is not abortable, no need exists to deal with
+            # the payload in any special manner
+            if not abortable:
+                payload_status = True
+                continue
+
+            # Evaluate this plugin's result
+            # Every plugin will be given equal time to run it's event code.
+            # However, if one plugin returns a False, no payload changes
+            #  will be possible.
+            #
+            if result is False or payload_status is False:
+                # mark this event permanently as False
+                payload_status = False
+
+            else:
+                # A payload is being returned
+                # If any plugin rejects the event, no payload changes
+                #  will be authorized.
+
+                # once the payload is modded, payload status must stay True
+                if result in (None, True) and payload_status is not True:
+                    payload_status = None
+                # the next plugin looking at this event sees the
+                #  new payload.
                 else:
-                    # A payload is being returned
-                    # If any plugin rejects the event, no payload changes
-                    #  will be authorized.
-
-                    # once the payload is modded, payload status must stay True
-                    if result in (None, True) and payload_status is not True:
-                        payload_status = None
-                    # the next plugin looking at this event sees the
-                    #  new payload.
+                    if type(result) == dict:
+                        payload = result
+                        payload_status = True
                     else:
-                        if type(result) == dict:
-                            payload = result
-                            payload_status = True
-                        else:
-                            # non dictionary payloads are deprecated and will
-                            # be overridden by dict payloads
-                            # Dict payloads are those that return the
-                            # payload in the same format as it was passed.
-                            self.log.warning("Non-Dict payload %s %s %s",
-                                             payload_status,
-                                             result,
-                                             type(result)
-                                             )
-                            payload = result
-                            payload_status = True
+                        # non dictionary payloads are deprecated and will
+                        # be overridden by dict payloads
+                        # Dict payloads are those that return the
+                        # payload in the same format as it was passed.
+                        self.log.warning("Non-Dict payload %s %s %s",
+                                         payload_status,
+                                         result,
+                                         type(result)
+                                         )
+                        payload = result
+                        payload_status = True
 
         # payload changed
         if payload_status is True:
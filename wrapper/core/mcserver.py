@@ -419,6 +419,9 @@ class MCServer(object):
         if self.wrapper.players[username].ipaddress == "127.0.0.0":
             self.wrapper.players[username].ipaddress = ipaddr
 
+        if self.wrapper.proxy:
+            # the server list player count/sample changed
+            self.wrapper.proxy.statuscache.invalidate()
         if self.wrapper.proxy and self.wrapper.players[username].client:
             self.wrapper.players[username].client.server_eid = servereid
             self.wrapper.players[username].client.position = position
@@ -492,6 +495,7 @@ class MCServer(object):
                 player.abort = True
                 del self.wrapper.players[players_name]
             if self.wrapper.proxy:
+                self.wrapper.proxy.statuscache.invalidate()
                 self.wrapper.proxy.removestaleclients()
 
         if len(self.wrapper.players) == 0:
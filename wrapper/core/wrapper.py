@@ -674,6 +674,9 @@ class Wrapper(object):
                              "perm", "perms", "super", "permissions"):
                 self.runwrapperconsolecommand("perms", allargs, player)
 
+            elif command == "/wrapper":
+                self.runwrapperconsolecommand("wrapper", allargs, player)
+
             elif command in ("/playerstats", "/stats", "playerstats", "stats"):
                 self.runwrapperconsolecommand("playerstats", allargs, player)
 
@@ -733,6 +736,12 @@ class Wrapper(object):
                 ("/wrapper [update/memory/halt]",
                  "If no subcommand is provided, it will"
                  " show the Wrapper version.", None),
+                ("/wrapper stats packets [player]",
+                 "Show the packet types using the most proxy"
+                 " bandwidth.", None),
+                ("/wrapper stats connections",
+                 "Show how many proxy connections were accepted,"
+                 " refused and answered as server list pings.", None),
                 ("/playerstats [all]",
                  "Show the most active players. If no subcommand"
                  " is provided, it'll show the top 10 players.",
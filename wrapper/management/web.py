@@ -761,10 +761,18 @@ class Client(object):
                      "wrapper_memory_rss": wrapper_rss_mem,
                      "wrapper_memory_peak": wrapper_peak_mem,
                      "server_memory_graph": memory_graph,
-                     "world_size": self.wrapper.javaserver.worldsize
+                     "world_size": self.wrapper.javaserver.worldsize,
+                     "packet_stats": self.wrapper.api.minecraft.getPacketStats(
+                         top=10)
                      }
             return stats
 
+        if action == "packet_stats":
+            if not self.web.validate_key(argdict["key"]):
+                return EOFError
+            playername = argdict.get("player") or None
+            return self.wrapper.api.minecraft.getPacketStats(playername)
+
         if action == "console":
             if not self.web.validate_key(argdict["key"]):
                 return EOFError
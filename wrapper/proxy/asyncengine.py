@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Optional asyncio engine for the proxy (Python 3.5+ only).
+
+In the default (threaded) mode, each client has a handle(), a flush
+and a keepalive thread, and each server connection has a handle() and
+a flush thread.  With "asyncio-engine" enabled, each worker runs one
+event loop and those all become coroutines on it:
+
+- socket reads are given to `Packet.feed()` and split into packets with
+  `Packet.grab_buffered()`.
+- packets with no parser are forwarded right on the loop.
+- packets with a parser are parsed on a small thread pool, since the
+  parsers (and the plugin events they fire) are allowed to block.  A
+  connection waits for its parse to finish, so packet order is kept.
+- one flusher coroutine per connection writes the queue, woken by
+  `Packet.on_queued`.
+- keepalives are a one second timer.
+- a reader stops reading while the Packet it forwards to is throttled
+  (over its high water mark), the same as the threaded handle() loops.
+
+The parsers and the plugin event API are unchanged.  Short lived
+threads (login authentication, server changes) are still threads.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from proxy.packets.packet import RECV_BLOCK
+
+
+class AsyncEngine(object):
+    def __init__(self, proxy, worker=0):
+        self.proxy = proxy
+        self.log = proxy.log
+        self.flush_delay = proxy.config["flush-max-delay-ms"] / 1000.0
+        self.queue_stall = proxy.config["send-queue-stall-seconds"]
+        self.pool = ThreadPoolExecutor(
+            max(1, proxy.config["asyncio-parser-threads"]))
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run,
+                                       name="ProxyEngine-%s" % worker)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        self.pool.shutdown(wait=False)
+
+    # These may be called from any thread
+    # -----------------------------------
+
+    def add_client(self, client):
+        """take over a newly accepted Client (instead of client.handle)"""
+        client.engine = self
+        self._submit(self._serve_client(client), client.username)
+
+    def add_server(self, server):
+        """take over a connected ServerConnection (instead of .handle)"""
+        self._submit(self._serve_server(server), server.username)
+
+    def start_keepalives(self, client):
+        self._submit(self._keepalives(client), client.username)
+
+    def _submit(self, coro, username):
+        asyncio.run_coroutine_threadsafe(
+            self._guard(coro, username), self.loop)
+
+    async def _guard(self, coro, username):
+        try:
+            await coro
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.log.error("%s proxy engine exception: %s TRACEBACK: \n%s",
+                           username, e, traceback.format_exc())
+
+    # Coroutines
+    # -----------------------------------
+
+    async def _serve_client(self, client):
+        loop = self.loop
+        reader, flusher = self._start(
+            client, client.packet, client.client_socket, client._parse,
+            client._forward, lambda: client.abort)
+        try:
+            await reader
+        except (EOFError, socket.error, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            self.log.error("%s Client Exception: Failed to grab packet "
+                           "\n%s", client.username, e)
+        finally:
+            client.abort = True
+            await loop.run_in_executor(self.pool, client._handle_ended)
+            await flusher
+            self.proxy.removestaleclients()
+
+    async def _serve_server(self, server):
+        loop = self.loop
+        reason = "handle() received abort signal."
+        reader, flusher = self._start(
+            server, server.packet, server.server_socket, server.parse,
+            server._forward, lambda: server.abort or server.client.abort)
+        try:
+            await reader
+        except EOFError:
+            reason = "handle EOF"
+        except (socket.error, asyncio.CancelledError):
+            reason = "handle socket.error"
+        except Exception as e:
+            reason = "handle Exception: %s TRACEBACK: \n%s" % (
+                e, traceback.format_exc())
+        finally:
+            await loop.run_in_executor(self.pool, server.close_server, reason)
+            await flusher
+
+    def _start(self, conn, packet, sock, parse, forward, stopped):
+        """start the reader and flusher tasks for one connection"""
+        loop = self.loop
+        sock.setblocking(False)
+        wake = asyncio.Event()
+        reader = loop.create_task(
+            self._read(conn, packet, sock, parse, forward, stopped))
+
+        def on_queued():
+            loop.call_soon_threadsafe(self._wake, packet, wake, reader)
+        packet.on_queued = on_queued
+        flusher = loop.create_task(self._flush(packet, sock, wake))
+        if packet.queue:
+            wake.set()
+        return reader, flusher
+
+    def _wake(self, packet, wake, reader):
+        wake.set()
+        # the connection was closed by another thread.
+        if packet.abort:
+            reader.cancel()
+
+    async def _read(self, conn, packet, sock, parse, forward, stopped):
+        """the coroutine version of Client/ServerConnection.handle()"""
+        loop = self.loop
+        while not stopped():
+            # (a Client can start with its handshake already buffered)
+            while not stopped():
+                grabbed = packet.grab_buffered()
+                if grabbed is None:
+                    break
+                pkid, orig_packet = grabbed
+                if pkid in conn.parsers[conn.state]:
+                    if not await loop.run_in_executor(self.pool, parse, pkid):
+                        continue
+                forward(orig_packet)
+            peer = conn._forward_packet()
+            if peer and peer.throttled:
+                await self._drain(conn, peer)
+            data = await loop.sock_recv(sock, RECV_BLOCK)
+            if not data:
+                raise EOFError("Packet stream ended")
+            packet.feed(data)
+
+    async def _drain(self, conn, peer):
+        """the coroutine version of Packet.wait_for_drain()"""
+        deadline = time.time() + self.queue_stall
+        while peer.throttled and not peer.abort:
+            if time.time() >= deadline:
+                await self.loop.run_in_executor(
+                    self.pool, conn._forward_stalled)
+                return
+            await asyncio.sleep(0.01)
+
+    async def _flush(self, packet, sock, wake):
+        """the coroutine version of the flush loops"""
+        try:
+            while True:
+                await wake.wait()
+                wake.clear()
+                if self.flush_delay and not packet.abort:
+                    await asyncio.sleep(self.flush_delay)
+                # don't block the loop on packets still being compressed.
+                for future in packet.deflating():
+                    await asyncio.wrap_future(future)
+                start = time.time()
+                count, parts = packet.take_queued()
+                if count:
+                    data = b"".join(parts)
+                    await self.loop.sock_sendall(sock, data)
+                    packet.record_flush(count, len(data), time.time() - start)
+                if packet.abort:
+                    break
+        except socket.error:
+            pass
+        finally:
+            packet.on_queued = None
+
+    async def _keepalives(self, client):
+        loop = self.loop
+        while not client.abort:
+            await asyncio.sleep(1)
+            if not await loop.run_in_executor(
+                    self.pool, client._keep_alive_tick):
+                return
+        await loop.run_in_executor(self.pool, client._keep_alive_ended)
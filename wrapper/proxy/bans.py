@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+The server's ban lists (banned-players.json and banned-ips.json), kept
+in memory for the proxy.
+
+- player bans are indexed by uuid and by (lower case) name.
+- IP bans are indexed by address, and by network for CIDR entries like
+  "10.1.0.0/16" (one dict per prefix length in use), so a lookup is a
+  few dict gets.
+- bans with an expiry sit on a heap; expire() pardons the ones that are
+  due (Proxy.host() calls it every second, and every lookup does too).
+- a file is only read again when its mtime changes (checked at most
+  every CHECK_INTERVAL seconds), so bans made at the server console are
+  still seen.
+- changes are written straight through: the whole list goes to a
+  temporary file which is then renamed over the real one.
+
+The record dicts are the same as the server's.  The Proxy ban methods
+(banuuid, pardonip, isipbanned, etc) use this.
+"""
+
+import heapq
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from api.helpers import read_timestr
+
+# how often (seconds) the files are checked for changes.
+CHECK_INTERVAL = 1.0
+# read_timestr() for "forever" (or anything it cannot read).
+FOREVER = 9999999999
+
+PLAYERS = "banned-players"
+IPS = "banned-ips"
+
+_IP = struct.Struct(">I")
+
+
+def ip_to_int(ipaddress):
+    """an IPv4 address as an integer (socket.error if it is not one)"""
+    return _IP.unpack(socket.inet_aton(ipaddress))[0]
+
+
+def parse_network(entry):
+    """
+    (network, prefix length) for an IP ban entry: "1.2.3.4" is
+    (1.2.3.4, 32) and "10.1.0.0/16" is (10.1.0.0, 16).  Raises ValueError
+    (or socket.error) if it is neither.
+    """
+    address, _, prefix = entry.partition("/")
+    prefix = int(prefix) if prefix else 32
+    if not 0 <= prefix <= 32:
+        raise ValueError("bad prefix length: %s" % entry)
+    mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+    return ip_to_int(address) & mask, prefix
+
+
+def isipv4entry(entry):
+    """True if `entry` is an IPv4 address or CIDR network"""
+    try:
+        parse_network(entry)
+    except (ValueError, socket.error, TypeError, AttributeError):
+        return False
+    return True
+
+
+def in_network(ipaddress, entry):
+    """True if `ipaddress` is, or is in, the IP ban entry `entry`"""
+    if "/" not in entry:
+        return ipaddress == entry
+    try:
+        network, prefix = parse_network(entry)
+        mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+        return ip_to_int(ipaddress) & mask == network
+    except (ValueError, socket.error, TypeError):
+        return False
+
+
+def _replace(source, destination):
+    """rename `source` over `destination`"""
+    if sys.version_info >= (3, 3):
+        os.replace(source, destination)
+        return
+    if os.name == "nt" and os.path.exists(destination):
+        # Py2 on Windows will not rename over a file.
+        os.remove(destination)
+    os.rename(source, destination)
+
+
+class _BanFile(object):
+    """one ban list file and its in-memory records"""
+    def __init__(self, directory, name):
+        self.name = name
+        self.path = os.path.join(directory, "%s.json" % name)
+        self.records = []
+        self.mtime = None
+        self.checked = 0
+
+    def changed(self, now):
+        """True if the file changed since it was read (or written)"""
+        if now - self.checked < CHECK_INTERVAL:
+            return False
+        self.checked = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        return mtime != self.mtime
+
+    def read(self):
+        """read the records.  returns False if the file does not exist"""
+        try:
+            self.mtime = os.path.getmtime(self.path)
+            with open(self.path, "rb") as f:
+                data = f.read().decode("utf-8")
+        except (IOError, OSError):
+            self.mtime = None
+            self.records = []
+            return False
+        try:
+            records = json.loads(data) if data.strip() else []
+        except ValueError:
+            records = []
+        self.records = records if isinstance(records, list) else []
+        return True
+
+    def write(self):
+        """write the records through a temporary file.  returns True if
+        it worked"""
+        data = json.dumps(self.records, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        temp = "%s.%d.tmp" % (self.path, os.getpid())
+        try:
+            with open(temp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            _replace(temp, self.path)
+            self.mtime = os.path.getmtime(self.path)
+        except (IOError, OSError):
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return False
+        return True
+
+
+class BanManager(object):
+    def __init__(self, serverpath, log):
+        self.log = log
+        self._lock = threading.RLock()
+        self._players = _BanFile(serverpath, PLAYERS)
+        self._ips = _BanFile(serverpath, IPS)
+        # {uuid string: record}, {lower case name: record}
+        self._uuids = {}
+        self._names = {}
+        # {ip string: record}, and {prefix length: {network: record}} for
+        #  CIDR entries
+        self._addresses = {}
+        self._networks = {}
+        # (expires, list name, key) for bans that expire
+        self._expiring = []
+        with self._lock:
+            self._load_players()
+            self._load_ips()
+
+    # loading and indexing
+    # --------------------
+
+    def _load_players(self):
+        self._players.read()
+        uuids = {}
+        names = {}
+        for record in self._players.records:
+            if record.get("uuid"):
+                uuids[record["uuid"]] = record
+            if record.get("name"):
+                names[record["name"].lower()] = record
+        self._uuids = uuids
+        self._names = names
+        self._index_expiry()
+
+    def _load_ips(self):
+        self._ips.read()
+        addresses = {}
+        networks = {}
+        for record in self._ips.records:
+            entry = record.get("ip", "")
+            if "/" in entry:
+                try:
+                    network, prefix = parse_network(entry)
+                except (ValueError, socket.error):
+                    self.log.warning("Ignoring bad IP ban entry: %s", entry)
+                    continue
+                networks.setdefault(prefix, {})[network] = record
+            else:
+                addresses[entry] = record
+        self._addresses = addresses
+        self._networks = networks
+        self._index_expiry()
+
+    def _index_expiry(self):
+        expiring = []
+        for record in self._uuids.values():
+            expires = read_timestr(record.get("expires", "forever"))
+            if expires < FOREVER:
+                expiring.append((expires, PLAYERS, record["uuid"]))
+        for record in self._ips.records:
+            expires = read_timestr(record.get("expires", "forever"))
+            if expires < FOREVER:
+                expiring.append((expires, IPS, record["ip"]))
+        heapq.heapify(expiring)
+        self._expiring = expiring
+
+    def found(self, listname):
+        """True if the list (PLAYERS or IPS) exists on disk"""
+        self.refresh()
+        banfile = self._players if listname == PLAYERS else self._ips
+        return banfile.mtime is not None
+
+    def refresh(self, now=None):
+        """re-read any file that changed, and pardon expired bans"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._players.changed(now):
+                self._load_players()
+            if self._ips.changed(now):
+                self._load_ips()
+        self.expire(now)
+
+    def expire(self, now=None):
+        """
+        Pardon the bans whose time is up.
+        :returns: the records that were pardoned.
+        """
+        if now is None:
+            now = time.time()
+        if not self._expiring or self._expiring[0][0] > now:
+            return []
+        pardoned = []
+        with self._lock:
+            while self._expiring and self._expiring[0][0] <= now:
+                expires, listname, key = heapq.heappop(self._expiring)
+                if listname == PLAYERS:
+                    record = self._uuids.get(key)
+                    kind = "UUID"
+                else:
+                    record = self._find_ip_entry(key)
+                    kind = "IP"
+                # skip bans since pardoned or replaced
+                if record is None or read_timestr(
+                        record.get("expires", "forever")) != expires:
+                    continue
+                if listname == PLAYERS:
+                    done = self._remove_player(record)
+                else:
+                    done = self._remove_ip(record)
+                if done:
+                    self.log.info("%s: %s was pardoned (expired ban)",
+                                  kind, key)
+                    pardoned.append(record)
+                else:
+                    self.log.warning("Could not pardon %s: %s (expired ban)"
+                                     " - the ban list could not be written",
+                                     kind, key)
+        return pardoned
+
+    # player bans
+    # -----------
+
+    def find_uuid(self, uuid):
+        """the ban record for a uuid (string or MCUUID), or None"""
+        self.refresh()
+        return self._uuids.get(str(uuid))
+
+    def find_name(self, name):
+        """the ban record for a player name, or None"""
+        self.refresh()
+        return self._names.get(str(name).lower())
+
+    def add_player(self, record):
+        """
+        Ban a player.  `record` is the full ban list entry.
+        :returns: True, or False if the list could not be written.
+        """
+        with self._lock:
+            self.refresh()
+            self._players.records.append(record)
+            if not self._players.write():
+                self._players.records.remove(record)
+                return False
+            self._uuids[record["uuid"]] = record
+            if record.get("name"):
+                self._names[record["name"].lower()] = record
+            self._push_expiry(record, PLAYERS, record["uuid"])
+            return True
+
+    def remove_player(self, record):
+        """pardon a player ban record.  returns False if the list could
+        not be written"""
+        with self._lock:
+            return self._remove_player(record)
+
+    def _remove_player(self, record):
+        records = self._players.records
+        self._players.records = [x for x in records if x is not record]
+        if not self._players.write():
+            self._players.records = records
+            return False
+        if self._uuids.get(record.get("uuid")) is record:
+            del self._uuids[record["uuid"]]
+        name = record.get("name", "").lower()
+        if self._names.get(name) is record:
+            del self._names[name]
+        return True
+
+    # IP bans
+    # -------
+
+    def find_ip(self, ipaddress):
+        """
+        The ban record that covers an IP address (an exact entry first,
+        then the longest matching network), or None.
+        """
+        self.refresh()
+        record = self._addresses.get(ipaddress)
+        if record is not None or not self._networks:
+            return record
+        try:
+            address = ip_to_int(ipaddress)
+        except (socket.error, TypeError):
+            return None
+        for prefix in sorted(self._networks, reverse=True):
+            mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+            record = self._networks[prefix].get(address & mask)
+            if record is not None:
+                return record
+        return None
+
+    def _find_ip_entry(self, entry):
+        """the record for exactly this ban entry (address or network)"""
+        for record in self._ips.records:
+            if record.get("ip") == entry:
+                return record
+        return None
+
+    def find_ip_entry(self, entry):
+        """the record for a ban entry as written ("1.2.3.4" or
+        "10.0.0.0/8"), or None"""
+        self.refresh()
+        return self._find_ip_entry(entry)
+
+    def add_ip(self, record):
+        """
+        Ban an address or network ("ip" may be CIDR, like "10.0.0.0/8").
+        :returns: True, or False if the list could not be written.
+        """
+        with self._lock:
+            self.refresh()
+            self._ips.records.append(record)
+            if not self._ips.write():
+                self._ips.records.remove(record)
+                return False
+            entry = record["ip"]
+            if "/" in entry:
+                network, prefix = parse_network(entry)
+                self._networks.setdefault(prefix, {})[network] = record
+            else:
+                self._addresses[entry] = record
+            self._push_expiry(record, IPS, entry)
+            return True
+
+    def remove_ip(self, record):
+        """pardon an IP ban record.  returns False if the list could not
+        be written"""
+        with self._lock:
+            return self._remove_ip(record)
+
+    def _remove_ip(self, record):
+        records = self._ips.records
+        self._ips.records = [x for x in records if x is not record]
+        if not self._ips.write():
+            self._ips.records = records
+            return False
+        entry = record.get("ip", "")
+        if "/" in entry:
+            network, prefix = parse_network(entry)
+            networks = self._networks.get(prefix, {})
+            if networks.get(network) is record:
+                del networks[network]
+                if not networks:
+                    del self._networks[prefix]
+        elif self._addresses.get(entry) is record:
+            del self._addresses[entry]
+        return True
+
+    def _push_expiry(self, record, listname, key):
+        expires = read_timestr(record.get("expires", "forever"))
+        if expires < FOREVER:
+            heapq.heappush(self._expiring, (expires, listname, key))
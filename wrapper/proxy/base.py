@@ -8,19 +8,23 @@ from __future__ import absolute_import
 
 import base64
 import socket
+import sys
 import threading
 import time
 import json
 import requests
 
 # imports that are still dependent upon wrapper:
-from api.helpers import getjsonfile, putjsonfile, find_in_json
-from api.helpers import epoch_to_timestr, read_timestr
-from api.helpers import isipv4address
+from api.helpers import epoch_to_timestr, processcolorcodes
 from utils.py23 import py_str
 from proxy.utils.constants import *
 
 from proxy.entity.entitycontrol import EntityControl
+from proxy.packets.packetstats import PacketStats
+from proxy.bans import BanManager, PLAYERS, IPS, in_network, isipv4entry
+from proxy.gate import ConnectionGate
+from proxy.sessions import SessionVerifier
+from proxy.status import StatusCache, StatusResponder, selectors
 
 # encryption requires 'cryptography' package.
 try:
@@ -48,6 +52,18 @@ except ImportError:
     Client = False
     Packet = False
 
+# Py2 has no concurrent.futures unless the 'futures' backport is installed.
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = False
+
+# the asyncio engine uses async/await syntax (Python 3.5+).
+if sys.version_info >= (3, 5):
+    from proxy.asyncengine import AsyncEngine
+else:
+    AsyncEngine = False
+
 
 class Proxy(object):
     def __init__(self, wrapper):
@@ -60,6 +76,15 @@ class Proxy(object):
 
         self.clients = []
         self.maxplayers = 20
+        # packet counters of clients that have disconnected
+        self.packetstats = PacketStats()
+        self.statuscache = StatusCache(self)
+        # banned-players.json and banned-ips.json, indexed in memory
+        self.bans = BanManager(self.javaserver.serverpath, self.log)
+        # online mode logins' session server checks
+        self.sessions = SessionVerifier(self)
+        # answers server list pings (None if `selectors` is not available)
+        self.responder = None
         self.command_prefix = self.config["command-prefix"]
 
         # encryption = False if proxy.utils.encryption does not import
@@ -86,6 +111,8 @@ class Proxy(object):
         self.proxy_bind = self.config["proxy-bind"]
         self.proxy_port = int(self.config["proxy-port"])
         self.silent_ip_banning = self.config["silent-ipban"]
+        # connection rate limits and silent ip bans
+        self.gate = ConnectionGate(self)
         self.maxlayers = self.config["max-players"]
         self.proxy_worlds = self.config["worlds"]
         self.usehub = self.config["built-in-hub"]
@@ -94,6 +121,15 @@ class Proxy(object):
         # proxy internal workings
         self.proxy_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.usingSocket = False
+        # asyncio engine workers (empty list = thread per connection)
+        self.engines = []
+        # clients given to the engines so far
+        self._accepted = 0
+        # shared pool that compresses large packets (see Packet.send_raw)
+        self.zlib_pool = None
+        if ThreadPoolExecutor and self.config["zlib-offload-bytes"] > 0:
+            self.zlib_pool = ThreadPoolExecutor(
+                max(1, self.config["zlib-workers"]))
 
         self.skins = {}
         self.skinTextures = {}
@@ -155,43 +191,207 @@ class Proxy(object):
                 self.usingSocket = False
                 time.sleep(10)
             self.usingSocket = True
-            self.proxy_socket.listen(5)
+            self.proxy_socket.listen(128)
 
         # proxy now up and running, bound to server port.
         self.entity_control = EntityControl(self)
 
-        # accept clients and start their threads
+        if self.config["asyncio-engine"]:
+            self._start_engines()
+        if selectors:
+            # the responder accepts; status pings are answered there and
+            #  logins come back to start_client()
+            self.responder = StatusResponder(self)
+            self.responder.start()
+            self.responder.listen(self.proxy_socket)
+            while not (self.abort or self.wrapper.haltsig.halt):
+                time.sleep(1)
+                self.bans.expire()
+                if not self.responder.thread.is_alive():
+                    self.log.error("The StatusResponder thread stopped; "
+                                   "accepting connections without it.")
+                    self._accept_loop()
+            self.responder.stop()
+        else:
+            self._accept_loop()
+
+        for engine in self.engines:
+            engine.stop()
+        self.sessions.close()
+
+    def _accept_loop(self):
+        """accept clients and start their threads (no `selectors`)"""
+        # wake up at least once a second for the housekeeping
+        self.proxy_socket.settimeout(1)
+        ticked = time.time()
         while not (self.abort or self.wrapper.haltsig.halt):
+            now = time.time()
+            if now - ticked >= 1:
+                ticked = now
+                self.gate.tick()
+                self.bans.expire()
             try:
                 sock, addr = self.proxy_socket.accept()
+                sock.settimeout(None)
+            except socket.timeout:
+                continue
             except Exception as e:
                 self.log.exception("An error has occured while trying to "
                                    "accept a socket connection \n(%s)", e)
                 continue
 
-            banned_ip = self.isipbanned(addr)
-            if self.silent_ip_banning and banned_ip:
+            admit, banned_ip = self.gate.admit(addr[0])
+            if not admit:
                 # 0: done receiving, 1: done sending, 2: both
-                sock.shutdown(2)
+                try:
+                    sock.shutdown(2)
+                except socket.error:
+                    # the client may have reset the connection already
+                    pass
                 sock.close()
-                self.log.info("Someone tried to connect from a banned ip:"
-                              " %s  (connection refused)", addr)
+                if banned_ip:
+                    self.log.info("Someone tried to connect from a banned "
+                                  "ip: %s  (connection refused)", addr)
                 continue
+            self.start_client(sock, addr, banned_ip)
 
-            # spur off client thread
-            # self.server_temp = ServerConnection(self, ip, port)
-            client = Client(self, sock, addr, banned=banned_ip)
-            t = threading.Thread(target=client.handle, args=())
-            t.daemon = True
-            t.start()
+    def start_client(self, sock, addr, banned=False, data=b""):
+        """
+        Start a Client for an accepted socket.  `data` is anything
+        already read from the socket (see StatusResponder).
+        """
+        # spur off client thread
+        client = Client(self, sock, addr, banned=banned)
+        if data:
+            client.packet.preload(data)
+        if self.engines:
+            # spread clients across the engine workers
+            self.engines[self._accepted % len(self.engines)].add_client(
+                client)
+            self._accepted += 1
+            return
+        t = threading.Thread(target=client.handle, args=())
+        t.daemon = True
+        t.start()
+
+    def _start_engines(self):
+        if not AsyncEngine:
+            self.log.error("The proxy asyncio-engine requires Python 3.5 "
+                           "or later.  Using threads instead.")
+            return
+        for worker in range(max(1, self.config["asyncio-workers"])):
+            engine = AsyncEngine(self, worker)
+            engine.start()
+            self.engines.append(engine)
+        self.log.info("Proxy is using %d asyncio engine worker(s).",
+                      len(self.engines))
 
     def removestaleclients(self):
         """removes aborted client and player objects"""
         for i, client in enumerate(self.clients):
             if self.clients[i].abort:
-                if self.clients[i].username in self.wrapper.players:
-                    del self.wrapper.players[self.clients[i].username]
+                username = self.clients[i].username
+                if username in self.wrapper.players:
+                    del self.wrapper.players[username]
+                    self.statuscache.invalidate()
                 self.clients.pop(i)
+                # (unless the player is already back on another client)
+                if self.entity_control and not any(
+                        other.username == username for other in self.clients):
+                    self.entity_control.drop_client(username)
+
+    def broadcast_packet(self, packetname, payload, clients=None):
+        """
+        Send one clientbound packet to many clients.
+
+        The packet is encoded and framed once for each protocol version
+        and compression threshold among the clients, and that same frame
+        is queued for every client that shares them.
+
+        :param packetname: the mcpackets_cb name, like "CHAT_MESSAGE".
+        :param payload: the values for the packet's PARSER data types
+         (as for sendpkt).
+        :param clients: the clients to send to (default: all clients
+         that are playing).
+
+        :returns: the number of clients it was queued for.
+        """
+        if clients is None:
+            clients = self.clients
+        frames = {}
+        sent = 0
+        for client in list(clients):
+            packet = client.packet
+            if client.abort or client.state not in (PLAY, LOBBY):
+                continue
+            key = (client.clientversion, packet.compressThreshold)
+            try:
+                frame = frames[key]
+            except KeyError:
+                pkt = getattr(client.pktCB, packetname)
+                frame = None
+                if pkt[PKT] != 0xee:
+                    frame = packet.frame(
+                        packet.encodepkt(pkt[PKT], pkt[PARSER], payload))
+                frames[key] = frame
+            if frame is not None:
+                packet.send_framed(frame)
+                sent += 1
+        return sent
+
+    def broadcast_chat(self, message, position=0, clients=None):
+        """
+        client.chat_to_client() for many clients at once (see
+        broadcast_packet()).  Strings are formatted the way the server's
+        tellraw broadcast formats them (processcolorcodes()).
+
+        :param message: Chat Dict or string ("&" color codes allowed).
+        :param position: 0 or 1 = chat, 2 = above the hot bar.
+        :param clients: the clients to send to (default: the players
+         on this wrapper's server, as tellraw would reach).
+        """
+        if not isinstance(message, dict):
+            message = processcolorcodes(message)
+        if clients is None:
+            clients = [client for client in self.clients
+                       if client.local and client.state == PLAY]
+        return self.broadcast_packet(
+            "CHAT_MESSAGE", (message, position), clients)
+
+    def getconnectioncounters(self):
+        """
+        Counts of connections accepted and refused by the gate, of
+        what the StatusResponder did with them, and of session server
+        checks.
+        """
+        counters = dict(self.gate.counters)
+        counters["handshaking"] = 0
+        if self.responder:
+            counters.update(self.responder.counters)
+            counters["handshaking"] = len(self.responder._connections)
+        counters["status_cache_hits"] = self.statuscache.hits
+        counters["status_cache_misses"] = self.statuscache.misses
+        for name, count in self.sessions.counters.items():
+            counters["session_%s" % name] = count
+        return counters
+
+    def getpacketstats(self, username=None, top=None):
+        """
+        Per packet id counters (see PacketStats.report()) for one
+        connected player, or the totals for everyone since the proxy
+        started.  Returns None if `username` is not connected.
+        """
+        if username:
+            for client in self.clients:
+                if client.username == username and client.stats:
+                    return client.stats.report(client.clientversion, top)
+            return None
+        totals = PacketStats()
+        totals.merge(self.packetstats)
+        for client in self.clients:
+            if client.stats:
+                totals.merge(client.stats)
+        return totals.report(self.javaserver.protocolVersion, top)
 
     def pollserver(self, host="localhost", port=None):
         """
@@ -315,11 +515,8 @@ class Proxy(object):
         :param uuid: uuid of player as string
         :return: string representing ban reason
         """
-        banlist = getjsonfile(
-            "banned-players", self.javaserver.serverpath
-        )
-        if banlist:
-            banrecord = find_in_json(banlist, "uuid", uuid)
+        banrecord = self.bans.find_uuid(uuid)
+        if banrecord:
             return "%s by %s" % (banrecord["reason"], banrecord["source"])
         return "Banned by server"
 
@@ -331,47 +528,37 @@ class Proxy(object):
         :param reason - text reason for ban
         :param source - source (author/op) of ban.
         :param expires - expiration in seconds from epoch time.  Field exists
-         but not used by the vanilla server
-        - implement it for tempbans in future?
+         but not used by the vanilla server.  Wrapper pardons the ban
+         when it expires.
           Gets converted to string representation in the ban file.
 
         This probably only works on 1.7.10 servers or later
         """
-        banlist = getjsonfile(
-            "banned-players", self.javaserver.serverpath
-        )
-        if banlist is not False:  # file and directory exist.
-            if banlist is None:  # file was empty or not valid
-                banlist = dict()  # ensure valid dict before operating on it
-            if find_in_json(banlist, "uuid", str(uuid)):
-                return "player already banned"  # error text
-            else:
-                if expires:
-                    try:
-                        expiration = epoch_to_timestr(expires)
-                    except Exception as e:
-                        print('Exception: %s' % e)
-                        return "expiration date invalid"  # error text
-                else:
-                    expiration = "forever"
-                name = self.uuids.getusernamebyuuid(uuid.string)
-                banlist.append({"uuid": uuid.string,
-                                "name": name,
-                                "created": epoch_to_timestr(time.time()),
-                                "source": source,
-                                "expires": expiration,
-                                "reason": reason})
-                if putjsonfile(banlist,
-                               "banned-players",
-                               self.javaserver.serverpath):
-                    # this actually is not needed. Commands now handle the kick.
-                    console_command = "kick %s %s" % (name, reason)
-                    self.run_command(console_command)
-
-                    return "Banned %s: %s" % (name, reason)
-                return "Could not write banlist to disk"
-        else:
+        if not self.bans.found(PLAYERS):
             return "Banlist not found on disk"
+        if self.bans.find_uuid(uuid):
+            return "player already banned"  # error text
+        if expires:
+            try:
+                expiration = epoch_to_timestr(expires)
+            except Exception as e:
+                print('Exception: %s' % e)
+                return "expiration date invalid"  # error text
+        else:
+            expiration = "forever"
+        name = self.uuids.getusernamebyuuid(uuid.string)
+        if self.bans.add_player({"uuid": uuid.string,
+                                 "name": name,
+                                 "created": epoch_to_timestr(time.time()),
+                                 "source": source,
+                                 "expires": expiration,
+                                 "reason": reason}):
+            # this actually is not needed. Commands now handle the kick.
+            console_command = "kick %s %s" % (name, reason)
+            self.run_command(console_command)
+
+            return "Banned %s: %s" % (name, reason)
+        return "Could not write banlist to disk"
 
     def banuuidraw(self, uuid, username, reason="The Ban Hammer has spoken!",
                    source="Wrapper", expires=False):
@@ -382,209 +569,126 @@ class Proxy(object):
         :param reason - text reason for ban
         :param source - source (author/op) of ban.
         :param expires - expiration in seconds from epoch time.  Field exists
-         but not used by the vanilla server
-        - implement it for tempbans in future?
+         but not used by the vanilla server.  Wrapper pardons the ban
+         when it expires.
           Gets converted to string representation in the ban file.
 
         This probably only works on 1.7.10 servers or later
         """
-        banlist = getjsonfile(
-            "banned-players", self.javaserver.serverpath
-        )
-        if banlist is not False:  # file and directory exist.
-            if banlist is None:  # file was empty or not valid
-                banlist = dict()  # ensure valid dict before operating on it
-            if find_in_json(banlist, "uuid", str(uuid)):
-                return "player already banned"  # error text
-            else:
-                if expires:
-                    try:
-                        expiration = epoch_to_timestr(expires)
-                    except Exception as e:
-                        print('Exception: %s' % e)
-                        return "expiration date invalid"  # error text
-                else:
-                    expiration = "forever"
-                banlist.append({"uuid": uuid.string,
-                                "name": username,
-                                "created": epoch_to_timestr(time.time()),
-                                "source": source,
-                                "expires": expiration,
-                                "reason": reason})
-                if putjsonfile(banlist,
-                               "banned-players",
-                               self.javaserver.serverpath):
-                    self.log.info("kicking %s... %s", username, reason)
-
-                    console_command = "kick %s Banned: %s" % (username, reason)
-                    self.run_command(console_command)
-
-                    return "Banned %s: %s - %s" % (username, uuid, reason)
-                return "Could not write banlist to disk"
-        else:
+        if not self.bans.found(PLAYERS):
             return "Banlist not found on disk"
+        if self.bans.find_uuid(uuid):
+            return "player already banned"  # error text
+        if expires:
+            try:
+                expiration = epoch_to_timestr(expires)
+            except Exception as e:
+                print('Exception: %s' % e)
+                return "expiration date invalid"  # error text
+        else:
+            expiration = "forever"
+        if self.bans.add_player({"uuid": uuid.string,
+                                 "name": username,
+                                 "created": epoch_to_timestr(time.time()),
+                                 "source": source,
+                                 "expires": expiration,
+                                 "reason": reason}):
+            self.log.info("kicking %s... %s", username, reason)
+
+            console_command = "kick %s Banned: %s" % (username, reason)
+            self.run_command(console_command)
+
+            return "Banned %s: %s - %s" % (username, uuid, reason)
+        return "Could not write banlist to disk"
 
     def banip(self, ipaddress, reason="The Ban Hammer has spoken!",
               source="Wrapper", expires=False):
         """
         Ban an IP address (IPV-4)
-        :param ipaddress - ip address to ban
+        :param ipaddress - ip address to ban, or a network in CIDR
+         notation ("10.1.0.0/16").
         :param reason - text reason for ban
         :param source - source (author/op) of ban.
         :param expires - expiration in seconds from epoch time.  Field exists
-        but not used by the vanilla server.
-        - implement it for tempbans in future?
+        but not used by the vanilla server.  Wrapper pardons the ban when
+        it expires.
         - Gets converted to string representation in the ban file.
 
         This probably only works on 1.7.10 servers or later
         """
-        if not isipv4address(ipaddress):
+        if not isipv4entry(ipaddress):
             return "Invalid IPV4 address: %s" % ipaddress
-        banlist = getjsonfile("banned-ips", self.javaserver.serverpath)
-        if banlist is not False:  # file and directory exist.
-            if banlist is None:  # file was empty or not valid
-                banlist = dict()  # ensure valid dict before operating on it
-            if find_in_json(banlist, "ip", ipaddress):
-                return "address already banned"  # error text
-            else:
-                if expires:
-                    try:
-                        expiration = epoch_to_timestr(expires)
-                    except Exception as e:
-                        print('Exception: %s' % e)
-                        return "expiration date invalid"  # error text
-                else:
-                    expiration = "forever"
-                banlist.append({"ip": ipaddress,
-                                "created": epoch_to_timestr(time.time()),
-                                "source": source,
-                                "expires": expiration,
-                                "reason": reason})
-                if putjsonfile(banlist, "banned-ips",
-                               self.javaserver.serverpath):
-                    banned = ""
-                    for client in self.clients:
-                        if client.ip == str(ipaddress):
-
-                            console_command = "kick %s Your IP is Banned!" % client.username  # noqa
-                            self.run_command(console_command)
-
-                            banned += "\n%s" % client.username
-                    return "Banned ip address: %s\nPlayers kicked as " \
-                           "a result:%s" % (ipaddress, banned)
-                return "Could not write banlist to disk"
-        else:
+        if not self.bans.found(IPS):
             return "Banlist not found on disk"
+        if self.bans.find_ip_entry(ipaddress):
+            return "address already banned"  # error text
+        if expires:
+            try:
+                expiration = epoch_to_timestr(expires)
+            except Exception as e:
+                print('Exception: %s' % e)
+                return "expiration date invalid"  # error text
+        else:
+            expiration = "forever"
+        if self.bans.add_ip({"ip": ipaddress,
+                             "created": epoch_to_timestr(time.time()),
+                             "source": source,
+                             "expires": expiration,
+                             "reason": reason}):
+            banned = ""
+            for client in self.clients:
+                if in_network(str(client.ip), ipaddress):
+
+                    console_command = "kick %s Your IP is Banned!" % client.username  # noqa
+                    self.run_command(console_command)
+
+                    banned += "\n%s" % client.username
+            return "Banned ip address: %s\nPlayers kicked as " \
+                   "a result:%s" % (ipaddress, banned)
+        return "Could not write banlist to disk"
 
     def pardonip(self, ipaddress):
-        if not isipv4address(ipaddress):
+        if not isipv4entry(ipaddress):
             return "Invalid IPV4 address: %s" % ipaddress
-        banlist = getjsonfile("banned-ips", self.javaserver.serverpath)
-        if banlist is not False:  # file and directory exist.
-            if banlist is None:  # file was empty or not valid
-                return "No IP bans have ever been recorded."
-            banrecord = find_in_json(banlist, "ip", ipaddress)
-            if banrecord:
-                for x in banlist:
-                    if x == banrecord:
-                        banlist.remove(x)
-                if putjsonfile(banlist, "banned-ips",
-                               self.javaserver.serverpath):
-                    return "pardoned %s" % ipaddress
-                return "Could not write banlist to disk"
-            else:
-                return "That address was never banned"  # error text
-
-        else:
+        if not self.bans.found(IPS):
             return "Banlist not found on disk"  # error text
+        banrecord = self.bans.find_ip_entry(ipaddress)
+        if banrecord:
+            if self.bans.remove_ip(banrecord):
+                return "pardoned %s" % ipaddress
+            return "Could not write banlist to disk"
+        return "That address was never banned"  # error text
 
     def pardonuuid(self, uuid):
-        banlist = getjsonfile(
-            "banned-players", self.javaserver.serverpath
-        )
-        if banlist is not False:  # file and directory exist.
-            if banlist is None:  # file was empty or not valid
-                return "No bans have ever been recorded..?"
-            banrecord = find_in_json(banlist, "uuid", str(uuid))
-            if banrecord:
-                for x in banlist:
-                    if x == banrecord:
-                        banlist.remove(x)
-                if putjsonfile(banlist,
-                               "banned-players",
-                               self.javaserver.serverpath):
-                    name = self.uuids.getusernamebyuuid(str(uuid))
-                    return "pardoned %s" % name
-                return "Could not write banlist to disk"
-            else:
-                return "That person was never banned"  # error text
-        else:
+        if not self.bans.found(PLAYERS):
             return "Banlist not found on disk"  # error text
+        banrecord = self.bans.find_uuid(uuid)
+        if banrecord:
+            if self.bans.remove_player(banrecord):
+                name = self.uuids.getusernamebyuuid(str(uuid))
+                return "pardoned %s" % name
+            return "Could not write banlist to disk"
+        return "That person was never banned"  # error text
 
     def pardonname(self, username):
-        banlist = getjsonfile(
-            "banned-players", self.javaserver.serverpath
-        )
-        if banlist is not False:  # file and directory exist.
-            if banlist is None:  # file was empty or not valid
-                return "No bans have ever been recorded..?"
-            banrecord = find_in_json(banlist, "name", str(username))
-            if banrecord:
-                for x in banlist:
-                    if x == banrecord:
-                        banlist.remove(x)
-                if putjsonfile(banlist,
-                               "banned-players",
-                               self.javaserver.serverpath):
-                    return "pardoned %s" % username
-                return "Could not write banlist to disk"
-            else:
-                return "That person was never banned"  # error text
-        else:
+        if not self.bans.found(PLAYERS):
             return "Banlist not found on disk"  # error text
+        banrecord = self.bans.find_name(username)
+        if banrecord:
+            if self.bans.remove_player(banrecord):
+                return "pardoned %s" % username
+            return "Could not write banlist to disk"
+        return "That person was never banned"  # error text
 
     def isuuidbanned(self, uuid):  # Check if the UUID of the user is banned
-        banlist = getjsonfile(
-            "banned-players", self.javaserver.serverpath
-        )
-        if banlist:  # make sure banlist exists
-            banrecord = find_in_json(banlist, "uuid", str(uuid))
-            if banrecord:
-                # if ban has expired
-                if read_timestr(banrecord["expires"]) < int(time.time()):
-                    pardoning = self.pardonuuid(str(uuid))
-                    if pardoning[:8] == "pardoned":
-                        self.log.info("UUID: %s was pardoned "
-                                      "(expired ban)", str(uuid))
-                        return False  # player is "NOT" banned (anymore)
-                    else:
-                        self.log.warning("isuuidbanned attempted a pardon of"
-                                         " uuid: %s (expired ban), "
-                                         "but it failed:\n %s",
-                                         uuid, pardoning)
-                return True  # player is still banned
-        return False  # banlist empty or record not found
+        # (expired bans are pardoned by the lookup)
+        return self.bans.find_uuid(uuid) is not None
 
     def isipbanned(self, ipaddress):  # Check if the IP address is banned
-        banlist = getjsonfile("banned-ips", self.javaserver.serverpath)
-        if banlist:  # make sure banlist exists
-            for record in banlist:
-                _ip = record["ip"]
-                if _ip in ipaddress:
-                    _expires = read_timestr(record["expires"])
-                    if _expires < int(time.time()):  # if ban has expired
-                        pardoning = self.pardonip(ipaddress)
-                        if pardoning[:8] == "pardoned":
-                            self.log.info("IP: %s was pardoned "
-                                          "(expired ban)", ipaddress)
-                            return False  # IP is "NOT" banned (anymore)
-                        else:
-                            self.log.warning("isipbanned attempted a pardon "
-                                             "of IP: %s (expired ban),  but"
-                                             " it failed:\n %s",
-                                             ipaddress, pardoning)
-                    return True  # IP is still banned
-        return False  # banlist empty or record not found
+        if isinstance(ipaddress, tuple):
+            # a socket address
+            ipaddress = ipaddress[0]
+        return self.bans.find_ip(ipaddress) is not None
 
     def getskintexture(self, uuid):
         import pprint
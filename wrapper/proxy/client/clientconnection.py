@@ -15,19 +15,20 @@ import time
 import json
 import hashlib
 from socket import error as socket_error
-import requests
 
 # Local imports
 import proxy.utils.encryption as encryption
 
 from proxy.server.serverconnection import ServerConnection
 from proxy.packets.packet import Packet
+from proxy.packets.packetstats import PacketStats
 from proxy.client.parse_sb import ParseSB
 from proxy.packets import mcpackets_sb
 from proxy.packets import mcpackets_cb
 from proxy.utils.constants import *
 
-from api.helpers import processcolorcodes, getjsonfile, putjsonfile
+from api.helpers import getjsonfile, putjsonfile
+from api.player import Player
 
 
 # noinspection PyMethodMayBeStatic
@@ -63,16 +64,28 @@ class Client(object):
         self.hidden_ops = self.proxy.config["hidden-ops"]
         self.silent_bans = self.proxy.config["silent-ipban"]
         self.names_change = self.proxy.config["auto-name-changes"]
-        self.flush_rate = self.proxy.config["flush-rate-ms"] / 1000
+        self.flush_delay = self.proxy.config["flush-max-delay-ms"] / 1000.0
+        self.queue_stall = self.proxy.config["send-queue-stall-seconds"]
         self.onlinemode = self.proxy.onlinemode
+        # asyncio engine running this client (None in threaded mode)
+        self.engine = None
 
         # client setup and operating paramenters
         self.abort = False
         self.username = "PING REQUEST"
         self.packet = Packet(self.client_socket, self)
+        self.packet.compresslevel = self.proxy.config["compression-level"]
+        self.packet.zlib_pool = self.proxy.zlib_pool
+        self.packet.offload_size = self.proxy.config["zlib-offload-bytes"]
+        self.set_water_marks(self.packet)
+        # per packet id counters for this client and its server connection
+        self.stats = None
+        if self.proxy.config["packet-stats"]:
+            self.stats = PacketStats()
+            self.packet.stats = self.stats
+            self.packet.direction = "SB"
         self.verifyToken = encryption.generate_challenge_token()
         self.serverID = encryption.generate_server_id().encode('utf-8')
-        self.MOTD = {}
 
         # client will reset this later, if need be..
         self.clientversion = self.javaserver.protocolVersion
@@ -110,8 +123,11 @@ class Client(object):
         self.permit_disconnect_from_server = True
 
         # Hub controls
-        # tells wrapper when the player login is authenticated
-        self.wait_wait_for_auth = False
+        # set when the player login is authenticated (or has failed)
+        self.auth_done = threading.Event()
+        self.authenticated = False
+        # why the login was refused (told to the client)
+        self.login_refused = "Your client authentication failed."
         # whether or not the player is on this wrapper world
         self.local = True
         # Handle disconnections based on what world player is in
@@ -231,6 +247,11 @@ class Client(object):
         t.daemon = True
         t.start()
         while not self.abort:
+            # backpressure - don't read more than the server can take.
+            peer = self._forward_packet()
+            if peer and peer.throttled and \
+                    not peer.wait_for_drain(self.queue_stall):
+                self._forward_stalled()
             try:
                 # last three items are for sending a compressed unparsed packet.
                 pkid, orig_packet = self.packet.grabpacket()  # noqa
@@ -250,21 +271,67 @@ class Client(object):
                 self.abort = True
                 break
 
-            # Each condition is executed and evaluated in sequence:
-            if self._parse(pkid) and \
-                    self.server_connection and \
-                    self.server_connection.packet and \
-                    self.server_connection.state == PLAY:
+            # wrapper handles LOGIN/HANDSHAKE with servers (via
+            # self._parse(pkid), which DOES happen in all modes).
+            if self._parse(pkid):
+                self._forward(orig_packet)
 
-                # wrapper handles LOGIN/HANDSHAKE with servers (via
-                # self._parse(pkid), which DOES happen in all modes
-                # as part of the `if` statement evaluation).
+        # upon self.abort
+        self._handle_ended()
 
-                # sending on to the server only happens in PLAY.
-                self.server_connection.packet.send_raw_untouched(orig_packet)
+    def _forward(self, orig_packet):
+        """
+        Pass a packet the parsers did not reject on to the server.
+        Sending on to the server only happens in PLAY.
+        """
+        if self.server_connection and \
+                self.server_connection.packet and \
+                self.server_connection.state == PLAY:
+            self.server_connection.packet.send_raw_untouched(orig_packet)
+
+    def _forward_packet(self):
+        """the Packet that _forward() queues to, if any"""
+        server = self.server_connection
+        return server and server.packet
+
+    def _forward_stalled(self):
+        """The server has not taken what we sent it for queue_stall
+        seconds.  Drop the server connection."""
+        server = self.server_connection
+        packet = self._forward_packet()
+        if packet:
+            server.close_server("server is not keeping up (%s KB queued)" %
+                                (packet.queued_bytes // 1024))
+
+    def set_water_marks(self, packet):
+        """set a Packet's send queue limits from the config"""
+        packet.high_water = self.proxy.config["send-queue-high-kb"] * 1024
+        packet.low_water = self.proxy.config["send-queue-low-kb"] * 1024
+
+    def drop_stalled(self):
+        """
+        The client has not read what we sent it for queue_stall seconds.
+        Drop the connection now; a disconnect packet would just wait at
+        the end of the full queue.
+        """
+        self.log.warning("%s is not keeping up with the packets sent to "
+                         "them (%s KB queued).  Disconnecting.",
+                         self.username, self.packet.queued_bytes // 1024)
+        self.abort = True
+        self.packet.close()
+        try:
+            self.client_socket.shutdown(2)
+        except (AttributeError, socket_error):
+            pass
 
-        # upon self.abort
+    def _handle_ended(self):
+        """close everything down once the client stops sending."""
         self._close_server_instance("Client Handle Ended")
+        # wake _flush_loop so it can end too
+        self.packet.close()
+        if self.stats:
+            self.proxy.packetstats.merge(self.stats)
+            self.stats = None
         try:
             self.client_socket.shutdown(2)
             self.client_socket.close()
@@ -276,17 +343,22 @@ class Client(object):
 
     def _flush_loop(self):
         """
-        packets accumulate in the packet.queue.  They are periodically 
-        sent to the client in intervals.  The '.05' interval, which is also
-        a minecraft tick, seems ideal.  Any shorter and packets seem to 
-        get lost (Dropped items are invisible, etc).  Any longer makes the 
-        game kind of jerky. '.1' would be tolerable unless in a combat
-        situation.
+        packets accumulate in the packet.queue.  This thread sleeps until
+        a packet is queued and then flushes everything queued.  Packets
+        queued while a flush is writing go out together in the next one.
+        A `flush_delay` (flush-max-delay-ms) is a fixed wait before each
+        flush, to let more packets collect; it adds that much latency.
+
+        This is the only thread that sends to the client, so packets are
+        always written whole and in the order they were queued.
         """
-        rate = self.flush_rate
+        delay = self.flush_delay
         while not self.abort:
-            time.sleep(rate)
             try:
+                if not self.packet.wait_for_queue(1):
+                    continue
+                if delay:
+                    time.sleep(delay)
                 self.packet.flush()
             except AttributeError:
                 self.log.debug(
@@ -308,8 +380,15 @@ class Client(object):
         A wrapper into our parsing functions.
         """
         if pkid in self.parsers[self.state]:
-            # parser can return false
-            return self.parsers[self.state][pkid]()
+            if self.stats is None:
+                # parser can return false
+                return self.parsers[self.state][pkid]()
+            state = self.state
+            start = time.time()
+            try:
+                return self.parsers[state][pkid]()
+            finally:
+                self.stats.parsed("SB", state, pkid, time.time() - start)
         return True
 
     def _set_parsers(self):
@@ -494,45 +573,10 @@ class Client(object):
         Status Request - client sends server info in response and goes
         back to HANDSHAKE mode.
         """
-        sample = []
-        for player in self.proxy.wrapper.players:
-            playerobj = self.proxy.wrapper.players[player]
-            if playerobj.username not in self.hidden_ops:
-                sample.append({"name": playerobj.username,
-                               "id": str(playerobj.mojangUuid)})
-            if len(sample) > 5:
-                break
-        reported_version = self.javaserver.protocolVersion
-        reported_name = self.javaserver.version
-        motdtext = self.javaserver.motd
-        if self.clientversion >= PROTOCOL_1_8START:
-            motdtext = processcolorcodes(motdtext.replace(
-                "\\", ""))
-        self.MOTD = {
-            "description": motdtext,
-            "players": {
-                "max": int(self.proxy.config["max-players"]),
-                "online": len(self.proxy.wrapper.players),
-                "sample": sample
-            },
-            "version": {
-                "name": reported_name,
-                "protocol": reported_version
-            }
-        }
-
-        # add Favicon, if it exists
-        if self.javaserver.servericon:
-            self.MOTD["favicon"] = self.javaserver.servericon
-
-        # add Forge information, if applicable.
-        if self.proxy.forge:
-            self.MOTD["modinfo"] = self.proxy.mod_info["modinfo"]
-
         self.packet.sendpkt(
             self.pktCB.PING_JSON_RESPONSE[PKT],
             [STRING],
-            [json.dumps(self.MOTD)]
+            [self.proxy.statuscache.status(self.clientversion)]
         )
 
         # after this, proxy waits for the expected PING to
@@ -543,8 +587,7 @@ class Client(object):
         """
         client requests a login NOW.
         """
-        # This blocks waiting for _login_authenticate_client to finish.
-        self.wait_wait_for_auth = True
+        # This waits for _login_authenticate_client to finish.
         t = threading.Thread(target=self._continue_login_start,
                              name="Login", args=())
         t.daemon = True
@@ -573,17 +616,19 @@ class Client(object):
             # maybe it is the destination of a hub? or you use another
             #  way to authenticate (password plugin?)
             self._login_authenticate_client(None)
-
-            # _login_authenticate_client already blocking since we called it...
-            self.wait_wait_for_auth = False
             return False
 
     def _continue_login_start(self):
         """
         Wait for client authentication to complete before sending login event.
         """
-        while self.wait_wait_for_auth:
-            continue
+        while not self.auth_done.wait(1):
+            if self.abort:
+                return
+        if not self.authenticated:
+            self.state = HANDSHAKE
+            self.disconnect(self.login_refused)
+            return
 
         # log the client on
         if self._logon_client_into_proxy():
@@ -657,11 +702,9 @@ class Client(object):
             return False
 
         # begin Client logon process
-        # Wrapper in online mode, taking care of authentication
-        if self._login_authenticate_client(serverid) is False:
-            self.state = HANDSHAKE
-            self.disconnect("Your client authentication failed.")
-            return False  # client failed to authenticate
+        # Wrapper in online mode, taking care of authentication.  The
+        #  session server answers _login_verified() on another thread.
+        self._login_authenticate_client(serverid)
         return False
 
     def _logon_client_into_proxy(self):
@@ -703,6 +746,12 @@ class Client(object):
                 self.notify_disconnect("I'm sorry, the server is full!")
                 return False
 
+        # the player object is born here (events with no listeners do not
+        #  look players up, so this can not be left to the event code).
+        if self.username not in self.proxy.wrapper.players:
+            self.proxy.wrapper.players[self.username] = Player(
+                self.username, self.proxy.wrapper)
+
         # Run the pre-login event
         if not self.proxy.eventhandler.callevent(
                 "player.preLogin", {
@@ -769,11 +818,14 @@ class Client(object):
 
         # start keep alives
         self.time_client_responded = time.time()
-        t_keepalives = threading.Thread(
-            target=self._keep_alive_tracker,
-            args=())
-        t_keepalives.daemon = True
-        t_keepalives.start()
+        if self.engine:
+            self.engine.start_keepalives(self)
+        else:
+            t_keepalives = threading.Thread(
+                target=self._keep_alive_tracker,
+                args=())
+            t_keepalives.daemon = True
+            t_keepalives.start()
         return True
 
     def _connect_to_server(self, ip=None, port=None):
@@ -803,9 +855,13 @@ class Client(object):
             return False, mess
 
         # start server handle() to read the packets
-        t = threading.Thread(target=self.server_connection.handle, args=())
-        t.daemon = True
-        t.start()
+        if self.engine:
+            self.engine.add_server(self.server_connection)
+        else:
+            t = threading.Thread(target=self.server_connection.handle,
+                                 args=())
+            t.daemon = True
+            t.start()
 
         # switch server_connection to LOGIN to log in to (offline) server.
         # already done at server.connect()
@@ -899,6 +955,8 @@ class Client(object):
 
         # enter lobby (close the client's rendering of the world).
         self._lobbify()
+        if self.proxy.entity_control:
+            self.proxy.entity_control.drop_client(self.username)
         despawn_dimension = self.dimension
 
         # set up for connect to server
@@ -965,9 +1023,10 @@ class Client(object):
                             "color": "red"}
 
         # We must re-send a few things to re-sync the client and (new) server.
-        # re-send chunks
+        # re-send chunks (frames as the server sent them - see
+        #  ParseCB.play_chunk_data)
         for chunks in copy.copy(self.first_chunks):
-            self.packet.sendpkt(self.pktCB.CHUNK_DATA[PKT], [RAW], chunks)
+            self.packet.send_raw_untouched(chunks)
 
         self.send_client_settings()
 
@@ -1227,69 +1286,8 @@ class Client(object):
     def _login_authenticate_client(self, server_id):
         # future TODO have option to be online but bypass session server.
         if self.onlinemode:
-            r = requests.get("https://sessionserver.mojang.com"
-                             "/session/minecraft/hasJoined?username=%s"
-                             "&serverId=%s" % (self.username, server_id))
-            if r.status_code == 200:
-                # {
-                #     "id": "<profile identifier>",
-                #     "name": "<player name>",
-                #     "properties": [
-                #         {
-                #             "name": "textures",
-                #             "value": "<base64 string>",
-                #             "signature": "<base64 string; signed data using Yggdrasil's private key>"  # noqa
-                #         }
-                #     ]
-                # }
-                requestdata = r.json()
-                playerid = requestdata["id"]
-                self.wrapper_uuid = self.proxy.wrapper.mcuuid(playerid)
-
-                if requestdata["name"] != self.username:
-                    self.disconnect("Client's username did not"
-                                    " match Mojang's record")
-                    self.log.info("Client's username did not"
-                                  " match Mojang's record %s != %s",
-                                  requestdata["name"], self.username)
-                    return False
-
-                for prop in requestdata["properties"]:
-                    if prop["name"] == "textures":
-                        self.skin_blob = prop["value"]
-                        self.proxy.skins[
-                            self.wrapper_uuid.string] = self.skin_blob
-                self.properties = requestdata["properties"]
-            else:
-                self.disconnect("Proxy Client Session-Server Error"
-                                " (HTTP Status Code %d)" % r.status_code)
-                return False
-            mojang_name = self.proxy.uuids.getusernamebyuuid(
-                self.wrapper_uuid.string, uselocalname=False)
-            self.local_uuid = self.proxy.uuids.getuuidfromname(self.username)
-            local_name = self.proxy.usercache[
-                self.wrapper_uuid.string]["localname"]
-            if mojang_name:
-                if mojang_name != local_name:
-                    if self.names_change:
-                        self.local_uuid = self.proxy.use_newname(
-                            local_name, self.username, self.wrapper_uuid.string,
-                            self
-                        )
-                    else:
-                        self.log.info("%s's client performed LOGON in with "
-                                      "new name, falling back to %s",
-                                      self.username, local_name)
-                        self.username = local_name
-
-            # verified info we can now store:
-            self.info["ip"] = self.ip
-            self.mojanguuid = self.wrapper_uuid
-            self.info["wrapperuuid"] = self.mojanguuid.string
-            self.info["realuuid"] = self.mojanguuid.string
-            self.info["serveruuid"] = self.local_uuid.string
-            self.info["username"] = self.username
-            self.info["client-is-wrapper"] = False
+            self.proxy.sessions.verify(self.username, server_id,
+                                       self._login_verified)
 
         # Wrapper offline and not authenticating
         # maybe it is the destination of a hub? or you use another
@@ -1322,8 +1320,97 @@ class Client(object):
             self.info["username"] = self.username
             self.log.debug("Client logon with wrapper offline-"
                            " 'self.wrapper_uuid = OfflinePlayer:<name>'")
+            self._login_authenticated(True)
 
-        self.wait_wait_for_auth = False
+    def _login_verified(self, status, requestdata):
+        """
+        The session server's answer (see proxy/sessions.py), on a
+        session worker thread, so it only records the result; a refused
+        client is disconnected by _continue_login_start.  The login
+        always ends here, even if checking the answer raises (the worker
+        logs the error).
+        """
+        verified = False
+        try:
+            verified = self._login_check_session(
+                status, requestdata) is not False
+        finally:
+            self._login_authenticated(verified)
+
+    def _login_authenticated(self, success):
+        """let _continue_login_start go on (or end)"""
+        self.authenticated = success
+        self.auth_done.set()
+
+    def _login_check_session(self, status, requestdata):
+        """
+        Take the player's verified uuid, name and skin from the session
+        server's `requestdata`.  Returns False if the login is refused
+        (and sets `login_refused`).
+        """
+        if status == 200:
+            # {
+            #     "id": "<profile identifier>",
+            #     "name": "<player name>",
+            #     "properties": [
+            #         {
+            #             "name": "textures",
+            #             "value": "<base64 string>",
+            #             "signature": "<base64 string; signed data using Yggdrasil's private key>"  # noqa
+            #         }
+            #     ]
+            # }
+            playerid = requestdata["id"]
+            self.wrapper_uuid = self.proxy.wrapper.mcuuid(playerid)
+
+            if requestdata["name"] != self.username:
+                self.login_refused = ("Client's username did not"
+                                      " match Mojang's record")
+                self.log.info("Client's username did not"
+                              " match Mojang's record %s != %s",
+                              requestdata["name"], self.username)
+                return False
+
+            for prop in requestdata["properties"]:
+                if prop["name"] == "textures":
+                    self.skin_blob = prop["value"]
+                    self.proxy.skins[
+                        self.wrapper_uuid.string] = self.skin_blob
+            self.properties = requestdata["properties"]
+        elif status == 0:
+            self.login_refused = ("Proxy Client Session-Server Error"
+                                  " (could not reach the session server)")
+            return False
+        else:
+            self.login_refused = ("Proxy Client Session-Server Error"
+                                  " (HTTP Status Code %d)" % status)
+            return False
+        mojang_name = self.proxy.uuids.getusernamebyuuid(
+            self.wrapper_uuid.string, uselocalname=False)
+        self.local_uuid = self.proxy.uuids.getuuidfromname(self.username)
+        local_name = self.proxy.usercache[
+            self.wrapper_uuid.string]["localname"]
+        if mojang_name:
+            if mojang_name != local_name:
+                if self.names_change:
+                    self.local_uuid = self.proxy.use_newname(
+                        local_name, self.username, self.wrapper_uuid.string,
+                        self
+                    )
+                else:
+                    self.log.info("%s's client performed LOGON in with "
+                                  "new name, falling back to %s",
+                                  self.username, local_name)
+                    self.username = local_name
+
+        # verified info we can now store:
+        self.info["ip"] = self.ip
+        self.mojanguuid = self.wrapper_uuid
+        self.info["wrapperuuid"] = self.mojanguuid.string
+        self.info["realuuid"] = self.mojanguuid.string
+        self.info["serveruuid"] = self.local_uuid.string
+        self.info["username"] = self.username
+        self.info["client-is-wrapper"] = False
 
     def _add_client(self):
         """
@@ -1339,39 +1426,53 @@ class Client(object):
         """
         while not self.abort:
             time.sleep(1)
-            if self.state in (PLAY, LOBBY):
-                # client expects < 20sec
-                # sending more frequently (5 seconds) seems to help with
-                # some slower connections.
-                if time.time() - self.time_last_ping_to_client > 9:
-                    # vanilla MC 1.12 .2 uses a time() value.
-                    # I use simple incrementing numbers vs randoms... I mean,
-                    # what is the point of a random keepalive?
-                    if self.version < PROTOCOL_1_12_2:
-                        # sending a keepalive every second for more than 68
-                        # years would be required to exceed the VARINT capacity
-                        self.keepalive_val += 1
-                    else:
-                        # running forever would not allow keepalive to exceed
-                        # LONG contraints
-                        self.keepalive_val += 1
-
-                    # challenge the client with it
-                    self.packet.sendpkt(
-                        self.pktCB.KEEP_ALIVE[PKT],
-                        self.pktCB.KEEP_ALIVE[PARSER],
-                        [self.keepalive_val])
-
-                    self.time_last_ping_to_client = time.time()
-
-                # check for active client keep alive status:
-                # server can allow up to 30 seconds for response
-                if time.time() - self.time_client_responded > 30:
-                    self.disconnect("Client closed due to lack of"
-                                    " keepalive response")
-                    self.log.debug("Closed %s's client thread due to "
-                                   "lack of keepalive response", self.username)
-                    return
+            if not self._keep_alive_tick():
+                return
+        self._keep_alive_ended()
+
+    def _keep_alive_tick(self):
+        """
+        One pass of the keep alive tracker; runs once a second.
+
+        :returns: False if the client was disconnected for not
+         responding.
+        """
+        if self.state in (PLAY, LOBBY):
+            # client expects < 20sec
+            # sending more frequently (5 seconds) seems to help with
+            # some slower connections.
+            if time.time() - self.time_last_ping_to_client > 9:
+                # vanilla MC 1.12 .2 uses a time() value.
+                # I use simple incrementing numbers vs randoms... I mean,
+                # what is the point of a random keepalive?
+                if self.version < PROTOCOL_1_12_2:
+                    # sending a keepalive every second for more than 68
+                    # years would be required to exceed the VARINT capacity
+                    self.keepalive_val += 1
+                else:
+                    # running forever would not allow keepalive to exceed
+                    # LONG contraints
+                    self.keepalive_val += 1
+
+                # challenge the client with it
+                self.packet.sendpkt(
+                    self.pktCB.KEEP_ALIVE[PKT],
+                    self.pktCB.KEEP_ALIVE[PARSER],
+                    [self.keepalive_val])
+
+                self.time_last_ping_to_client = time.time()
+
+            # check for active client keep alive status:
+            # server can allow up to 30 seconds for response
+            if time.time() - self.time_client_responded > 30:
+                self.disconnect("Client closed due to lack of"
+                                " keepalive response")
+                self.log.debug("Closed %s's client thread due to "
+                               "lack of keepalive response", self.username)
+                return False
+        return True
+
+    def _keep_alive_ended(self):
         self.log.debug("%s Client keepalive tracker aborted", self.username)
         self.disconnect("Client disconnected.")
         self.state = HANDSHAKE
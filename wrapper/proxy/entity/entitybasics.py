@@ -109,12 +109,22 @@ class Objects(object):
 
 
 class Entity(object):
+    """
+    One tracked entity.  There can be tens of thousands of these (one per
+    entity per client), so it has no __dict__, and its position is kept
+    as three floats that moves update in place.  `position` (a tuple)
+    and `about_entity()` are only built when asked for.
+    """
+    __slots__ = ("eid", "uuid", "entitytype", "x", "y", "z", "look",
+                 "rodeBy", "riding", "isObject", "entityname", "active",
+                 "clientname", "chunk")
+
     def __init__(self, eid, uuid, entitytype, entityname, position, look,
                  isobject, playerclientname):
         self.eid = eid  # Entity ID
         self.uuid = uuid  # Entity UUID
         self.entitytype = entitytype  # Type of Entity
-        self.position = position  # (x, y, z)
+        self.x, self.y, self.z = position
         self.look = look  # Head Position
         self.rodeBy = False
         self.riding = False
@@ -124,39 +134,50 @@ class Entity(object):
         self.entityname = entityname
         self.active = currtime()
         self.clientname = playerclientname
+        # (chunk x, chunk z) it is filed under by its EntityStore
+        self.chunk = None
 
     def __str__(self):
         return self.entitytype
 
+    @property
+    def position(self):
+        """(x, y, z)"""
+        return self.x, self.y, self.z
+
+    @position.setter
+    def position(self, position):
+        self.x, self.y, self.z = position
+
     def move_relative(self, position):
         """ Move the entity relative to their position, unless it is illegal.
 
         This only "tracks" its' position (does not set the position)
 
         Args:
-            position:
+            position: (dx, dy, dz) in 1/4096 blocks
         """
         x, y, z = position
-        oldposition = [self.position[0], self.position[1], self.position[2]]
-        oldposition[0] += x / (128 * 32.0)
-        oldposition[1] += y / (128 * 32.0)
-        oldposition[2] += z / (128 * 32.0)
-        self.position = (oldposition[0], oldposition[1], oldposition[2])
+        self.x += x / (128 * 32.0)
+        self.y += y / (128 * 32.0)
+        self.z += z / (128 * 32.0)
         if self.rodeBy:
-            self.rodeBy.position = self.position
+            self.rodeBy.position = (self.x, self.y, self.z)
 
     def teleport(self, position):
         """ Track entity teleports to a specific location. """
-        self.position = (position[0] / 32, position[1] / 32, position[2] / 32)  # Fixed point numbers...
+        # Fixed point numbers...
+        self.x, self.y, self.z = (
+            position[0] / 32, position[1] / 32, position[2] / 32)
         if self.rodeBy:
-            self.rodeBy.position = self.position
+            self.rodeBy.position = (self.x, self.y, self.z)
 
     def about_entity(self):
         info = {
             "eid": self.eid,
             "uuid": str(self.uuid),
             "type": self.entitytype,
-            "position": [int(self.position[0]), int(self.position[1]), int(self.position[2])],
+            "position": [int(self.x), int(self.y), int(self.z)],
             "rodeBy": self.rodeBy,
             "Riding": self.riding,
             "isObject": self.isObject,
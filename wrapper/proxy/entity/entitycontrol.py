@@ -9,6 +9,7 @@ from time import sleep
 import threading
 from proxy.entity.entitybasics import Entities as Entitytypes
 from proxy.entity.entitybasics import Objects as Objecttypes
+from proxy.entity.entitystore import EntityStore
 
 
 # noinspection PyPep8Naming
@@ -58,8 +59,6 @@ class EntityControl(object):
         # load config settings
         self.entityControl = self.ent_config[
             "enable-entity-controls"]
-        self.entityProcessorFrequency = self.ent_config[
-            "entity-update-frequency"]
         self.thiningFrequency = self.ent_config[
             "thinning-frequency"]
         self.startThinningThreshshold = self.ent_config[
@@ -67,15 +66,12 @@ class EntityControl(object):
         # self.kill_aura_radius = self.javaserver.config["Entities"][
         #   "player-thinning-radius"]
 
-        self.entities = {}
+        # {client name: EntityStore} - eids are only unique per client.
+        #  A client's store is dropped when it leaves (Proxy.
+        #  removestaleclients), changes servers or respawns.
+        self.stores = {}
         if self.entityControl:
 
-            # entity processor thread
-            t = threading.Thread(target=self._entity_processor,
-                                 name="entProc", args=())
-            t.daemon = True
-            t.start()
-
             # entity killer thread
 
             ekt = threading.Thread(target=self._entity_thinner,
@@ -83,29 +79,87 @@ class EntityControl(object):
             ekt.daemon = True
             ekt.start()
 
-    # noinspection PyBroadException
-    def getEntityByEID(self, eid):
+    def store(self, clientname):
+        """the EntityStore for a client (created if needed)"""
+        store = self.stores.get(clientname)
+        if store is None:
+            store = self.stores.setdefault(clientname,
+                                           EntityStore(clientname))
+        return store
+
+    def add_entity(self, entity):
+        """track a spawned entity in its client's store"""
+        self.store(entity.clientname).add(entity)
+
+    def remove_entity(self, clientname, eid):
+        """stop tracking a destroyed entity.  returns it, or None"""
+        store = self.stores.get(clientname)
+        if store is None:
+            return None
+        return store.remove(eid)
+
+    def drop_client(self, clientname):
+        """forget all the entities in a client's world (it left, or its
+        world was unloaded)"""
+        self.stores.pop(clientname, None)
+
+    def move_entity(self, entity, delta):
+        """track a relative move (and a change of chunk)"""
+        entity.move_relative(delta)
+        store = self.stores.get(entity.clientname)
+        if store is not None:
+            store.relocate(entity)
+
+    def teleport_entity(self, entity, position):
+        """track a teleport (position in 1/32 blocks)"""
+        entity.teleport(position)
+        store = self.stores.get(entity.clientname)
+        if store is not None:
+            store.relocate(entity)
+
+    def getEntityByEID(self, eid, playername=None):
         """
         Returns the entity context or False if the specified entity
         ID doesn't exist.
 
+        :Args:
+            :eid: Entity EID on server
+            :playername: the player in whose world the entity is.  Entity
+             ids are only unique per player; without a name, the first
+             player found with that eid is used.
+
         CAUTION understand that entities are very DYNAMIC.  The
         entity object you get could be modified or even deleted
         at any time!
 
         """
-        try:
-            return self.entities[eid]
-        except Exception:  # as e:
-            # self.log.debug("getEntityByEID returned False: %s", e)
-            return False
+        if playername is not None:
+            store = self.stores.get(playername)
+            entity = store.get(eid) if store is not None else None
+            return entity or False
+        for store in list(self.stores.values()):
+            entity = store.get(eid)
+            if entity is not None:
+                return entity
+        return False
 
     def countActiveEntities(self):
         """
         return an integer count of all entities.
 
         """
-        return len(self.entities)
+        return sum(len(store) for store in list(self.stores.values()))
+
+    def countEntityTypesInPlayer(self, playername):
+        """
+        returns a dictionary of how many of each kind of entity exist in
+        a player's client, like {"Cow": 12, "Zombie": 3}.
+
+        """
+        store = self.stores.get(playername)
+        if store is None:
+            return {}
+        return dict(store.counts)
 
     def countEntitiesInPlayer(self, playername):
         """
@@ -129,19 +183,16 @@ class EntityControl(object):
             @:type Dict
 
         """
-        ents = []
-        entities = self.entities
-        for v in iter(entities.values()):
-            if v.clientname == playername:
-                about = v.about_entity
-                if about:
-                    ents.append(about())
-        return ents
-
-    def getEntityInfo(self, eid):
+        store = self.stores.get(playername)
+        if store is None:
+            return []
+        return [entity.about_entity()
+                for entity in list(store.entities.values())]
+
+    def getEntityInfo(self, eid, playername=None):
         """
         Get a dictionary of info on the specified EID.  Returns
-        None if fails
+        None if fails (see getEntityByEID for `playername`)
 
         :Sample item:
             .. code:: python
@@ -173,21 +224,23 @@ class EntityControl(object):
 
         """
         try:
-            return self.getEntityByEID(eid).about_entity()
+            return self.getEntityByEID(eid, playername).about_entity()
         except AttributeError:
             return None
 
-    def existsEntityByEID(self, eid):
+    def existsEntityByEID(self, eid, playername=None):
         """
-        Test whether the specified eid is valid
+        Test whether the specified eid is valid (see getEntityByEID for
+        `playername`)
 
         """
-        if eid in self.entities:
+        if self.getEntityByEID(eid, playername):
             return True
         else:
             return False
 
-    def killEntityByEID(self, eid, dropitems=False, count=1):
+    def killEntityByEID(self, eid, dropitems=False, count=1,
+                        playername=None):
         """
         Takes the entity by eid and kills the first entity of
         that type centered at the coordinates where that entity is.
@@ -198,14 +251,15 @@ class EntityControl(object):
              loot.  Only works if gamerule doMobDrops is true.
             :count: used to specify more than one entity; again,
              centers on the specified eid location.
+            :playername: the player in whose world the eid is.
 
         """
-        entityinfo = self.getEntityInfo(eid)
-        if not entityinfo:
+        entity = self.getEntityByEID(eid, playername)
+        if not entity:
             return
 
-        pos = entityinfo["position"]
-        entitydesc = entityinfo["name"]
+        pos = entity.position
+        entitydesc = entity.entityname
         if dropitems:
             # kill them (get loots if server has doMobDrops set to true)
             console_command = "kill @e[type=%s,x=%d,y=%d,z=%d,c=%s]" % (
@@ -217,34 +271,56 @@ class EntityControl(object):
 
         self.proxy.run_command(console_command)
 
-    def _entity_processor(self):
-        self._log.debug("_entityprocessor thread started.")
-        timer = float(0)
-        # server is running
-        while self.javaserver.state in (1, 2, 4) and not (
-                self.proxy.wrapper.haltsig.halt or self.proxy.abort
-        ):
-            timer += .1
-            sleep(.1)
-            # timer for removing stale entities we want a FAST response
-            # to server shutdowns (activate while loop frequently)
-            if timer < float(self.entityProcessorFrequency):
-                continue
-            timer = float(0)
+    def entities_within(self, position, radius, type=None, playername=None):
+        """
+        Returns a list of the entities within `radius` blocks of
+        `position` (x, y, z).  Only the chunks within the radius are
+        looked at.
 
-            # start looking for stale client entities
-            playerlist = []
-            for player in self.proxy.clients:
-                playerlist.append(player.username)
-            entity_eids = list(self.entities.keys())
-            for eid in entity_eids:
-                if self.getEntityByEID(eid).clientname not in playerlist:
-                    # noinspection PyBroadException
-                    try:
-                        self.entities.pop(eid, None)
-                    except:
-                        pass
-        self._log.debug("_entityprocessor thread closed.")
+        :Args:
+            :position: (x, y, z) centre
+            :radius: in blocks
+            :type: only entities of this name ("Cow") or type number
+            :playername: the player in whose world to look.  Without a
+             name, every player's world is searched (an entity seen by
+             two players is then listed twice, with their two eids).
+
+        """
+        if playername is not None:
+            stores = [self.stores.get(playername)]
+        else:
+            stores = list(self.stores.values())
+        found = []
+        for store in stores:
+            if store is not None:
+                found.extend(store.within(position, radius, type))
+        return found
+
+    def chunk_density(self, playername=None, type=None):
+        """
+        Returns a dictionary of how many entities are in each chunk,
+        like {(chunk x, chunk z): 37}, to find mob farms and other
+        hotspots.  Chunks with none are left out.
+
+        :Args:
+            :playername: the player in whose world to count.  Without a
+             name, each chunk gets the highest count any player has for
+             it (players near the same chunk see the same entities).
+            :type: only count entities of this name ("Cow") or type
+             number
+
+        """
+        if playername is not None:
+            store = self.stores.get(playername)
+            if store is None:
+                return {}
+            return store.density(type)
+        density = {}
+        for store in list(self.stores.values()):
+            for chunk, count in store.density(type).items():
+                if count > density.get(chunk, 0):
+                    density[chunk] = count
+        return density
 
     # each entity IS a dictionary, so...
     # noinspection PyTypeChecker
@@ -274,19 +350,14 @@ class EntityControl(object):
             # loop through playerlist
             for playerclient in playerlist:
                 players_position = playerclient.position
-                his_entities = self.countEntitiesInPlayer(playerclient.username)
-                if len(his_entities) < self.startThinningThreshshold:
+                store = self.stores.get(playerclient.username)
+                if store is None or len(
+                        store) < self.startThinningThreshshold:
                     # don't worry with this player, his load is light.
                     continue
 
-                # now we need to count each entity type
-                counts = {}
-                for entity in his_entities:
-                    if entity["name"] in counts:
-                        counts[entity["name"]] += 1
-                    else:
-                        counts[entity["name"]] = 1  # like {"Cow": 1}
-
+                # the count of each entity type, like {"Cow": 1}
+                counts = dict(store.counts)
                 for mob_type in counts:
                     if "thin-%s" % mob_type in self.ent_config:
                         maxofthiskind = self.ent_config["thin-%s" % mob_type]
@@ -304,11 +375,21 @@ class EntityControl(object):
                             killcount = (counts[mob_type] - maxofthiskind) // 2
                             if killcount > 1:
                                 self._kill_around_player(
-                                    players_position, "%s" % mob_type,
-                                    killcount)
+                                    self._hotspot(store, mob_type,
+                                                  players_position),
+                                    "%s" % mob_type, killcount)
 
         self._log.debug("_entity_thinner thread closed.")
 
+    def _hotspot(self, store, entity_name, position):
+        """the centre of the chunk with the most of a kind of entity (at
+        the height of `position`), or `position` itself"""
+        density = store.density(entity_name)
+        if not density:
+            return position
+        chunkx, chunkz = max(density, key=density.get)
+        return chunkx * 16 + 8, position[1], chunkz * 16 + 8
+
     def _kill_around_player(self, position, entity_name, count):
         pos = position
         # send those creatures away
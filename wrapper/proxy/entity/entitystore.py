@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+The entities tracked in one client's world.
+
+Entity ids are only unique within one client connection (the server
+numbers the entities of each player's world on its own), so
+EntityControl keeps one `EntityStore` per client name.  Each store also
+keeps a running count of its entities by name ({"Cow": 12, ...}),
+updated as they spawn and are destroyed, so counting a player's mobs
+does not have to look at them.
+
+The entities are also filed by the chunk (16x16 column) they are in, and
+moved to another chunk when a move or teleport takes them there, so
+radius and per-chunk queries only look at the chunks concerned.
+"""
+
+
+def chunk_of(position):
+    """the (chunk x, chunk z) of a block position"""
+    return int(position[0] // 16), int(position[2] // 16)
+
+
+class EntityStore(object):
+    def __init__(self, clientname):
+        self.clientname = clientname
+        # {eid: Entity}
+        self.entities = {}
+        # {entity name: number of them}
+        self.counts = {}
+        # {(chunk x, chunk z): {eid: Entity}}
+        self.chunks = {}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def get(self, eid):
+        """the Entity for `eid`, or None"""
+        return self.entities.get(eid)
+
+    def add(self, entity):
+        """track `entity` (replacing any entity with the same eid)"""
+        old = self.entities.get(entity.eid)
+        if old is not None:
+            self._forget(old)
+        self.entities[entity.eid] = entity
+        name = entity.entityname
+        self.counts[name] = self.counts.get(name, 0) + 1
+        entity.chunk = int(entity.x // 16), int(entity.z // 16)
+        self.chunks.setdefault(entity.chunk, {})[entity.eid] = entity
+
+    def remove(self, eid):
+        """stop tracking `eid`.  returns the Entity, or None"""
+        entity = self.entities.pop(eid, None)
+        if entity is not None:
+            self._forget(entity)
+        return entity
+
+    def relocate(self, entity):
+        """re-file `entity` after it moved (if it changed chunks)"""
+        chunk = int(entity.x // 16), int(entity.z // 16)
+        if chunk == entity.chunk:
+            return
+        self._unfile(entity)
+        entity.chunk = chunk
+        self.chunks.setdefault(chunk, {})[entity.eid] = entity
+
+    def within(self, position, radius, type=None):
+        """
+        The entities within `radius` blocks of `position` (x, y, z).
+        `type` may be an entity name ("Cow") or type number.
+        """
+        x, y, z = position[0], position[1], position[2]
+        lowx, lowz = chunk_of((x - radius, 0, z - radius))
+        highx, highz = chunk_of((x + radius, 0, z + radius))
+        limit = radius * radius
+        found = []
+        for cx in range(lowx, highx + 1):
+            for cz in range(lowz, highz + 1):
+                chunk = self.chunks.get((cx, cz))
+                if not chunk:
+                    continue
+                for entity in list(chunk.values()):
+                    if type is not None and not (
+                            entity.entityname == type or
+                            entity.entitytype == type):
+                        continue
+                    if (entity.x - x) ** 2 + (entity.y - y) ** 2 + (
+                            entity.z - z) ** 2 <= limit:
+                        found.append(entity)
+        return found
+
+    def density(self, type=None):
+        """{(chunk x, chunk z): number of entities} (of `type`, if given)"""
+        counts = {}
+        for chunk, entities in list(self.chunks.items()):
+            if type is None:
+                count = len(entities)
+            else:
+                count = 0
+                for entity in list(entities.values()):
+                    if entity.entityname == type or \
+                            entity.entitytype == type:
+                        count += 1
+            if count:
+                counts[chunk] = count
+        return counts
+
+    def clear(self):
+        self.entities = {}
+        self.counts = {}
+        self.chunks = {}
+
+    def _unfile(self, entity):
+        chunk = self.chunks.get(entity.chunk)
+        if chunk is not None and chunk.get(entity.eid) is entity:
+            del chunk[entity.eid]
+            if not chunk:
+                del self.chunks[entity.chunk]
+
+    def _forget(self, entity):
+        self._unfile(entity)
+        name = entity.entityname
+        count = self.counts.get(name, 0) - 1
+        if count > 0:
+            self.counts[name] = count
+        else:
+            self.counts.pop(name, None)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+The checks every accepted connection passes before wrapper spends a
+thread or a Client on it:
+
+- no more than `max-handshakes` connections may be waiting on their
+  handshake at once (see StatusResponder).
+- each IP gets a token bucket: `connect-burst-per-ip` connections at
+  once, refilled at `connect-rate-per-ip` per second.
+- silently banned IPs (`silent-ipban`) are refused.  This is checked in
+  the proxy's in-memory ban lists (see bans.py).
+
+Refused sockets are closed right away.  `counters` counts each outcome.
+"""
+
+from proxy.utils.ratelimit import TokenBuckets
+
+
+class ConnectionGate(object):
+    def __init__(self, proxy):
+        self.proxy = proxy
+        config = proxy.config
+        self.max_handshakes = config["max-handshakes"]
+        self.rate = config["connect-rate-per-ip"]
+        self.buckets = TokenBuckets(self.rate, config["connect-burst-per-ip"])
+        self.silent_ip_banning = proxy.silent_ip_banning
+        self.counters = {"accepted": 0, "busy": 0, "rate_limited": 0,
+                         "banned": 0}
+
+    def admit(self, ip, handshaking=0):
+        """
+        Decide whether to take a new connection from `ip`, given the
+        number of connections already `handshaking`.
+
+        :returns: (admit, banned).  A banned IP is only refused with
+         `silent-ipban`; otherwise the Client tells them at login.
+        """
+        if self.max_handshakes and handshaking >= self.max_handshakes:
+            self.counters["busy"] += 1
+            return False, False
+        if self.rate > 0 and not self.buckets.take(ip):
+            self.counters["rate_limited"] += 1
+            return False, False
+        banned = self.proxy.bans.find_ip(ip) is not None
+        if banned and self.silent_ip_banning:
+            self.counters["banned"] += 1
+            return False, True
+        self.counters["accepted"] += 1
+        return True, banned
+
+    def tick(self):
+        """periodic housekeeping (about once a second)"""
+        self.buckets.prune()
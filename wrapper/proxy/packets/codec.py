@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Compiled read/send plans for `Packet.readpkt` and `Packet.sendpkt`.
+
+A parser list such as `[VARINT, DOUBLE, DOUBLE, DOUBLE, BYTE, BYTE]` is
+compiled once into a plan.  Runs of fixed-width fields become a single
+precompiled `struct.Struct`; everything else (varints, strings, slots,
+metadata, etc) is left as a single step handled by the Packet's own
+read_*/send_* method.
+
+Plans are cached by the parser list contents, so the parser lists in
+mcpackets_cb/mcpackets_sb (which are fixed per protocol version) only
+ever get compiled once.
+"""
+
+import struct
+
+from proxy.utils.constants import *
+
+# data types that always have the same width, and their struct codes.
+FIXED = {
+    UBYTE: "B",
+    BYTE: "b",
+    INT: "i",
+    SHORT: "h",
+    USHORT: "H",
+    LONG: "q",
+    DOUBLE: "d",
+    FLOAT: "f",
+    BOOL: "?",
+}
+
+# step kinds
+STRUCT = 0
+SINGLE = 1
+
+_PLANS = {}
+
+
+def compile_plan(args):
+    """
+    Return the plan for a parser list.  A plan is a tuple of steps:
+
+        (STRUCT, <struct.Struct>, <number of fields>)
+        (SINGLE, <data type constant>, 1)
+
+    """
+    key = tuple(args)
+    try:
+        return _PLANS[key]
+    except KeyError:
+        pass
+
+    plan = []
+    run = ""
+    for arg in key:
+        if arg in FIXED:
+            run += FIXED[arg]
+            continue
+        if run:
+            plan.append((STRUCT, struct.Struct(">" + run), len(run)))
+            run = ""
+        plan.append((SINGLE, arg, 1))
+    if run:
+        plan.append((STRUCT, struct.Struct(">" + run), len(run)))
+
+    plan = tuple(plan)
+    _PLANS[key] = plan
+    return plan
@@ -10,15 +10,18 @@
 
 # standard
 from collections import deque
-import io  # PY3
 import json
 import struct
+import threading
+import time
 import zlib
 import sys
 # import StringIO
 
 # local
 from proxy.utils.constants import *
+from proxy.packets.codec import compile_plan, STRUCT
+from proxy.packets.packetview import PacketView
 
 # Py3-2
 PY3 = sys.version_info > (3,)
@@ -59,28 +62,170 @@ _CODERS = {
     "rest": 90,
     "raw": 90
 }
+
+# size of each socket read made by the receive buffer.
+RECV_BLOCK = 32768
+# most buffers handed to one sendmsg() call (Linux IOV_MAX).
+SEND_IOV_MAX = 1024
+# queue compression value for packets that are already framed (see
+#  frame() and send_framed()).
+FRAMED = -2
+
+
+def _encode_varint(val):
+    if val < 0:
+        val = (1 << 32) + val
+    out = bytearray()
+    while val >= 0x80:
+        out.append(0x80 | (val & 0x7F))
+        val >>= 7
+    out.append(val)
+    return bytes(out)
+
+
+# pre-encoded varints for 0-16383 (one or two bytes).  This covers packet
+#  ids, most lengths and most entity ids.
+VARINT_TABLE_SIZE = 16384
+_VARINTS = tuple(_encode_varint(x) for x in xrange(VARINT_TABLE_SIZE))
+
+if PY3:
+    def _varint_at(buf, pos):
+        """decode the varint at buf[pos].  returns (value, next position)
+        raises IndexError if buf ends first."""
+        val = buf[pos]
+        if val < 0x80:
+            return val, pos + 1
+        total = val & 0x7F
+        shift = 7
+        while True:
+            pos += 1
+            val = buf[pos]
+            total |= (val & 0x7F) << shift
+            if val < 0x80:
+                break
+            shift += 7
+        if total & (1 << 31):
+            total = total - (1 << 32)
+        return total, pos + 1
+else:
+    def _varint_at(buf, pos):
+        val = ord(buf[pos])
+        if val < 0x80:
+            return val, pos + 1
+        total = val & 0x7F
+        shift = 7
+        while True:
+            pos += 1
+            val = ord(buf[pos])
+            total |= (val & 0x7F) << shift
+            if val < 0x80:
+                break
+            shift += 7
+        if total & (1 << 31):
+            total = total - (1 << 32)
+        return total, pos + 1
+
+# precompiled structs for the fixed width data types.
+_UBYTE = struct.Struct("B")
+_BYTE = struct.Struct("b")
+_SHORT = struct.Struct(">h")
+_USHORT = struct.Struct(">H")
+_INT = struct.Struct(">i")
+_LONG = struct.Struct(">q")
+_ULONG = struct.Struct(">Q")
+_FLOAT = struct.Struct(">f")
+_DOUBLE = struct.Struct(">d")
+_VECTOR3I = struct.Struct(">iii")
+_VECTOR3F = struct.Struct(">fff")
+# 1.9+ entity metadata item header (index, type)
+_META_HEADER = struct.Struct("Bb")
 # endregion
 
 
+class Deflating(object):
+    """A queued payload that is being compressed on the zlib pool."""
+    __slots__ = ("future", "size")
+
+    def __init__(self, future, size):
+        self.future = future
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+
 # noinspection PyMethodMayBeStatic,PyBroadException,PyAugmentAssignment
 class Packet(object):
     def __init__(self, sock, obj):
         self.socket = sock
         self.obj = obj
         self.log = self.obj.log
-        self.recvCipher = None
+        self._recvcipher = None
         self.sendCipher = None
         self.compressThreshold = -1
         self.compression = False
+        # zlib level for packets compressed here (the owner sets this from
+        #  the Proxy config).  Forwarded packets are never recompressed.
+        self.compresslevel = zlib.Z_DEFAULT_COMPRESSION
+        # packets of at least `offload_size` bytes are compressed on this
+        #  (concurrent.futures) pool instead of by the flushing thread.
+        self.zlib_pool = None
+        self.offload_size = 0
         self.abort = False
 
         # this is set by the calling class/method.  Not presently used here,
         #  but could be. maybe to decide which metadata parser to use?
         self.version = self.obj.javaserver.protocolVersion
-        self.buffer = io.BytesIO()  # Py3
-        # self.buffer = StringIO.StringIO()
+        # the packet being parsed (a memoryview on Py3) and the read
+        #  position in it.  See read_data().
+        self._pbuf = self._frame(memoryview(b""))
+        self._ppos = 0
+        # the frame of the packet being parsed, as it was received (still
+        #  compressed, if it was).  Only valid while its parser runs.
+        self.raw_frame = b""
+
+        # receive buffer - decrypted socket bytes not yet split into frames.
+        #  A new buffer object is created on each socket read (never
+        #  resized), so frames handed out as memoryviews stay valid.
+        self._rbuf = b""
+        self._rpos = 0
+        self._rblock = bytearray(RECV_BLOCK)
+        # a compressed packet that has only had its packet id inflated.
+        self._inflater = None
+        # bytes given to feed() that are not in _rbuf yet, and how many
+        #  bytes past _rpos the next frame needs (see grab_buffered()).
+        self._rparts = []
+        self._rpartlen = 0
+        self._rwant = 0
 
         self.queue = deque([])
+        # signalled when packets are queued.
+        queuelock = threading.Lock()
+        self._queued = threading.Condition(queuelock)
+        # serializes flush(), so only one thread ever writes to the socket.
+        self._flushlock = threading.Lock()
+
+        # backpressure.  `queued_bytes` counts payloads queued or still
+        #  being written.  Passing `high_water` sets `throttled` until the
+        #  queue drains to `low_water` (see wait_for_drain()).  The owner
+        #  sets the marks from the Proxy config; 0 is unbounded.
+        self.high_water = 0
+        self.low_water = 0
+        self.queued_bytes = 0
+        self.throttled = False
+        self._unsent = 0
+        self._drained = threading.Condition(queuelock)
+        # optional callable run (on the queueing thread) when the queue goes
+        #  from empty to not empty, and on close().  The asyncio engine uses
+        #  this in place of wait_for_queue().
+        self.on_queued = None
+        # running totals for flush(); see record_flush().
+        self.flushstats = {"flushes": 0, "packets": 0, "bytes": 0,
+                           "seconds": 0.0}
+        # optional PacketStats that received packets are counted in, as
+        #  `direction` ("SB" or "CB") in the owner's current state.
+        self.stats = None
+        self.direction = None
 
         # encode/decode for NBT operations
         self._ENCODERS = {
@@ -109,6 +254,100 @@ class Packet(object):
             10: self.read_comp,
             11: self.read_int_array
         }
+        # NBT values to step over: a fixed size, or a method that skips one.
+        self._NBT_SKIP = {
+            1: 1,
+            2: 2,
+            3: 4,
+            4: 8,
+            5: 4,
+            6: 8,
+            7: self._skip_byte_array,
+            8: self._skip_short_string,
+            9: self._skip_list,
+            10: self._skip_comp,
+            11: self._skip_int_array
+        }
+
+        # entity metadata values, by type id (1.9+)
+        self._META19_READ = {
+            0: self.read_byte,
+            1: self.read_varint,
+            2: self.read_float,
+            3: self.read_string,
+            4: self.read_json,
+            5: self.read_slot,
+            6: self.read_bool,
+            7: self.read_vector3f,
+            8: self.read_position,
+            9: self.read_opt_position,
+            10: self.read_varint,
+            11: self.read_opt_uuid,
+            12: self.read_varint,
+            13: self.read_metadata_nbt
+        }
+        self._META19_SEND = {
+            0: self.send_byte,
+            1: self.send_varint,
+            2: self.send_float,
+            3: self.send_string,
+            4: self.send_json,
+            5: self.send_slot,
+            6: self.send_bool,
+            7: self.send_vector3f,
+            8: self.send_position,
+            9: self.send_opt_position,
+            10: self.send_varint,
+            11: self.send_opt_uuid,
+            12: self.send_varint
+        }
+        self._META19_SKIP = {
+            0: 1,
+            1: self._skip_varint,
+            2: 4,
+            3: self._skip_bytearray,
+            4: self._skip_bytearray,
+            5: self._skip_slot,
+            6: 1,
+            7: 12,
+            8: 8,
+            9: self._skip_opt_position,
+            10: self._skip_varint,
+            11: self._skip_opt_uuid,
+            12: self._skip_varint,
+            13: self._skip_rest
+        }
+        # pre-1.9 entity metadata values, by type id
+        self._META_READ = {
+            0: self.read_byte,
+            1: self.read_short,
+            2: self.read_int,
+            3: self.read_float,
+            4: self.read_string,
+            5: self.read_slot,
+            6: self.read_vector3i,
+            7: self.read_vector3f
+        }
+        self._META_SEND = {
+            0: self.send_byte,
+            1: self.send_short,
+            2: self.send_int,
+            3: self.send_float,
+            4: self.send_string,
+            5: self.send_slot,
+            6: self.send_vector3i,
+            7: self.send_vector3f
+        }
+        self._META_SKIP = {
+            0: 1,
+            1: 2,
+            2: 4,
+            3: 4,
+            4: self._skip_bytearray,
+            5: self._skip_slot,
+            6: 12,
+            7: 12
+        }
 
         # packet send/read operations
         self._PKTSEND = {
@@ -163,6 +402,70 @@ class Packet(object):
 
     def close(self):
         self.abort = True
+        with self._queued:
+            self._queued.notify_all()
+            self._drained.notify_all()
+        if self.on_queued:
+            self.on_queued()
+
+    def wait_for_queue(self, timeout=None):
+        """
+        Block until a packet is queued, the Packet is closed, or
+        `timeout` seconds pass.
+
+        :returns: True if there are packets waiting to be flushed.
+        """
+        with self._queued:
+            if not self.queue and not self.abort:
+                self._queued.wait(timeout)
+            return len(self.queue) > 0
+
+    def wait_for_drain(self, timeout=None):
+        """
+        Block while the queue is `throttled` (it went over `high_water`
+        and has not been flushed down to `low_water` yet), or until the
+        Packet is closed.  Readers of the other side of the connection
+        call this so they don't queue more than the socket can take.
+
+        :returns: False if `timeout` seconds passed first.
+        """
+        if timeout is not None:
+            deadline = time.time() + timeout
+        with self._queued:
+            while self.throttled and not self.abort:
+                if timeout is None:
+                    self._drained.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+        return True
+
+    def queue_depth(self):
+        """packets and bytes waiting to be sent, and if we're throttled"""
+        with self._queued:
+            return {"packets": len(self.queue),
+                    "bytes": self.queued_bytes,
+                    "throttled": self.throttled,
+                    "high_water": self.high_water,
+                    "low_water": self.low_water}
+
+    @property
+    def recvCipher(self):
+        return self._recvcipher
+
+    @recvCipher.setter
+    def recvCipher(self, cipher):
+        """Bytes already buffered when encryption is switched on arrived
+        encrypted, so decrypt them now."""
+        self._recvcipher = cipher
+        if self._rparts:
+            self._join_parts()
+        if cipher is not None and self._rpos < len(self._rbuf):
+            self._rbuf = cipher.update(self._frame(
+                memoryview(self._rbuf)[self._rpos:]))
+            self._rpos = 0
 
     def hexdigest(self, sh):
         d = int(sh.hexdigest(), 16)
@@ -177,23 +480,25 @@ class Packet(object):
             return payload
 
     def pack_varint(self, val):
-        total = b''
-        if val < 0:
-            val = (1 << 32) + val
-        while val >= 0x80:
-            bits = val & 0x7F
-            val >>= 7
-            total += struct.pack('B', (0x80 | bits))
-        bits = val & 0x7F
-        total += struct.pack('B', bits)
-        return total
+        if 0 <= val < VARINT_TABLE_SIZE:
+            return _VARINTS[val]
+        return _encode_varint(val)
 
     def unpack_varint(self):
+        try:
+            total, self._rpos = _varint_at(self._rbuf, self._rpos)
+            return total
+        except IndexError:
+            # the varint is split across socket reads
+            pass
         total = 0
         shift = 0
         val = 0x80
         while val & 0x80:
-            val = struct.unpack('B', self.recv(1))[0]
+            if self._rpos >= len(self._rbuf):
+                self._fill()
+            val = struct.unpack_from("B", self._rbuf, self._rpos)[0]
+            self._rpos += 1
             total |= ((val & 0x7F) << shift)
             shift += 7
         if total & (1 << 31):
@@ -242,30 +547,170 @@ class Packet(object):
         """
 
         # first field - entire raw packet Length
-        packet_length = self.unpack_varint()
-        length = packet_length
+        return self._open_frame(self.read_frame())
+
+    def _open_frame(self, frame):
+        """read the packet id out of a frame and set up the read buffer
+        for the parsers.  returns (pkid, frame)"""
         datalength = 0  # if 0, an uncompressed packet
+        start = 0
         if self.compressThreshold != -1:  # if compressed:
             # length of the uncompressed (Packet ID + Data)
-            datalength = self.unpack_varint()
-            # find the len of the datalength field and subtract it
-            # using augmented assignment in the next line seems to BREAK this
-            length = packet_length - len(self.pack_varint(datalength))
-        orig_payload = self.recv(length)
-        payload_read = orig_payload
+            datalength, start = _varint_at(frame, 0)
+        payload_read = frame[start:]
+        self.raw_frame = frame
+
+        if datalength > 0:  # it is compressed
+            # Most packets are forwarded in their original compressed form
+            #  without ever being read, so only inflate enough to get the
+            #  packet id.  The rest is inflated if a parser reads it.
+            inflater = zlib.decompressobj()
+            head = inflater.decompress(payload_read, 5)
+            pkid, idlength = _varint_at(head, 0)
+            self._inflater = (inflater, head, idlength)
+            rawlength = datalength
+        else:
+            self._inflater = None
+            self._pbuf = payload_read
+            pkid, self._ppos = _varint_at(payload_read, 0)
+            rawlength = len(payload_read)
+
+        if self.stats is not None:
+            self.stats.received(self.direction, self.obj.state, pkid,
+                                len(frame), rawlength)
+        return pkid, frame
+
+    def _inflate_rest(self):
+        """finish decompressing a packet whose id was peeked by grabpacket"""
+        inflater, head, idlength = self._inflater
+        self._inflater = None
+        self._pbuf = self._frame(memoryview(
+            head + inflater.decompress(inflater.unconsumed_tail) +
+            inflater.flush()
+        ))
+        self._ppos = idlength
+
+    def preload(self, data):
+        """
+        Put bytes that were read from the socket before this Packet took
+        it over (the handshake) ahead of anything read later.
+        """
+        self._rbuf = bytes(data) + self._rbuf[self._rpos:]
+        self._rpos = 0
 
-        if datalength > 0:  # it is compressed, unpack it
-            payload_read = zlib.decompress(orig_payload)
+    def feed(self, data):
+        """
+        Add bytes received by an outside reader (the asyncio engine) to
+        the receive buffer.  Use grab_buffered() to get packets out.
+        """
+        if self._recvcipher is not None:
+            data = self._recvcipher.update(data)
+        self._rparts.append(data)
+        self._rpartlen += len(data)
+
+    def grab_buffered(self):
+        """
+        grabpacket() for a Packet driven by feed(); never reads the socket.
+
+        :returns: (pkid, frame), or None if a whole frame has not been
+         fed yet.
+        """
+        have = len(self._rbuf) - self._rpos + self._rpartlen
+        if have == 0 or have < self._rwant:
+            return None
+        if self._rparts:
+            self._join_parts()
+        try:
+            length, start = _varint_at(self._rbuf, self._rpos)
+        except IndexError:
+            # length prefix is incomplete
+            self._rwant = have + 1
+            return None
+        end = start + length
+        if end > len(self._rbuf):
+            self._rwant = end - self._rpos
+            return None
+        self._rwant = 0
+        self._rpos = end
+        return self._open_frame(
+            self._frame(memoryview(self._rbuf)[start:end]))
+
+    def _join_parts(self):
+        """move fed bytes into _rbuf (one copy, however many parts)"""
+        self._rbuf = b"".join([self._rbuf[self._rpos:]] + self._rparts)
+        self._rpos = 0
+        self._rparts = []
+        self._rpartlen = 0
+
+    def read_frame(self):
+        """
+        Return the next complete frame (everything after the length
+        prefix) from the receive buffer, reading the socket as needed.
+
+        Frames that are already buffered are returned as a memoryview
+        of the buffer (no copy).  A frame larger than a socket read is
+        received directly into a bytearray of the frame's size.
+        """
+        length = self.unpack_varint()
+        if length <= RECV_BLOCK:
+            while len(self._rbuf) - self._rpos < length:
+                self._fill()
+        start = self._rpos
+        end = start + length
+        if end <= len(self._rbuf):
+            self._rpos = end
+            return self._frame(memoryview(self._rbuf)[start:end])
+
+        # large frame; receive the remainder straight into it.
+        frame = bytearray(length)
+        view = memoryview(frame)
+        have = len(self._rbuf) - start
+        view[:have] = memoryview(self._rbuf)[start:]
+        self._rbuf = b""
+        self._rpos = 0
+        while have < length:
+            got = self.socket.recv_into(view[have:])
+            if got == 0:
+                raise EOFError("Packet stream ended (Client disconnected")
+            if self._recvcipher is not None:
+                view[have:have + got] = self._recvcipher.update(
+                    self._frame(view[have:have + got]))
+            have += got
+        return self._frame(view)
 
-        self.buffer = io.BytesIO(payload_read)
-        pkid = self.read_varint()
-        return pkid, self.pack_varint(datalength) + orig_payload
+    def _fill(self):
+        """
+        Read one block from the socket into the receive buffer, decrypting
+        the whole read with a single cipher update.
+        """
+        got = self.socket.recv_into(self._rblock)
+        if got == 0:
+            raise EOFError("Packet stream ended (Client disconnected")
+        data = memoryview(self._rblock)[:got]
+        if self._recvcipher is None:
+            data = data.tobytes()
+        else:
+            data = self._recvcipher.update(self._frame(data))
+        if self._rpos < len(self._rbuf):
+            # keep the partial frame left over from the last read.
+            data = self._rbuf[self._rpos:] + data
+        self._rbuf = data
+        self._rpos = 0
+
+    def _frame(self, view):
+        """
+        Py2's bytes concatenation (and its cipher) does not accept
+        memoryviews.
+        """
+        if PY3:
+            return view
+        return view.tobytes()
 
     def socket_transmit(self, packet):
         if self.sendCipher is None:
-            self.socket.send(packet)
+            self.socket.sendall(packet)
         else:
-            self.socket.send(self.sendCipher.update(packet))
+            self.socket.sendall(self.sendCipher.update(packet))
 
     def handle_compression(self, compression_threshhold, payload):
         """  # noqa
@@ -282,36 +727,171 @@ class Packet(object):
         _____________________________________________________________________
 
         """
-        if compression_threshhold > -1:
+        parts = []
+        self._frame_parts(compression_threshhold, payload, parts)
+        return b"".join(parts)
+
+    def _frame_parts(self, compression_threshhold, payload, parts):
+        """handle_compression(), but the frame is appended to `parts` as
+        separate buffers so the payload itself is never copied."""
+        if compression_threshhold == FRAMED:
+            parts.append(payload)
+        elif compression_threshhold > -1:
             # compose compressed packet
-            if len(payload) > self.compressThreshold:
-                pktcomp = self.pack_varint(len(payload)) + zlib.compress(
-                    payload)
-                return self.pack_varint(len(pktcomp)) + pktcomp
+            if isinstance(payload, Deflating):
+                pktcomp = payload.future.result()
+            elif len(payload) > self.compressThreshold:
+                pktcomp = zlib.compress(payload, self.compresslevel)
             else:
-                packet = self.pack_varint(0) + payload
-                return self.pack_varint(len(packet)) + packet
+                pktcomp = None
+            if pktcomp is not None:
+                datalength = self.pack_varint(len(payload))
+                parts.append(self.pack_varint(
+                    len(datalength) + len(pktcomp)) + datalength)
+                parts.append(pktcomp)
+            else:
+                # length varint + a 0 data length varint
+                parts.append(self.pack_varint(len(payload) + 1) + b"\x00")
+                parts.append(payload)
         else:
             # compose uncompressed packet
-            return self.pack_varint(len(payload)) + payload
+            parts.append(self.pack_varint(len(payload)))
+            parts.append(payload)
 
     def flush(self):
-        while len(self.queue) > 0:
-            # grab next packet
-            packet_tuple = self.queue.popleft()
-            # see if it is compressed
-            compression = packet_tuple[0]
-            packet = packet_tuple[1]  # `payload`
-            trans_packet = self.handle_compression(compression, packet)
-            self.socket_transmit(trans_packet)
+        """
+        Frame everything in the queue and send it with one write.
+
+        Packets leave in the order they were queued; `_flushlock` keeps a
+        second flush from interleaving its write with this one.
+
+        :returns: (packets, bytes, seconds) for this flush.
+        """
+        with self._flushlock:
+            start = time.time()
+            count, parts = self.take_queued()
+            if not count:
+                return 0, 0, 0.0
+            sent = self._sendall_parts(parts)
+            return self.record_flush(count, sent, time.time() - start)
+
+    def take_queued(self):
+        """
+        Empty the queue and return its packets framed (and encrypted, if
+        encryption is on), ready to be written to the socket as-is.  The
+        caller must write the results of successive calls in order.
+
+        Unencrypted packets are returned as a list of buffers (headers
+        and payloads) to be written with one sendmsg().  With encryption
+        on, everything is joined and encrypted with one cipher update.
+
+        :returns: (number of packets, list of buffers)
+        """
+        with self._queued:
+            queued = list(self.queue)
+            self.queue.clear()
+            self._unsent += sum(len(packet) for _, packet in queued)
+        parts = []
+        for compression, packet in queued:
+            self._frame_parts(compression, packet, parts)
+        if parts and self.sendCipher is not None:
+            parts = [self.sendCipher.update(b"".join(parts))]
+        return len(queued), parts
+
+    def record_flush(self, packets, nbytes, seconds):
+        """add one flush to `flushstats`, and take what it wrote off
+        `queued_bytes`.  returns (packets, bytes, seconds)"""
+        with self._queued:
+            self.queued_bytes -= self._unsent
+            self._unsent = 0
+            if self.throttled and self.queued_bytes <= self.low_water:
+                self.throttled = False
+                self._drained.notify_all()
+        stats = self.flushstats
+        stats["flushes"] += 1
+        stats["packets"] += packets
+        stats["bytes"] += nbytes
+        stats["seconds"] += seconds
+        return packets, nbytes, seconds
+
+    def _sendall_parts(self, parts):
+        """write a list of buffers, in order, with as few calls as
+        possible.  returns the number of bytes written."""
+        if len(parts) == 1 or not hasattr(self.socket, "sendmsg"):
+            data = b"".join(parts)
+            self.socket.sendall(data)
+            return len(data)
+
+        total = 0
+        first = 0
+        while first < len(parts):
+            sent = self.socket.sendmsg(parts[first:first + SEND_IOV_MAX])
+            total += sent
+            # skip past whatever was written, trimming a partial buffer.
+            while sent:
+                size = len(parts[first])
+                if sent >= size:
+                    sent -= size
+                    first += 1
+                else:
+                    parts[first] = memoryview(parts[first])[sent:]
+                    sent = 0
+        return total
+
+    def _enqueue(self, packet_tuple):
+        with self._queued:
+            wake = len(self.queue) == 0
+            self.queue.append(packet_tuple)
+            self.queued_bytes += len(packet_tuple[1])
+            if self.high_water and self.queued_bytes >= self.high_water:
+                self.throttled = True
+            self._queued.notify()
+        if wake and self.on_queued:
+            self.on_queued()
 
     def send_raw_untouched(self, payload):
         if not self.abort:
-            self.queue.append((-1, payload))
+            self._enqueue((-1, payload))
+
+    def send_framed(self, frame):
+        """
+        Queue a packet that was already framed (and compressed) with
+        frame().  The same frame can be queued on any number of Packets
+        with the same compressThreshold; it is never copied.
+        """
+        if not self.abort:
+            self._enqueue((FRAMED, frame))
+
+    def frame(self, payload):
+        """
+        Frame a payload (packet id + data) the way flush() would frame
+        it for this connection: the length prefix, and compression if it
+        is on.  Encryption is left to flush(), so the frame can be
+        shared with other connections (see send_framed()).
+        """
+        parts = []
+        self._frame_parts(self.compressThreshold, payload, parts)
+        return b"".join(parts)
 
     def send_raw(self, payload):
         if not self.abort:
-            self.queue.append((self.compressThreshold, payload))
+            threshold = self.compressThreshold
+            if self.zlib_pool and self.offload_size and threshold > -1 and \
+                    len(payload) >= max(self.offload_size, threshold + 1):
+                # a big packet (chunk data); compress it in the background.
+                #  It keeps its place in the queue; flush waits for it.
+                payload = Deflating(
+                    self.zlib_pool.submit(
+                        zlib.compress, payload, self.compresslevel),
+                    len(payload))
+            self._enqueue((threshold, payload))
+
+    def deflating(self):
+        """futures of queued packets that are still being compressed"""
+        with self._queued:
+            return [payload.future for _, payload in self.queue
+                    if isinstance(payload, Deflating) and
+                    not payload.future.done()]
 
     def readpkt(self, args):
         """
@@ -332,11 +912,31 @@ class Packet(object):
 
         """
         result = []
-        for arg in args:
-            item = self._PKTREAD[arg]()
-            result.append(item)
+        for kind, op, _ in compile_plan(args):
+            if kind == STRUCT:
+                result.extend(self.read_struct(op))
+            else:
+                result.append(self._PKTREAD[op]())
         return result
 
+    def view(self, names, args):
+        """
+        Like readpkt(), but returns a lazy PacketView whose fields are
+        only decoded when used:
+
+            `pkt = packet.view("eid dx dy dz", [VARINT, BYTE, BYTE, BYTE])`
+            `eid = pkt.eid`  # decodes just the varint
+
+        Args:
+            names: field names, as a list or a space separated string.
+            args: the same list of data types readpkt() takes.
+
+        Returns:  A PacketView (see proxy/packets/packetview.py).  It is
+                    only valid until the parser returns.
+
+        """
+        return PacketView(self, names, args)
+
     def sendpkt(self, pkid, args, payload,):
         """
                 Usage like:
@@ -356,20 +956,25 @@ class Packet(object):
                             same order the args were passed.
 
                 """
-        result = b""  # PY 2-3
-        # start with packet id
-        result += self.send_varint(pkid)
-        # append results to the result packet for each type
-        argcount = len(args)
-        if argcount == 0:
-            self.send_raw(result)
-            return result
-        for x, arg in enumerate(args):
-            pay = payload[x]
-            result += self._PKTSEND[arg](pay)
+        result = self.encodepkt(pkid, args, payload)
         self.send_raw(result)
         return result
 
+    def encodepkt(self, pkid, args, payload):
+        """sendpkt(), without queueing.  returns the payload (packet id +
+        data) bytes."""
+        # start with packet id
+        parts = [self.send_varint(pkid)]
+        # append results to the result packet for each type
+        x = 0
+        for kind, op, count in compile_plan(args):
+            if kind == STRUCT:
+                parts.append(op.pack(*payload[x:x + count]))
+            else:
+                parts.append(self._PKTSEND[op](payload[x]))
+            x += count
+        return b"".join(parts)
+
     # -- SENDING DATA TYPES -- #
     # ------------------------ #
     def send_string(self, payload):
@@ -449,99 +1054,60 @@ class Packet(object):
     def send_metadata_1_9(self, meta_data):
         """ payload is a dictionary of entity metadata items,
         keyed by index number."""
-        b = b""
+        writers = self._META19_SEND
+        b = bytearray()
         for index in meta_data:
-            # Index
-            b += self.send_ubyte(index)
-            # Type
             value_type = meta_data[index][0]
-            b += self.send_byte(value_type)
-            # value
-            value = meta_data[index][1]
-
-            if value_type == 0:
-                b += self.send_byte(value)
-            elif value_type == 1:
-                b += self.send_varint(value)
-            elif value_type == 2:
-                b += self.send_float(value)
-            elif value_type == 3:
-                b += self.send_string(value)
-            elif value_type == 4:
-                b += self.send_json(value)
-            elif value_type == 5:
-                b += self.send_slot(value)
-            elif value_type == 6:
-                b += self.send_bool(value)
-            elif value_type == 7:
-                b += self.send_float(value[0])
-                b += self.send_float(value[1])
-                b += self.send_float(value[2])
-            elif value_type == 8:
-                b += self.send_position(value)
-
-            elif value_type == 9:  # OPT Position
-                bool_option = value[0]
-                b += self.send_bool(bool_option)
-                if bool_option:
-                    b += self.send_position(value[1])
-
-            elif value_type == 10:
-                b += self.send_varint(value)
-
-            elif value_type == 11:  # OPT UUID
-                bool_option = value[0]
-                b += self.send_bool(bool_option)
-                if bool_option:
-                    b += self.send_uuid(value[1])
-
-            elif value_type == 12:
-                b += self.send_varint(value)
-
-            else:
+            try:
+                writer = writers[value_type]
+            except KeyError:
                 self.log.error("Unsupported data type '%d' for"
                                " send_metadata() (Class Packet)", value_type)
                 raise ValueError
-        b += self.send_ubyte(0xff)
-        return b
+            b += _META_HEADER.pack(index, value_type)
+            b += writer(meta_data[index][1])
+        b.append(0xff)
+        return bytes(b)
 
     def send_metadata(self, payload):
         # definitely broken in 1.7.4.  works for 1.8
-        b = b""
+        writers = self._META_SEND
+        b = bytearray()
         for index in payload:
             type_ = payload[index][0]
-            value = payload[index][1]
-            # "To create the byte, you can use this:
-            # (Type << 5 | Index & 0x1F) & 0xFF"
-            header = (type_ << 5) | index
-            # header = (type_ << 5 | index & 0x1F) & 0xFF
-            b += self.send_ubyte(header)
-            if type_ == 0:
-                b += self.send_byte(value)
-            elif type_ == 1:
-                b += self.send_short(value)
-            elif type_ == 2:
-                b += self.send_int(value)
-            elif type_ == 3:
-                b += self.send_float(value)
-            elif type_ == 4:
-                b += self.send_string(value)
-            elif type_ == 5:
-                b += self.send_slot(value)
-            elif type_ == 6:
-                b += self.send_int(value[0])
-                b += self.send_int(value[1])
-                b += self.send_int(value[2])
-            elif type_ == 7:
-                b += self.send_float(value[0])
-                b += self.send_float(value[1])
-                b += self.send_float(value[2])
-            else:
+            try:
+                writer = writers[type_]
+            except KeyError:
                 self.log.error("Unsupported data type '%d' for"
                                " send_metadata() (Class Packet)", type_)
                 raise ValueError
-        b += self.send_ubyte(0x7f)
-        return b
+            # "To create the byte, you can use this:
+            # (Type << 5 | Index & 0x1F) & 0xFF"
+            b.append((type_ << 5) | index)
+            b += writer(payload[index][1])
+        b.append(0x7f)
+        return bytes(b)
+
+    # entity metadata value types
+    # ---------------------------
+    def send_vector3i(self, payload):
+        return _VECTOR3I.pack(*payload)
+
+    def send_vector3f(self, payload):
+        """ "vector3F" 3 floats: rotation on x, on y, on z"""
+        return _VECTOR3F.pack(*payload)
+
+    def send_opt_position(self, payload):
+        """(bool,) or (True, position)"""
+        if payload[0]:
+            return b"\x01" + self.send_position(payload[1])
+        return b"\x00"
+
+    def send_opt_uuid(self, payload):
+        """(bool,) or (True, uuid)"""
+        if payload[0]:
+            return b"\x01" + self.send_uuid(payload[1])
+        return b"\x00"
 
     def send_stringarray(self, payload):
         """payload is a list of strings, but first item is a VARINT Count of
@@ -623,32 +1189,45 @@ class Packet(object):
     # -- READING Methods  -- #
     # ---------------------- #
     def recv(self, length):
-        if length > 200:
-            d = b""  # Py 2-3
-            while len(d) < length:
-                m = length - len(d)
-                if m > 5000:
-                    m = 5000
-                d += self.socket.recv(m)
-        else:
-            d = self.socket.recv(length)
-            if len(d) == 0:
-                raise EOFError("Packet stream ended (Client disconnected")
-        if self.recvCipher is None:
-            return d
-        return self.recvCipher.update(d)
+        """read `length` raw (decrypted) bytes from the receive buffer"""
+        while len(self._rbuf) - self._rpos < length:
+            self._fill()
+        start = self._rpos
+        self._rpos += length
+        return self._rbuf[start:self._rpos]
 
     def read_data(self, length):
-        d = self.buffer.read(length)
-        if len(d) == 0 and length is not 0:
-            # "Received no data or less data than expected - connection closed"
-            self.obj.close_server(
-                "Received no data or less data than expected - "
-                "connection closed"
-            )
+        if self._inflater:
+            self._inflate_rest()
+        start = self._ppos
+        d = self._pbuf[start:start + length]
+        if PY3:
+            d = d.tobytes()
+        if len(d) == 0 and length != 0:
+            self._read_past_end()
             return b""
+        self._ppos = start + len(d)
         return d
 
+    def _read_past_end(self):
+        # "Received no data or less data than expected - connection closed"
+        self.obj.close_server(
+            "Received no data or less data than expected - "
+            "connection closed"
+        )
+
+    def read_struct(self, fmt):
+        """unpack a precompiled struct.Struct straight out of the packet"""
+        if self._inflater:
+            self._inflate_rest()
+        try:
+            values = fmt.unpack_from(self._pbuf, self._ppos)
+        except struct.error:
+            self._read_past_end()
+            raise
+        self._ppos += fmt.size
+        return values
+
     # -- READING DATA TYPES -- #
     # ------------------------ #
     def read_string(self):
@@ -658,42 +1237,40 @@ class Packet(object):
         return json.loads(self.read_string())
 
     def read_ubyte(self):
-        return struct.unpack("B", self.read_data(1))[0]
+        return self.read_struct(_UBYTE)[0]
 
     def read_byte(self):
-        return struct.unpack("b", self.read_data(1))[0]
+        return self.read_struct(_BYTE)[0]
 
     def read_int(self):
-        return struct.unpack(">i", self.read_data(4))[0]
+        return self.read_struct(_INT)[0]
 
     def read_short(self):
-        return struct.unpack(">h", self.read_data(2))[0]
+        return self.read_struct(_SHORT)[0]
 
     def read_ushort(self):
-        return struct.unpack(">H", self.read_data(2))[0]
+        return self.read_struct(_USHORT)[0]
 
     def read_long(self):
-        return struct.unpack(">q", self.read_data(8))[0]
+        return self.read_struct(_LONG)[0]
 
     def read_double(self):
-        return struct.unpack(">d", self.read_data(8))[0]
+        return self.read_struct(_DOUBLE)[0]
 
     def read_float(self):
-        return struct.unpack(">f", self.read_data(4))[0]
+        return self.read_struct(_FLOAT)[0]
 
     def read_bool(self):
-        return struct.unpack("b", self.read_data(1))[0] == 1
+        return self.read_struct(_BYTE)[0] == 1
 
     def read_varint(self):
-        total = 0
-        shift = 0
-        val = 0x80
-        while val & 0x80:
-            val = struct.unpack('B', self.read_data(1))[0]
-            total |= ((val & 0x7F) << shift)
-            shift += 7
-        if total & (1 << 31):
-            total = total - (1 << 32)
+        if self._inflater:
+            self._inflate_rest()
+        try:
+            total, self._ppos = _varint_at(self._pbuf, self._ppos)
+        except IndexError:
+            self._read_past_end()
+            raise struct.error("varint runs past the end of the packet")
         return total
 
     def read_bytearray(self):
@@ -703,7 +1280,7 @@ class Packet(object):
         return self.read_data(self.read_short())
 
     def read_position(self):
-        position = struct.unpack(">Q", self.read_data(8))[0]
+        position = self.read_struct(_ULONG)[0]
         if position == 0xFFFFFFFFFFFFFFFF:
             return None
         x = int(position >> 38)
@@ -720,7 +1297,17 @@ class Packet(object):
     def read_uuid(self):
         return self.obj.proxy.wrapper.mcuuid(bytes=self.read_data(16))
 
-    def read_metadata_1_9(self):
+    def read_metadata_1_9(self, skip=False):
+        """
+        Returns a dictionary of `index: (data type, value)` items.
+
+        If `skip` is True, the metadata is only stepped over (no values are
+        decoded) and its length in bytes is returned instead.  For parsers
+        that only need what comes before it, like the entity id.
+        """
+        if skip:
+            return self._skip_metadata(self._META19_SKIP, True)
+        readers = self._META19_READ
         meta_data = {}
         while True:
             # index keys the meaning ( base class 0-5, 6 extending, etc)
@@ -728,83 +1315,28 @@ class Packet(object):
             if index == 0xff:
                 return meta_data
             data_type = self.read_byte()  # a byte coding the data type
-            if data_type == 0:
-                meta_data[index] = (data_type, self.read_byte())
-            elif data_type == 1:
-                meta_data[index] = (data_type, self.read_varint())
-            elif data_type == 2:
-                meta_data[index] = (data_type, self.read_float())
-            elif data_type == 3:
-                meta_data[index] = (data_type, self.read_string())
-
-            # old 'thinkofdeath' chat spec:
-            # http://wayback.archive.org/web/20160306101755/http://wiki.vg/Chat
-            elif data_type == 4:
-                meta_data[index] = (data_type, self.read_json())
-
-            elif data_type == 5:
-                meta_data[index] = (data_type, self.read_slot())
-            elif data_type == 6:
-                meta_data[index] = (data_type, self.read_bool())
-
-            # "vector3F" 3 floats: rotation on x, rotation on y, rotation on z
-            elif data_type == 7:
-                meta_data[index] = (data_type, (
-                    self.read_float(), self.read_float(), self.read_float()))
-
-            elif data_type == 8:
-                meta_data[index] = (data_type, self.read_position())
-
-            # OptPosition (Bool + Optional Position) Position present if
-            #  Boolean is set to true
-            elif data_type == 9:
-                bool_option = self.read_bool()
-                if bool_option:
-                    meta_data[index] = (data_type, (
-                        bool_option, self.read_position()))
-                else:
-                    meta_data[index] = (data_type, (bool_option, ))
-
-            # Direction (VarInt) (Down = 0, Up = 1, North = 2, South = 3,
-            #   West = 4, East = 5)
-            elif data_type == 10:
-                meta_data[index] = (data_type, self.read_varint())
-
-            # OptUUID (Boolean + Optional UUID) UUID is present if the
-            #  Boolean is set to true
-            elif data_type == 11:
-                bool_option = self.read_bool()
-                if bool_option:
-                    meta_data[index] = (data_type, self.read_uuid())
-                else:
-                    meta_data[index] = (data_type, (bool_option, ))
-
-            # BlockID (VarInt)  notes: id << 4 | data - 0 for absent;
-            #  otherwise, id << 4 | data
-            elif data_type == 12:
-                meta_data[index] = (data_type, self.read_varint())
-
-            elif data_type == 13:
-                self.log.error(
-                    "1.9 metadata found data type 13 'nbt tag',  "
-                    "which wrapper does not parse.. read as 'rest/raw'. "
-                    "Added in version 1.12 minecraft??"
-                )
-                meta_data[index] = (data_type, self.read_rest())
-            else:
+            try:
+                reader = readers[data_type]
+            except KeyError:
                 self.log.error(
                     "Unsupported data type '%d' for read_metadata_1_9()  "
                     "(Class Packet)", data_type
                 )
                 raise ValueError
+            meta_data[index] = (data_type, reader())
 
-    def read_metadata(self):
+    def read_metadata(self, skip=False):
         """
         /* Prior to 1.9 only! */
         Sept 3, 2012 in the wayback machine, this was valid for whatever
         the MC version was.  This changed March 6th 2016 with 1.9:
         http://wayback.archive.org/web/20160306082342/http://wiki.vg/Entities
+
+        `skip` works as in read_metadata_1_9().
         """
+        if skip:
+            return self._skip_metadata(self._META_SKIP, False)
+        readers = self._META_READ
         meta_data = {}
         while True:
             # "To create the byte, you can use this:
@@ -814,33 +1346,48 @@ class Packet(object):
                 return meta_data
             index = lead_ubyte & 0x1f  # Lower 5 bits
             data_type = lead_ubyte >> 5
-            if data_type == 0:
-                meta_data[index] = (data_type, self.read_byte())
-            elif data_type == 1:
-                meta_data[index] = (data_type, self.read_short())
-            elif data_type == 2:
-                meta_data[index] = (data_type, self.read_int())
-            elif data_type == 3:
-                meta_data[index] = (data_type, self.read_float())
-            elif data_type == 4:
-                meta_data[index] = (data_type, self.read_string())
-            elif data_type == 5:
-                meta_data[index] = (data_type, self.read_slot())
-            elif data_type == 6:
-                meta_data[index] = (data_type, (
-                    self.read_int(), self.read_int(), self.read_int()))
-
-            # Sept 2014, this was added (MC 1.7.2 protocol 4?)  Oct 22 2015
-            elif data_type == 7:
-                meta_data[index] = (data_type, (
-                    self.read_float(), self.read_float(), self.read_float()))
-
-            else:
+            try:
+                reader = readers[data_type]
+            except KeyError:
                 self.log.error(
                     "Unsupported data type '%d' for read_metadata()  "
                     "(Class Packet)", data_type
                 )
                 raise ValueError
+            meta_data[index] = (data_type, reader())
+
+    # entity metadata value types
+    # ---------------------------
+    def read_vector3i(self):
+        return self.read_struct(_VECTOR3I)
+
+    def read_vector3f(self):
+        """ "vector3F" 3 floats: rotation on x, on y, on z"""
+        return self.read_struct(_VECTOR3F)
+
+    def read_opt_position(self):
+        """OptPosition (Bool + Optional Position) Position present if
+        Boolean is set to true"""
+        bool_option = self.read_bool()
+        if bool_option:
+            return bool_option, self.read_position()
+        return bool_option,
+
+    def read_opt_uuid(self):
+        """OptUUID (Boolean + Optional UUID) UUID is present if the
+        Boolean is set to true.  returns the UUID, or (False, )"""
+        bool_option = self.read_bool()
+        if bool_option:
+            return self.read_uuid()
+        return bool_option,
+
+    def read_metadata_nbt(self):
+        self.log.error(
+            "1.9 metadata found data type 13 'nbt tag',  "
+            "which wrapper does not parse.. read as 'rest/raw'. "
+            "Added in version 1.12 minecraft??"
+        )
+        return self.read_rest()
 
     def read_slot(self):
         sid = self.read_short()
@@ -916,3 +1463,123 @@ class Packet(object):
             a["name"] = self.read_short_string()
             a["value"] = self._DECODERS[a["type"]]()
         return a
+
+    # -- SKIPPING DATA TYPES -- #
+    # ------------------------- #
+    # These step over a value without decoding it.  The `_*_SKIP` tables
+    #  hold either the fixed size of a type or one of these methods.
+
+    def _skip(self, length):
+        if self._inflater:
+            self._inflate_rest()
+        end = self._ppos + length
+        if end > len(self._pbuf):
+            self._read_past_end()
+            raise struct.error("skip runs past the end of the packet")
+        self._ppos = end
+
+    def _skip_value(self, table, value_type):
+        skip = table[value_type]
+        if skip.__class__ is int:
+            self._skip(skip)
+        else:
+            skip()
+
+    def _skip_metadata(self, table, after_1_9):
+        """step over entity metadata and return its length in bytes"""
+        if self._inflater:
+            self._inflate_rest()
+        buf = self._pbuf
+        end = len(buf)
+        start = pos = self._ppos
+        terminator = 0xff if after_1_9 else 0x7f
+        while pos < end:
+            lead_ubyte = _UBYTE.unpack_from(buf, pos)[0]
+            pos += 1
+            if lead_ubyte == terminator:
+                self._ppos = pos
+                return pos - start
+            if after_1_9:
+                if pos == end:
+                    break
+                data_type = _BYTE.unpack_from(buf, pos)[0]
+                pos += 1
+            else:
+                data_type = lead_ubyte >> 5
+            skip = table.get(data_type)
+            if skip is None:
+                self.log.error(
+                    "Unsupported data type '%d' for skipping metadata  "
+                    "(Class Packet)", data_type
+                )
+                raise ValueError
+            if skip.__class__ is int:
+                pos += skip
+                continue
+            self._ppos = pos
+            skip()
+            pos = self._ppos
+            # a value read as 'rest' (1.12 nbt) has taken the terminator too
+            if pos == end:
+                return pos - start
+        self._read_past_end()
+        raise struct.error("metadata runs past the end of the packet")
+
+    def _skip_varint(self):
+        self.read_varint()
+
+    def _skip_bytearray(self):
+        self._skip(self.read_varint())
+
+    def _skip_slot(self):
+        if self.read_short() == -1:
+            return
+        if self.version < PROTOCOL_PRE_RELEASE:
+            self._skip(3)  # count, damage
+        else:
+            self._skip(1)  # count
+        self._skip_tag()
+
+    def _skip_opt_position(self):
+        if self.read_bool():
+            self._skip(8)
+
+    def _skip_opt_uuid(self):
+        if self.read_bool():
+            self._skip(16)
+
+    def _skip_rest(self):
+        self._skip(len(self._pbuf) - self._ppos)
+
+    def _skip_byte_array(self):
+        self._skip(self.read_int())
+
+    def _skip_short_string(self):
+        self._skip(self.read_short())
+
+    def _skip_list(self):
+        item_type = self.read_byte()
+        length = self.read_int()
+        if length <= 0:
+            return
+        skip = self._NBT_SKIP[item_type]
+        if skip.__class__ is int:
+            self._skip(skip * length)
+        else:
+            for _ in xrange(length):
+                skip()
+
+    def _skip_comp(self):
+        while self._skip_tag():
+            pass
+
+    def _skip_int_array(self):
+        self._skip(self.read_int() * 4)
+
+    def _skip_tag(self):
+        """returns the tag type (0 for the end of a compound)"""
+        tag_type = self.read_byte()
+        if tag_type != 0:
+            self._skip_short_string()
+            self._skip_value(self._NBT_SKIP, tag_type)
+        return tag_type
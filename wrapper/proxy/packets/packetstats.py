@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Per packet id traffic and parse time counters.
+
+A Client and its ServerConnection share one `PacketStats`.  The Packet
+counts every frame it receives (`received()`) and the connections add
+the time spent in their parsers (`parsed()`).  Counters are keyed by
+(direction, state, packet id), where direction is "SB" (client to
+server) or "CB" (server to client).
+
+Recording is a dict lookup and a few list additions per packet.  A lock
+is only taken the first time an id is seen; after that each counter is
+only written by the connection that reads those packets.  Names are
+looked up from the mcpackets tables only when a report is made.
+"""
+
+import threading
+
+from proxy.utils.constants import *
+from proxy.packets import mcpackets_cb
+from proxy.packets import mcpackets_sb
+
+COUNT = 0
+WIRE_BYTES = 1
+RAW_BYTES = 2
+PARSE_SECONDS = 3
+
+STATE_NAMES = {
+    HANDSHAKE: "HANDSHAKE",
+    STATUS: "STATUS",
+    LOGIN: "LOGIN",
+    PLAY: "PLAY",
+    LOBBY: "LOBBY",
+}
+
+_NAMES = {}
+
+
+def _state_of(direction, name):
+    """the protocol state a mcpackets table entry belongs to"""
+    if direction == "CB":
+        if name.startswith("LOGIN_"):
+            return LOGIN
+        if name.startswith("PING_"):
+            return STATUS
+        return PLAY
+    if name in ("LEGACY_HANDSHAKE", "HANDSHAKE"):
+        return HANDSHAKE
+    if name in ("REQUEST", "STATUS_PING"):
+        return STATUS
+    if name.startswith("LOGIN_"):
+        return LOGIN
+    return PLAY
+
+
+def packet_names(direction, version):
+    """
+    {state: {packet id: name}} for `direction` ("CB" or "SB") from the
+    mcpackets tables for protocol `version`.  Ids that have more than
+    one name in a table are joined with "/".
+    """
+    key = (direction, version)
+    try:
+        return _NAMES[key]
+    except KeyError:
+        pass
+    tables = mcpackets_cb if direction == "CB" else mcpackets_sb
+    names = {HANDSHAKE: {}, STATUS: {}, LOGIN: {}, PLAY: {}}
+    try:
+        entries = vars(tables.Packets(version))
+    except ValueError:
+        entries = {}
+    for name, entry in sorted(entries.items()):
+        if not isinstance(entry, list) or entry[PKT] == 0xee:
+            continue
+        bystate = names[_state_of(direction, name)]
+        if entry[PKT] in bystate:
+            bystate[entry[PKT]] += "/" + name
+        else:
+            bystate[entry[PKT]] = name
+    # the hub (lobby) speaks the play protocol
+    names[LOBBY] = names[PLAY]
+    _NAMES[key] = names
+    return names
+
+
+class PacketStats(object):
+    def __init__(self):
+        # {(direction, state, pkid): [count, wire bytes, raw bytes,
+        #                              parse seconds]}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def _counter(self, key):
+        counter = self.counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self.counters.setdefault(key, [0, 0, 0, 0.0])
+        return counter
+
+    def received(self, direction, state, pkid, wire, raw):
+        """count one packet of `wire` bytes (as framed, after the length
+        prefix) that is `raw` bytes uncompressed"""
+        counter = self._counter((direction, state, pkid))
+        counter[COUNT] += 1
+        counter[WIRE_BYTES] += wire
+        counter[RAW_BYTES] += raw
+
+    def parsed(self, direction, state, pkid, seconds):
+        """add the time a parser spent on a packet"""
+        self._counter((direction, state, pkid))[PARSE_SECONDS] += seconds
+
+    def merge(self, other):
+        """add the counters of another PacketStats to these"""
+        for key, counter in list(other.counters.items()):
+            mine = self._counter(key)
+            for x, value in enumerate(counter):
+                mine[x] += value
+
+    def report(self, version, top=None):
+        """
+        The counters as a list of dicts, most bytes first:
+            {"direction": "CB", "state": "PLAY", "id": "0x20",
+             "name": "CHUNK_DATA", "count": 12, "bytes": 40210,
+             "raw_bytes": 191404, "parse_ms": 0.0}
+
+        :version: protocol version used to name the packet ids.
+        :top: only return this many rows.
+        """
+        rows = []
+        for key, counter in list(self.counters.items()):
+            direction, state, pkid = key
+            name = packet_names(direction, version).get(state, {}).get(pkid)
+            rows.append({
+                "direction": direction,
+                "state": STATE_NAMES.get(state, str(state)),
+                "id": "0x%02x" % pkid,
+                "name": name or "?",
+                "count": counter[COUNT],
+                "bytes": counter[WIRE_BYTES],
+                "raw_bytes": counter[RAW_BYTES],
+                "parse_ms": round(counter[PARSE_SECONDS] * 1000, 3),
+            })
+        rows.sort(key=lambda row: (-row["bytes"], -row["count"],
+                                   row["direction"], row["id"]))
+        if top:
+            rows = rows[:top]
+        return rows
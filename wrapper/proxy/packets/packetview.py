@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Lazy, named access to the fields of the packet being parsed.
+
+    pkt = self.packet.view("eid dx dy dz", [VARINT, BYTE, BYTE, BYTE])
+    entity = self.ent_control.getEntityByEID(pkt.eid)
+    if entity:
+        entity.move_relative((pkt.dx, pkt.dy, pkt.dz))
+
+Unlike `Packet.readpkt()`, nothing is decoded up front.  A field is
+decoded the first time it is used; the fields before it are only decoded
+as far as needed to find where it starts (fixed width fields, uuids and
+positions are stepped over without decoding them).  Values and offsets
+are cached, so reading a field twice costs nothing.  Trailing fields
+that are never used (like REST metadata) are never read.
+
+A view is only valid while its parser runs, since the Packet moves on to
+the next packet after that.  It does not move the Packet's own read
+position, so `readpkt()` calls can still be mixed in.
+"""
+
+import struct
+
+from proxy.utils.constants import *
+from proxy.packets.codec import FIXED
+
+# data types that are not read with a struct, but have a known width.
+_WIDTHS = {
+    POSITION: 8,
+    UUID: 16,
+    NULL: 0,
+}
+
+_LAYOUTS = {}
+
+# marks a field that has not been decoded yet.
+_UNREAD = object()
+
+
+def compile_layout(names, args):
+    """
+    Return (fields, index) for a view.  `fields` is a tuple of
+    (data type, struct.Struct or None, width or None) and `index` maps
+    each field name to its position.
+
+    `names` is a list of field names, or a string of them separated by
+    spaces (like namedtuple).
+    """
+    if not isinstance(names, str):
+        names = tuple(names)
+    key = (names, tuple(args))
+    try:
+        return _LAYOUTS[key]
+    except KeyError:
+        pass
+    if isinstance(names, str):
+        names = names.split()
+    if len(names) != len(args):
+        raise ValueError("%d field names for %d fields" % (
+            len(names), len(args)))
+
+    fields = []
+    for arg in args:
+        if arg in FIXED:
+            fmt = struct.Struct(">" + FIXED[arg])
+            fields.append((arg, fmt, fmt.size))
+        else:
+            fields.append((arg, None, _WIDTHS.get(arg)))
+    layout = tuple(fields), dict((name, x) for x, name in enumerate(names))
+    _LAYOUTS[key] = layout
+    return layout
+
+
+class PacketView(object):
+    """See the module docstring.  Create these with `Packet.view()`."""
+    __slots__ = ("_packet", "_pbuf", "_fields", "_index", "_values",
+                 "_offsets")
+
+    def __init__(self, packet, names, args):
+        if packet._inflater:
+            packet._inflate_rest()
+        self._packet = packet
+        self._pbuf = packet._pbuf
+        self._fields, self._index = compile_layout(names, args)
+        self._values = [_UNREAD] * len(self._fields)
+        # start offset of each field found so far.
+        self._offsets = [packet._ppos]
+
+    def __getattr__(self, name):
+        try:
+            position = self._index[name]
+        except KeyError:
+            raise AttributeError(name)
+        return self[position]
+
+    def __getitem__(self, position):
+        value = self._values[position]
+        if value is _UNREAD:
+            offsets = self._offsets
+            while len(offsets) <= position:
+                offsets.append(self._end_of(len(offsets) - 1))
+            end = self._decode(position)
+            if len(offsets) == position + 1:
+                offsets.append(end)
+            value = self._values[position]
+        return value
+
+    def __len__(self):
+        return len(self._fields)
+
+    def tolist(self):
+        """all the fields, like readpkt() would return them"""
+        return [self[x] for x in range(len(self._fields))]
+
+    def _end_of(self, position):
+        """offset just past the field at `position`"""
+        width = self._fields[position][2]
+        if width is None:
+            return self._decode(position)
+        return self._offsets[position] + width
+
+    def _decode(self, position):
+        """decode and cache a field.  returns the offset just past it"""
+        arg, fmt, width = self._fields[position]
+        start = self._offsets[position]
+        if fmt:
+            try:
+                self._values[position] = fmt.unpack_from(self._pbuf, start)[0]
+            except struct.error:
+                self._packet._read_past_end()
+                raise
+            return start + width
+        value, end = self._read(arg, start)
+        self._values[position] = value
+        return end
+
+    def _read(self, arg, start):
+        """decode a field with the Packet's own read_* method"""
+        packet = self._packet
+        saved = packet._pbuf, packet._ppos
+        packet._pbuf, packet._ppos = self._pbuf, start
+        try:
+            value = packet._PKTREAD[arg]()
+            return value, packet._ppos
+        finally:
+            packet._pbuf, packet._ppos = saved
@@ -376,6 +376,9 @@ class ParseCB(object):
         self.client.difficulty = data[1]
         self.client.gamemode = data[2]
         self.client.level_type = data[3]
+        # the client unloads all its entities on a respawn.
+        if self.ent_control:
+            self.ent_control.drop_client(self.client.username)
         return True
 
     def play_change_game_state(self):
@@ -492,10 +495,11 @@ class ParseCB(object):
     # chunk processing
     def play_chunk_data(self):
         """CHUNK_DATA
-        Cache first 49 raw chunks for use with respawning."""
+        Cache first 49 chunks for use with respawning.  They are kept as
+        they were received (compressed), and re-sent the same way they
+        are forwarded, so they are never inflated here."""
         if len(self.client.first_chunks) < 49:
-            data = self.packet.readpkt([RAW, ])
-            self.client.first_chunks.append(data)
+            self.client.first_chunks.append(bytes(self.packet.raw_frame))
         return True
 
     # Window processing/ inventory tracking
@@ -558,29 +562,30 @@ class ParseCB(object):
         # objects are entities and are GC-ed by detroy entities packet
         if not self.ent_control:
             return True  # return now if no object tracking
+        fields = "eid uuid type_ x y z pitch yaw"
         if self.server.version < PROTOCOL_1_9START:
-            dt = self.packet.readpkt(
-                [VARINT, NULL, BYTE, INT, INT, INT, BYTE, BYTE])
-            dt[3], dt[4], dt[5] = dt[3] / 32, dt[4] / 32, dt[5] / 32
+            pkt = self.packet.view(
+                fields, [VARINT, NULL, BYTE, INT, INT, INT, BYTE, BYTE])
             # "varint:eid|byte:type_|int:x|int:y|int:z|byte:pitch|byte:yaw")
         else:
-            dt = self.packet.readpkt(
+            pkt = self.packet.view(
+                fields,
                 [VARINT, UUID, BYTE, DOUBLE, DOUBLE, DOUBLE, BYTE, BYTE])
             # "varint:eid|uuid:objectUUID|byte:type_|int:x|int:y|int:z|
             #     byte:pitch|byte:yaw|int:info|
             # short:velocityX|short:velocityY|short:velocityZ")
-        entityuuid = dt[1]
 
         # we have to check these first, lest the object type be new
         # and cause an exception.
-        if dt[2] in self.ent_control.objecttypes:
+        if pkt.type_ in self.ent_control.objecttypes:
             objectname = self.ent_control.objecttypes[
-                dt[2]]
-            newobject = {dt[0]: Entity(dt[0], entityuuid, dt[2], objectname,
-                                       (dt[3], dt[4], dt[5],), (dt[6], dt[7]),
-                                       True, self.client.username)}
-
-            self.ent_control.entities.update(newobject)
+                pkt.type_]
+            position = (pkt.x, pkt.y, pkt.z)
+            if self.server.version < PROTOCOL_1_9START:
+                position = (pkt.x / 32, pkt.y / 32, pkt.z / 32)
+            self.ent_control.add_entity(
+                Entity(pkt.eid, pkt.uuid, pkt.type_, objectname, position,
+                       (pkt.pitch, pkt.yaw), True, self.client.username))
         return True
 
     def play_spawn_mob(self):
@@ -588,37 +593,36 @@ class ParseCB(object):
             return True
         if not self.ent_control:
             return True
+        fields = "eid uuid type_ x y z pitch yaw head_pitch"
         if self.server.version < PROTOCOL_1_9START:
-            dt = self.packet.readpkt(
-                [VARINT, NULL, UBYTE, INT, INT, INT, BYTE, BYTE, BYTE, REST])
-            dt[3], dt[4], dt[5] = dt[3] / 32, dt[4] / 32, dt[5] / 32
+            pkt = self.packet.view(
+                fields, [VARINT, NULL, UBYTE, INT, INT, INT, BYTE, BYTE, BYTE])
             # "varint:eid|ubyte:type_|int:x|int:y|int:z|byte:pitch|byte:yaw|"
             # "byte:head_pitch|...
             # STOP PARSING HERE: short:velocityX|short:velocityY|
             #     short:velocityZ|rest:metadata")
         else:
-            dt = self.packet.readpkt([VARINT, UUID, UBYTE, DOUBLE, DOUBLE,
-                                      DOUBLE, BYTE, BYTE, BYTE, REST])
+            pkt = self.packet.view(fields, [VARINT, UUID, UBYTE, DOUBLE,
+                                            DOUBLE, DOUBLE, BYTE, BYTE, BYTE])
 
             # ("varint:eid|uuid:entityUUID|ubyte:type_|int:x|int:y|int:z|"
             # "byte:pitch|byte:yaw|byte:head_pitch|
             # STOP PARSING HERE: short:velocityX|short:velocityY|
             #     short:velocityZ|rest:metadata")
 
-        entityuuid = dt[1]
-
-        # if the dt[2] mob type is not in our defined entity types,
+        # if the mob type is not in our defined entity types,
         # it won't be tracked.. however, the undefined mob will not
         # cause an exception.
-        if dt[2] in self.ent_control.entitytypes:
+        if pkt.type_ in self.ent_control.entitytypes:
             mobname = self.ent_control.entitytypes[
-                dt[2]]["name"]
-            newmob = {dt[0]: Entity(dt[0], entityuuid, dt[2], mobname,
-                                    (dt[3], dt[4], dt[5],),
-                                    (dt[6], dt[7], dt[8]),
-                                    False, self.client.username)}
-
-            self.ent_control.entities.update(newmob)
+                pkt.type_]["name"]
+            position = (pkt.x, pkt.y, pkt.z)
+            if self.server.version < PROTOCOL_1_9START:
+                position = (pkt.x / 32, pkt.y / 32, pkt.z / 32)
+            self.ent_control.add_entity(
+                Entity(pkt.eid, pkt.uuid, pkt.type_, mobname, position,
+                       (pkt.pitch, pkt.yaw, pkt.head_pitch), False,
+                       self.client.username))
         return True
 
     def play_entity_relative_move(self):
@@ -627,17 +631,18 @@ class ParseCB(object):
         if not self.ent_control:
             return True
         if self.server.version < PROTOCOL_1_8START:  # 1.7.10 - 1.7.2
-            data = self.packet.readpkt([INT, BYTE, BYTE, BYTE])
+            pkt = self.packet.view("eid dx dy dz", [INT, BYTE, BYTE, BYTE])
 
         # FutureVersion > elif self.version > mcpacket.PROTOCOL_1_7_9:  1.8 ++
         else:
-            data = self.packet.readpkt([VARINT, BYTE, BYTE, BYTE])
+            pkt = self.packet.view("eid dx dy dz", [VARINT, BYTE, BYTE, BYTE])
         # ("varint:eid|byte:dx|byte:dy|byte:dz")
 
-        entupd = self.ent_control.getEntityByEID(
-            data[0])
+        # for untracked entities, only the eid gets decoded.
+        entupd = self.ent_control.getEntityByEID(pkt.eid,
+                                                 self.client.username)
         if entupd:
-            entupd.move_relative((data[1], data[2], data[3]))
+            self.ent_control.move_entity(entupd, (pkt.dx, pkt.dy, pkt.dz))
         return True
 
     def play_entity_teleport(self):
@@ -646,20 +651,23 @@ class ParseCB(object):
         if not self.ent_control:
             return True
         if self.server.version < PROTOCOL_1_8START:  # 1.7.10 and prior
-            data = self.packet.readpkt([INT, INT, INT, INT, REST])
+            pkt = self.packet.view("eid x y z", [INT, INT, INT, INT])
         elif PROTOCOL_1_8START <= self.server.version < PROTOCOL_1_9START:
-            data = self.packet.readpkt([VARINT, INT, INT, INT, REST])
+            pkt = self.packet.view("eid x y z", [VARINT, INT, INT, INT])
         else:
-            data = self.packet.readpkt([VARINT, DOUBLE, DOUBLE, DOUBLE, REST])
-            data[1], data[2], data[3] = data[1] * 32, \
-                data[2] * 32, data[3] * 32
+            pkt = self.packet.view("eid x y z",
+                                   [VARINT, DOUBLE, DOUBLE, DOUBLE])
 
         # ("varint:eid|int:x|int:y|int:z|byte:yaw|byte:pitch")
 
-        entupd = self.ent_control.getEntityByEID(
-            data[0])
+        entupd = self.ent_control.getEntityByEID(pkt.eid,
+                                                 self.client.username)
         if entupd:
-            entupd.teleport((data[1], data[2], data[3]))
+            if self.server.version < PROTOCOL_1_9START:
+                position = (pkt.x, pkt.y, pkt.z)
+            else:
+                position = (pkt.x * 32, pkt.y * 32, pkt.z * 32)
+            self.ent_control.teleport_entity(entupd, position)
         return True
 
     def play_attach_entity(self):
@@ -751,7 +759,7 @@ class ParseCB(object):
                 if not self.ent_control:
                     return
                 entupd = self.ent_control.getEntityByEID(
-                    vehormobeid)
+                    vehormobeid, self.client.username)
                 if entupd:
                     self.client.riding = entupd
                     entupd.rodeBy = self.client
@@ -778,10 +786,11 @@ class ParseCB(object):
             entitycount = rawread[0]
             parser = [VARINT]
 
+        store = self.ent_control.stores.get(self.client.username)
+        if store is None:
+            return True
         for _ in range(entitycount):
             eid = self.packet.readpkt(parser)[0]
-            # noinspection PyBroadException
-            if eid in self.ent_control.entities:
-                self.ent_control.entities.pop(eid, None)
+            store.remove(eid)
 
         return True
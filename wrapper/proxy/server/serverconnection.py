@@ -50,10 +50,12 @@ class ServerConnection(object):
 
         # server setup and operating paramenters
         self.abort = False
-        self.flush_rate = self.client.flush_rate
+        self.flush_delay = self.client.flush_delay
         self.state = HANDSHAKE
         self.packet = None
         self.parse_cb = None
+        # the client's PacketStats (set in connect)
+        self.stats = None
 
         # dictionary of parser packet constants and associated parsing methods
         self.parsers = {}
@@ -98,25 +100,42 @@ class ServerConnection(object):
         # start packet handler
         self.packet = Packet(self.server_socket, self)
         self.packet.version = self.client.clientversion
+        self.packet.compresslevel = self.proxy.config[
+            "backend-compression-level"]
+        self.packet.zlib_pool = self.proxy.zlib_pool
+        self.packet.offload_size = self.proxy.config["zlib-offload-bytes"]
+        self.client.set_water_marks(self.packet)
+        self.stats = self.client.stats
+        if self.stats:
+            self.packet.stats = self.stats
+            self.packet.direction = "CB"
 
         # define parsers
         self.parse_cb = ParseCB(self, self.packet)
         self._define_parsers()
 
-        t = threading.Thread(target=self.flush_loop, args=())
-        t.daemon = True
-        t.start()
+        # the asyncio engine does its own flushing
+        if not self.client.engine:
+            t = threading.Thread(target=self.flush_loop, args=())
+            t.daemon = True
+            t.start()
 
     def flush_loop(self):
-        rate = self.flush_rate
+        """ see Client._flush_loop() """
+        delay = self.flush_delay
         while not self.abort:
-            time.sleep(rate)
             try:
+                if not self.packet.wait_for_queue(1):
+                    continue
+                if delay:
+                    time.sleep(delay)
                 self.packet.flush()
             except AttributeError:
+                # close_server() has run
                 self.log.debug(
                     "%s server packet instance gone.", self.username
                                )
+                break
             except socket.error:
                 self.log.debug("Socket_error- server socket was closed"
                                " %s", self.infos_debug)
@@ -126,6 +145,11 @@ class ServerConnection(object):
 
     def handle(self):
         while not (self.abort or self.client.abort):
+            # backpressure - don't read more than the client can take.
+            peer = self._forward_packet()
+            if peer.throttled and \
+                    not peer.wait_for_drain(self.client.queue_stall):
+                self._forward_stalled()
             # get packet
             try:
                 pkid, orig_packet = self.packet.grabpacket()  # noqa
@@ -145,10 +169,10 @@ class ServerConnection(object):
             # parse it
             # send packet if parsing passed and client in play mode.
             # all packets are parsed, but only play mode ones are transmitted.
-            if self.parse(pkid) and self.client.state == PLAY:
+            if self.parse(pkid):
                 try:
                     # self.parse will reject (False) any packet proxy modifies.
-                    self.client.packet.send_raw_untouched(orig_packet)
+                    self._forward(orig_packet)
                 except Exception as e:
                     return self.close_server(
                         "handle() could not send packet '%s'.  "
@@ -157,6 +181,18 @@ class ServerConnection(object):
                     )
         return self.close_server("handle() received abort signal.")
 
+    def _forward(self, orig_packet):
+        if self.client.state == PLAY:
+            self.client.packet.send_raw_untouched(orig_packet)
+
+    def _forward_packet(self):
+        """the Packet that _forward() queues to"""
+        return self.client.packet
+
+    def _forward_stalled(self):
+        """see Client.drop_stalled()"""
+        self.client.drop_stalled()
+
     def close_server(self, reason="Disconnected"):
         """
         Client is responsible for closing the server connection and handling
@@ -171,6 +207,8 @@ class ServerConnection(object):
 
         # end 'handle' and 'flush_loop' cleanly
         self.abort = True
+        if self.packet:
+            self.packet.close()
         # time.sleep(0.1)
 
         # noinspection PyBroadException
@@ -280,7 +318,14 @@ class ServerConnection(object):
 
     def parse(self, pkid):
         if pkid in self.parsers[self.state]:
-            return self.parsers[self.state][pkid]()
+            if self.stats is None:
+                return self.parsers[self.state][pkid]()
+            state = self.state
+            start = time.time()
+            try:
+                return self.parsers[state][pkid]()
+            finally:
+                self.stats.parsed("CB", state, pkid, time.time() - start)
         return True
 
     def _define_parsers(self):
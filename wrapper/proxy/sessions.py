@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Session server checks (hasJoined) for online mode logins.
+
+`SessionVerifier` makes them on a small pool of worker threads
+(`session-workers`), through one `requests.Session`, so the HTTPS
+connections to the session server are kept alive and reused instead of
+being set up again for every login.  A Client hands over the check and
+goes on; the answer comes back to its callback on a worker thread.  So
+when everyone reconnects at once (after a server restart, say), the
+checks overlap, and no reader or parser thread waits on the network.
+
+Answers are not cached.  The login hash (serverId) comes from a secret
+the client picks for each login, so an answer can't be reused for a
+later login without trusting the name and IP address alone.
+
+`session-server` is the base URL, so a local stand-in server can be used
+for testing (see benchmarks/bench_logins.py).
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Py2 has no concurrent.futures unless the 'futures' backport is installed.
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = False
+
+HASJOINED = "/session/minecraft/hasJoined"
+# seconds to wait for the session server
+TIMEOUT = 10
+
+
+class SessionVerifier(object):
+    def __init__(self, proxy):
+        self.log = proxy.log
+        config = proxy.config
+        self.url = config["session-server"].rstrip("/") + HASJOINED
+        workers = max(1, config["session-workers"])
+        self.session = requests.Session()
+        # one kept-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # without a pool, checks run on the caller's thread.
+        self.pool = None
+        if ThreadPoolExecutor:
+            self.pool = ThreadPoolExecutor(workers)
+        # the counters are updated from the worker threads
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "rejected": 0, "errors": 0}
+
+    def verify(self, username, serverid, callback):
+        """
+        Check that `username` joined with `serverid` (the login hash).
+
+        :callback: called as callback(status, profile) once the answer
+         is in: status is the HTTP status code (0 if the session server
+         could not be reached), and profile is the decoded JSON of a 200
+         answer ({"id", "name", "properties"}) or None.
+        """
+        if self.pool:
+            self.pool.submit(self._verify, username, serverid, callback)
+        else:
+            self._verify(username, serverid, callback)
+
+    def _verify(self, username, serverid, callback):
+        status, profile = self.hasjoined(username, serverid)
+        try:
+            callback(status, profile)
+        except Exception as e:
+            self.log.exception("Login of %s failed after the session check"
+                               " (%s)", username, e)
+
+    def hasjoined(self, username, serverid):
+        """ask the session server.  returns (status code, profile)"""
+        self._count("requests")
+        try:
+            r = self.session.get(self.url, timeout=TIMEOUT,
+                                 params={"username": username,
+                                         "serverId": serverid})
+            if r.status_code == 200:
+                return 200, r.json()
+        except (requests.RequestException, ValueError) as e:
+            self._count("errors")
+            self.log.warning("Session server check for %s failed: %s",
+                             username, e)
+            return 0, None
+        self._count("rejected")
+        return r.status_code, None
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+"""
+Server list pings, answered without a Client.
+
+`StatusCache` keeps the status JSON (MOTD, player sample, favicon) for
+`status-cache-seconds`.  It is thrown away whenever a player logs in or
+out, so the player count is never stale.
+
+`StatusResponder` runs one thread with a `selectors` loop that accepts
+connections on the proxy port (after the ConnectionGate checks; see
+gate.py) and owns each one until its handshake has been read:
+
+- a status handshake is answered right there: the cached status JSON for
+  the request, then the pong for the ping, and the socket is closed.
+- a login handshake is handed to a new `Client`, along with the bytes
+  already read, and from then on is handled as before.
+- a legacy (pre 1.7) ping, anything malformed and connections that do not
+  finish their handshake in HANDSHAKE_TIMEOUT seconds are closed.
+
+So a server list scraper never costs a thread, a `Client` or a `Packet`,
+and a connect flood is turned away without one.  Without the `selectors`
+module (Py2), Proxy.host() accepts with blocking calls and starts a
+Client for every connection that the gate admits, and only the cache is
+used.
+"""
+
+import collections
+import errno
+import json
+import socket
+import struct
+import threading
+import time
+import traceback
+
+from proxy.packets.packet import _encode_varint, _varint_at
+from proxy.utils.constants import *
+
+from api.helpers import processcolorcodes
+
+try:
+    import selectors
+except ImportError:
+    selectors = False
+
+# seconds a new connection has to finish its handshake (and, for a
+#  status ping, the request and ping).
+HANDSHAKE_TIMEOUT = 10
+# most connections accepted in one go before servicing the others.
+ACCEPT_BATCH = 64
+# largest frame accepted before the handshake is done.  A handshake is a
+#  few hundred bytes, even with the extra fields wrapper and spigot add.
+MAX_FRAME = 4096
+
+_PONG = struct.Struct(">q")
+
+
+class StatusCache(object):
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.ttl = proxy.config["status-cache-seconds"]
+        # {True (1.8+ client) or False: (expires, status json)}
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """drop the cached status (a player logged in or out)"""
+        self._cache = {}
+
+    def status(self, clientversion):
+        """the status (server list) JSON for a client, as a str"""
+        modern = clientversion >= PROTOCOL_1_8START
+        now = time.time()
+        cached = self._cache.get(modern)
+        if cached and now < cached[0]:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        text = json.dumps(self.build(modern))
+        if self.ttl > 0:
+            self._cache[modern] = (now + self.ttl, text)
+        return text
+
+    def build(self, modern=True):
+        """
+        Build the status dictionary.  `modern` clients (1.8+) get the
+        MOTD as a chat object.
+        """
+        proxy = self.proxy
+        javaserver = proxy.javaserver
+        players = proxy.wrapper.players
+        hidden_ops = proxy.config["hidden-ops"]
+        sample = []
+        for player in list(players):
+            playerobj = players[player]
+            if playerobj.username not in hidden_ops:
+                sample.append({"name": playerobj.username,
+                               "id": str(playerobj.mojangUuid)})
+            if len(sample) > 5:
+                break
+        motdtext = javaserver.motd
+        if modern:
+            motdtext = processcolorcodes(motdtext.replace("\\", ""))
+        status = {
+            "description": motdtext,
+            "players": {
+                "max": int(proxy.config["max-players"]),
+                "online": len(players),
+                "sample": sample
+            },
+            "version": {
+                "name": javaserver.version,
+                "protocol": javaserver.protocolVersion
+            }
+        }
+
+        # add Favicon, if it exists
+        if javaserver.servericon:
+            status["favicon"] = javaserver.servericon
+
+        # add Forge information, if applicable.
+        if proxy.forge:
+            status["modinfo"] = proxy.mod_info["modinfo"]
+        return status
+
+
+def _frame(payload):
+    """length prefix a packet (compression is never on at this stage)"""
+    return _encode_varint(len(payload)) + payload
+
+
+def _read_handshake(frame):
+    """(protocol version, next state) from a handshake frame"""
+    pkid, pos = _varint_at(frame, 0)
+    if pkid != 0:
+        raise ValueError("not a handshake (packet id %d)" % pkid)
+    version, pos = _varint_at(frame, pos)
+    # server address (a string) and port
+    length, pos = _varint_at(frame, pos)
+    pos += length + 2
+    state, pos = _varint_at(frame, pos)
+    if pos > len(frame):
+        raise ValueError("short handshake")
+    return version, state
+
+
+class _Connection(object):
+    """a connection that has not finished its handshake"""
+    __slots__ = ("sock", "addr", "banned", "inbuf", "outbuf", "state",
+                 "version", "deadline", "closing")
+
+    def __init__(self, sock, addr, banned):
+        self.sock = sock
+        self.addr = addr
+        self.banned = banned
+        self.inbuf = bytearray()
+        self.outbuf = b""
+        self.state = HANDSHAKE
+        self.version = 0
+        self.deadline = time.time() + HANDSHAKE_TIMEOUT
+        # close once outbuf is sent
+        self.closing = False
+
+
+# selector key data of the listening socket
+_LISTENER = "listener"
+
+
+class StatusResponder(object):
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.log = proxy.log
+        self.cache = proxy.statuscache
+        self.gate = proxy.gate
+        self.selector = selectors.DefaultSelector()
+        self._ticked = 0
+        self.abort = False
+        # sockets given to listen() or add(), not registered yet.
+        self._new = collections.deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._connections = {}
+        self.counters = {"status": 0, "pings": 0, "logins": 0,
+                         "legacy": 0, "timeouts": 0, "errors": 0}
+        self.thread = threading.Thread(target=self._run,
+                                       name="StatusResponder")
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.abort = True
+        self._wake()
+
+    def listen(self, sock):
+        """accept connections on a listening socket (from any thread)"""
+        sock.setblocking(False)
+        self._new.append((sock, None, _LISTENER))
+        self._wake()
+
+    def add(self, sock, addr, banned=False):
+        """take over a newly accepted socket (from any thread)"""
+        self._new.append((sock, addr, banned))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\x00")
+        except socket.error:
+            pass
+
+    def _run(self):
+        while not self.abort:
+            try:
+                events = self.selector.select(1)
+            except (OSError, ValueError) as e:
+                self.log.error("StatusResponder select failed: %s", e)
+                time.sleep(1)
+                continue
+            for key, mask in events:
+                conn = key.data
+                if conn is None or conn is _LISTENER:
+                    try:
+                        if conn is None:
+                            self._take_new()
+                        else:
+                            self._accept(key.fileobj)
+                    except Exception as e:
+                        self.counters["errors"] += 1
+                        self.log.exception("StatusResponder could not take"
+                                           " a new connection (%s)", e)
+                    continue
+                try:
+                    if mask & selectors.EVENT_WRITE:
+                        self._write(conn)
+                    if mask & selectors.EVENT_READ and \
+                            conn.sock.fileno() in self._connections:
+                        self._read(conn)
+                except socket.error:
+                    self._close(conn)
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    self.log.debug("StatusResponder dropped %s: %s\n%s",
+                                   conn.addr, e, traceback.format_exc())
+                    self._close(conn)
+            self._expire()
+        for conn in list(self._connections.values()):
+            self._close(conn)
+
+    def _take_new(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except socket.error:
+            pass
+        while self._new:
+            sock, addr, banned = self._new.popleft()
+            if banned is _LISTENER:
+                self.selector.register(sock, selectors.EVENT_READ, _LISTENER)
+                continue
+            sock.setblocking(False)
+            conn = _Connection(sock, addr, banned)
+            self.selector.register(sock, selectors.EVENT_READ, conn)
+            self._connections[sock.fileno()] = conn
+
+    def _accept(self, listener):
+        for _ in range(ACCEPT_BATCH):
+            try:
+                sock, addr = listener.accept()
+            except socket.error as e:
+                if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    # out of file descriptors, probably.  Let some close.
+                    self.counters["errors"] += 1
+                    self.log.debug("StatusResponder accept failed: %s", e)
+                    time.sleep(0.1)
+                return
+            try:
+                admit, banned = self.gate.admit(addr[0],
+                                                len(self._connections))
+                if not admit:
+                    sock.close()
+                    continue
+                sock.setblocking(False)
+                conn = _Connection(sock, addr, banned)
+                self.selector.register(sock, selectors.EVENT_READ, conn)
+                self._connections[sock.fileno()] = conn
+            except Exception:
+                sock.close()
+                raise
+
+    def _expire(self):
+        now = time.time()
+        if now - self._ticked >= 1:
+            self._ticked = now
+            self.gate.tick()
+        for conn in list(self._connections.values()):
+            if now > conn.deadline:
+                self.counters["timeouts"] += 1
+                self._close(conn)
+
+    def _close(self, conn):
+        self._release(conn)
+        try:
+            conn.sock.shutdown(2)
+        except socket.error:
+            pass
+        conn.sock.close()
+
+    def _release(self, conn):
+        """stop watching a connection"""
+        if self._connections.pop(conn.sock.fileno(), None) is not None:
+            self.selector.unregister(conn.sock)
+
+    def _read(self, conn):
+        data = conn.sock.recv(4096)
+        if not data:
+            self._close(conn)
+            return
+        if conn.state == HANDSHAKE and not conn.inbuf and \
+                data[:1] == b"\xfe":
+            # legacy ping; just close it, as Client always has.
+            self.counters["legacy"] += 1
+            self._close(conn)
+            return
+        conn.inbuf += data
+        while conn.sock.fileno() in self._connections:
+            try:
+                length, start = _varint_at(conn.inbuf, 0)
+            except IndexError:
+                return
+            if length < 0 or length > MAX_FRAME:
+                raise ValueError("bad frame length %d" % length)
+            end = start + length
+            if end > len(conn.inbuf):
+                return
+            frame = bytes(conn.inbuf[start:end])
+            if conn.state == HANDSHAKE:
+                conn.version, state = _read_handshake(frame)
+                if state != STATUS:
+                    # a login; the Client reads the handshake itself.
+                    self._hand_off(conn)
+                    return
+                conn.state = STATUS
+            else:
+                self._status(conn, frame)
+            del conn.inbuf[:end]
+
+    def _status(self, conn, frame):
+        pkid, pos = _varint_at(frame, 0)
+        if pkid == 0:
+            # status request
+            self.counters["status"] += 1
+            status = self.cache.status(conn.version).encode("utf-8")
+            self._send(conn, _frame(
+                b"\x00" + _encode_varint(len(status)) + status))
+        elif pkid == 1:
+            # ping; answer it and hang up, like the vanilla server.
+            self.counters["pings"] += 1
+            conn.closing = True
+            self._send(conn, _frame(
+                b"\x01" + _PONG.pack(_PONG.unpack_from(frame, pos)[0])))
+        else:
+            raise ValueError("unexpected status packet %d" % pkid)
+
+    def _send(self, conn, data):
+        conn.outbuf += data
+        self._write(conn)
+
+    def _write(self, conn):
+        if conn.outbuf:
+            sent = conn.sock.send(conn.outbuf)
+            conn.outbuf = conn.outbuf[sent:]
+        if conn.outbuf:
+            self.selector.modify(conn.sock, selectors.EVENT_READ |
+                                 selectors.EVENT_WRITE, conn)
+        elif conn.closing:
+            self._close(conn)
+        else:
+            self.selector.modify(conn.sock, selectors.EVENT_READ, conn)
+
+    def _hand_off(self, conn):
+        self.counters["logins"] += 1
+        self._release(conn)
+        conn.sock.setblocking(True)
+        self.proxy.start_client(conn.sock, conn.addr, conn.banned,
+                                bytes(conn.inbuf))
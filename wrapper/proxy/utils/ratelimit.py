@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2016 - 2018 - BenBaptist and Wrapper.py developer(s).
+# https://github.com/benbaptist/minecraft-wrapper
+# This program is distributed under the terms of the GNU
+# General Public License, version 3 or later.
+
+import time
+
+
+class TokenBuckets(object):
+    """
+    A token bucket per key (an IP address, say).  Each bucket holds up to
+    `burst` tokens and refills at `rate` tokens per second; take() spends
+    one.  Buckets that have refilled completely are the same as new ones,
+    so prune() drops them to keep the dict small.
+    """
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(max(1, burst))
+        # {key: [tokens, time last updated]}
+        self.buckets = {}
+
+    def take(self, key, now=None):
+        """spend a token for `key`.  returns False if there are none."""
+        if now is None:
+            now = time.time()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [self.burst - 1, now]
+            return True
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def prune(self, now=None):
+        """forget buckets that are full again"""
+        if now is None:
+            now = time.time()
+        if self.rate <= 0:
+            return
+        for key, bucket in list(self.buckets.items()):
+            if bucket[0] + (now - bucket[1]) * self.rate >= self.burst:
+                del self.buckets[key]